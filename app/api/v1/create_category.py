@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.db.database import mongo
+from app.db.indexes import check_duplicates
 from app.api.v1.schemas.category_schema import CategoryBase
 from app.utils.validation import validate_signature
+from app.utils.pagination import BATCH_SIZE_QUERY, CATEGORY_SORT, LIMIT_QUERY, PAGE_QUERY, find_page, next_cursor
+from app.utils.streaming import stream_documents
+from app.utils.cache import category_cache
+from app.utils.bulk import run_bulk
+from app.utils.etag import etag_headers, etag_matches, list_etag, not_modified
+from app.utils.json_response import BSONJSONResponse
 from datetime import datetime,timedelta
 from typing import Optional
 
@@ -11,6 +19,17 @@ from typing import Optional
 router = APIRouter()
 
 
+def _category_document(category: CategoryBase) -> dict:
+    """Stored document for a new category."""
+    category_data = {
+        "category_id": str(ObjectId()),
+        "category_name": category.category_name,
+        "status": "new",
+        "created_at": datetime.utcnow()           
+    }
+    return category_data
+
+
 #create category
 @router.post("/create/new/category")
 async def create_category(category: CategoryBase):
@@ -18,40 +37,96 @@ async def create_category(category: CategoryBase):
     try:
         category_collection = await mongo.get_collection("categories")
         
-        # Check if category with the same name already exists
-        existing_category = await category_collection.find_one({"category_name": category.category_name})
-        if existing_category:
-            raise HTTPException(status_code=400, detail="Category with this name already exists.")
-        
-        category_data = {
-            "category_id": str(ObjectId()),
-            "category_name": category.category_name,
-            "status": "new",
-            "created_at": datetime.utcnow()           
-        }
+        # Duplicate names are rejected by the unique category_name index (or
+        # by check_duplicates while that index is missing)
+        category_data = _category_document(category)
         
+        await check_duplicates(category_collection, category_data)
         result = await category_collection.insert_one(category_data)
+        category_cache.clear()
         
         return {"message": "Category created successfully", "category_id": str(result.inserted_id)}
     
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Category with this name already exists.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+#bulk create / upsert categories
+@router.post("/create/bulk/categories")
+async def create_categories_bulk(request: Request, mode: str = "insert", chunk_size: Optional[int] = None):
+    """
+    Create many categories from a JSON array of CategoryBase objects or an NDJSON
+    body. `mode=upsert` updates categories matched by name instead of reporting
+    them as duplicates. Returns one result per item.
+    """
+    try:
+        category_collection = await mongo.get_collection("categories")
+
+        async def invalidate_cache(written):
+            category_cache.clear()
+
+        return await run_bulk(
+            request, category_collection, CategoryBase, _category_document,
+            id_field="category_id", key_fields=("category_name",), mode=mode, chunk_size=chunk_size,
+            on_flush=invalidate_cache, server_defaults=("status",)
+        )
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
 #get all categories
 @router.get("/get/all/categories")
-async def get_categories():
-    """Retrieve all categories."""
+async def get_categories(
+    request: Request,
+    page: Optional[int] = Query(None, **PAGE_QUERY),
+    limit: Optional[int] = Query(None, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    batch_size: int = Query(100, **BATCH_SIZE_QUERY)
+):
+    """
+    Retrieve all categories. Pass `limit` (with `page` or `cursor`) to paginate, or
+    `stream=ndjson|json` to stream documents as the cursor yields them.
+    """
     try:
-        category_collection = await mongo.get_collection("categories")
+        category_collection = await mongo.get_read_collection("categories", "get_categories")
         
-        categories_cursor = category_collection.find({})
-        categories = []
-        async for category in categories_cursor:
-            category["_id"] = str(category["_id"])  # Convert ObjectId to string
-            categories.append(category)
+        # Served from the in-process cache until a write invalidates it
+        cache_key = (page, limit, cursor)
+        if not stream:
+            cached = category_cache.get(cache_key)
+            if cached is not None:
+                # Pages are cached already encoded
+                etag, body = cached
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+                return Response(body, media_type=BSONJSONResponse.media_type, headers=etag_headers(etag))
+        generation = category_cache.generation
+
+        categories_cursor = find_page(category_collection, {}, CATEGORY_SORT, limit, page, cursor)
+        if stream:
+            return stream_documents(categories_cursor, "categories", stream, batch_size)
+
+        categories = await categories_cursor.to_list(length=None)
+        etag = list_etag(request, categories)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        return {"categories": categories}
+        result = {"categories": categories}
+        if limit:
+            result.update({
+                "page": None if cursor else (page or 1),
+                "limit": limit,
+                "next_cursor": next_cursor(categories, limit, CATEGORY_SORT)
+            })
+        response = BSONJSONResponse(result, headers=etag_headers(etag))
+        category_cache.set(cache_key, (etag, response.body), generation)
+        return response
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
@@ -63,18 +138,23 @@ async def update_category(category_id: str, category: CategoryBase):
         category_collection = await mongo.get_collection("categories")
         
         update_data = {
-            "icon_name": category.icon_name,
             "category_name": category.category_name,
             "updated_at": datetime.utcnow()
         }
         
+        await check_duplicates(category_collection, update_data, exclude={"category_id": {"$ne": category_id}})
         result = await category_collection.update_one(
             {"category_id": category_id},
             {"$set": update_data}
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Category not found.")
+        category_cache.clear()
         return {"message": "Category updated successfully"}
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Category with this name already exists.")
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
@@ -88,6 +168,9 @@ async def delete_category(category_id: str):
         result = await category_collection.delete_one({"category_id": category_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Category not found.")
+        category_cache.clear()
         return {"message": "Category deleted successfully"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
\ No newline at end of file
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.db.database import mongo
+from app.db.indexes import check_duplicates
 from app.api.v1.schemas.facilities_schema import FacilityBase
 from app.utils.validation import validate_signature
+from app.utils.pagination import BATCH_SIZE_QUERY, FACILITY_SORT, LIMIT_QUERY, PAGE_QUERY, find_page, next_cursor
+from app.utils.streaming import stream_documents
+from app.utils.cache import facility_cache
+from app.utils.bulk import run_bulk
+from app.utils.etag import etag_headers, etag_matches, list_etag, not_modified
+from app.utils.json_response import BSONJSONResponse
 from datetime import datetime,timedelta
 from typing import Optional
 
@@ -11,6 +19,17 @@ from typing import Optional
 router = APIRouter()
 
 
+def _facility_document(facility: FacilityBase) -> dict:
+    """Stored document for a new facility."""
+    facility_data = {
+        "facility_id": str(ObjectId()),
+        "facility_name": facility.facility_name,
+        "status": "new",
+        "created_at": datetime.utcnow()           
+    }
+    return facility_data
+
+
 #create facility
 @router.post("/create/new/facility")
 async def create_facility(facility: FacilityBase):
@@ -18,40 +37,96 @@ async def create_facility(facility: FacilityBase):
     try:
         facility_collection = await mongo.get_collection("facilities")
 
-        # Check if facility with the same name already exists
-        existing_facility = await facility_collection.find_one({"facility_name": facility.facility_name})
-        if existing_facility:
-            raise HTTPException(status_code=400, detail="Facility with this name already exists.")
-
-        facility_data = {
-            "facility_id": str(ObjectId()),
-            "facility_name": facility.facility_name,
-            "status": "new",
-            "created_at": datetime.utcnow()           
-        }
+        # Duplicate names are rejected by the unique facility_name index (or
+        # by check_duplicates while that index is missing)
+        facility_data = _facility_document(facility)
         
+        await check_duplicates(facility_collection, facility_data)
         result = await facility_collection.insert_one(facility_data)
+        facility_cache.clear()
 
         return {"message": "Facility created successfully", "facility_id": str(result.inserted_id)}
 
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Facility with this name already exists.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+#bulk create / upsert facilities
+@router.post("/create/bulk/facilities")
+async def create_facilities_bulk(request: Request, mode: str = "insert", chunk_size: Optional[int] = None):
+    """
+    Create many facilities from a JSON array of FacilityBase objects or an NDJSON
+    body. `mode=upsert` updates facilities matched by name instead of reporting
+    them as duplicates. Returns one result per item.
+    """
+    try:
+        facility_collection = await mongo.get_collection("facilities")
+
+        async def invalidate_cache(written):
+            facility_cache.clear()
+
+        return await run_bulk(
+            request, facility_collection, FacilityBase, _facility_document,
+            id_field="facility_id", key_fields=("facility_name",), mode=mode, chunk_size=chunk_size,
+            on_flush=invalidate_cache, server_defaults=("status",)
+        )
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
 #get all facilities
 @router.get("/get/all/facilities")
-async def get_facilities():
-    """Retrieve all facilities."""
+async def get_facilities(
+    request: Request,
+    page: Optional[int] = Query(None, **PAGE_QUERY),
+    limit: Optional[int] = Query(None, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    batch_size: int = Query(100, **BATCH_SIZE_QUERY)
+):
+    """
+    Retrieve all facilities. Pass `limit` (with `page` or `cursor`) to paginate, or
+    `stream=ndjson|json` to stream documents as the cursor yields them.
+    """
     try:
-        facility_collection = await mongo.get_collection("facilities")
+        facility_collection = await mongo.get_read_collection("facilities", "get_facilities")
         
-        facilities_cursor = facility_collection.find({})
-        facilities = []
-        async for facility in facilities_cursor:
-            facility["_id"] = str(facility["_id"])  # Convert ObjectId to string
-            facilities.append(facility)
+        # Served from the in-process cache until a write invalidates it
+        cache_key = (page, limit, cursor)
+        if not stream:
+            cached = facility_cache.get(cache_key)
+            if cached is not None:
+                # Pages are cached already encoded
+                etag, body = cached
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+                return Response(body, media_type=BSONJSONResponse.media_type, headers=etag_headers(etag))
+        generation = facility_cache.generation
+
+        facilities_cursor = find_page(facility_collection, {}, FACILITY_SORT, limit, page, cursor)
+        if stream:
+            return stream_documents(facilities_cursor, "facilities", stream, batch_size)
+
+        facilities = await facilities_cursor.to_list(length=None)
+        etag = list_etag(request, facilities)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        return {"facilities": facilities}
+        result = {"facilities": facilities}
+        if limit:
+            result.update({
+                "page": None if cursor else (page or 1),
+                "limit": limit,
+                "next_cursor": next_cursor(facilities, limit, FACILITY_SORT)
+            })
+        response = BSONJSONResponse(result, headers=etag_headers(etag))
+        facility_cache.set(cache_key, (etag, response.body), generation)
+        return response
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
@@ -63,18 +138,23 @@ async def update_facility(facility_id: str, facility: FacilityBase):
         facility_collection = await mongo.get_collection("facilities")
         
         update_data = {
-            "icon_name": facility.icon_name,
             "facility_name": facility.facility_name,
             "updated_at": datetime.utcnow()
         }
         
+        await check_duplicates(facility_collection, update_data, exclude={"facility_id": {"$ne": facility_id}})
         result = await facility_collection.update_one(
             {"facility_id": facility_id},
             {"$set": update_data}
         )
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="facility not found.")
+        facility_cache.clear()
         return {"message": "facility updated successfully"}
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Facility with this name already exists.")
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
@@ -88,6 +168,9 @@ async def delete_facility(facility_id: str):
         result = await facility_collection.delete_one({"facility_id": facility_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="facility not found.")
+        facility_cache.clear()
         return {"message": "facility deleted successfully"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
\ No newline at end of file
@@ -1,15 +1,63 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.db.database import mongo
-from app.api.v1.schemas.gym_schema import GymBase
+from app.db.indexes import check_duplicates
+from app.core.config import settings
+from app.api.v1.schemas.gym_schema import GymBase, GymUpdate
 from app.utils.validation import validate_signature
+from app.utils.pagination import BATCH_SIZE_QUERY, GYM_SORT, LIMIT_QUERY, PAGE_QUERY, count_cache, find_page, next_cursor
+from app.utils.projection import GYM_FIELDS, GYM_VIEWS, build_projection
+from app.utils.streaming import stream_documents
+from app.utils.etag import VERSION_FIELDS, etag_headers, etag_matches, list_etag, not_modified
+from app.utils.json_response import BSONJSONResponse, raw_list_response
+from app.utils.bulk import run_bulk
+from app.utils.references import hydrate_gyms
+from app.utils.patch import diff_paths, explicit_paths, fold_into_scalars, merge_paths, unchanged_filter
 from datetime import datetime,timedelta
 from typing import Optional
 
 
 router = APIRouter()
 
+# Free-form object fields that PATCH merges key by key instead of replacing
+GYM_MERGE_FIELDS = ("opening_hours", "membership_options", "contact", "booking")
+
+# Optional gym fields that PATCH clears ($unset) when sent as null
+GYM_CLEARABLE_FIELDS = tuple(name for name, field in GymBase.model_fields.items() if not field.is_required())
+
+# Read-diff-write cycles tried before a PATCH/PUT gives up with 409
+GYM_WRITE_ATTEMPTS = 3
+
+
+def _gym_document(gym: GymBase) -> dict:
+    """Stored document for a new gym."""
+    gym_data = {
+        "gym_id": str(ObjectId()),
+        "gym_name": gym.gym_name,
+        "category_id": gym.category_id,
+        "city": gym.city,
+        "distance": gym.distance,
+        "address": gym.address,
+        "contact": gym.contact,
+        "booking": gym.booking,
+        "about": gym.about,
+        "facilities": gym.facilities,
+        "facility_notes": gym.facility_notes,
+        "opening_hours": gym.opening_hours,
+        "membership_options": gym.membership_options,
+        "logo_url": gym.logo_url,
+        "cover_image_url": gym.cover_image_url,
+        "gallery": gym.gallery,
+        "status": gym.status,
+        "created_at": datetime.utcnow()           
+    }
+    if gym.location is not None:
+        gym_data["location"] = gym.location.model_dump()
+    return gym_data
+
 
 #create gym
 @router.post("/create/new/gym")
@@ -18,77 +66,289 @@ async def create_gym(gym: GymBase):
     try:
         gym_collection = await mongo.get_collection("gyms")
         
-        # Check if gym with the same name already exists
-        existing_gym = await gym_collection.find_one({"gym_name": gym.gym_name})
-        if existing_gym:
-            raise HTTPException(status_code=400, detail="Gym with this name already exists.")
-        
-        gym_data = {
-            "gym_id": str(ObjectId()),
-            "gym_name": gym.gym_name,
-            "category_id": gym.category_id,
-            "city": gym.city,
-            "distance": gym.distance,
-            "address": gym.address,
-            "contact": gym.contact,
-            "booking": gym.booking,
-            "about": gym.about,
-            "facilities": gym.facilities,
-            "facility_notes": gym.facility_notes,
-            "opening_hours": gym.opening_hours,
-            "membership_options": gym.membership_options,
-            "logo_url": gym.logo_url,
-            "cover_image_url": gym.cover_image_url,
-            "gallery": gym.gallery,
-            "status": gym.status,
-            "created_at": datetime.utcnow()           
-        }
+        # Duplicate names are rejected by the unique gym_name index (or
+        # by check_duplicates while that index is missing)
+        gym_data = _gym_document(gym)
         
+        await check_duplicates(gym_collection, gym_data)
         result = await gym_collection.insert_one(gym_data)
+        count_cache.clear()
         
         return {"status": True, "message": "gym created successfully", "gym_id": str(result.inserted_id)}
     
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Gym with this name already exists.")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+#bulk create / upsert gyms
+@router.post("/create/bulk/gyms")
+async def create_gyms_bulk(request: Request, mode: str = "insert", chunk_size: Optional[int] = None):
+    """
+    Create many gyms from a JSON array of GymBase objects or an NDJSON body.
+    `mode=upsert` updates gyms matched by name instead of reporting them as
+    duplicates. Returns one result per item.
+    """
+    try:
+        gym_collection = await mongo.get_collection("gyms")
+
+        async def invalidate_counts(written):
+            count_cache.clear()
+
+        return await run_bulk(
+            request, gym_collection, GymBase, _gym_document,
+            id_field="gym_id", key_fields=("gym_name",), mode=mode, chunk_size=chunk_size,
+            on_flush=invalidate_counts
+        )
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
 #get all gyms
 @router.get("/get/all/gyms")
-async def get_gyms():
-    """Retrieve all gyms."""
+async def get_gyms(
+    request: Request,
+    page: Optional[int] = Query(None, **PAGE_QUERY),
+    limit: Optional[int] = Query(None, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    batch_size: int = Query(100, **BATCH_SIZE_QUERY),
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    raw: bool = False,
+    hydrate: bool = False
+):
+    """
+    Retrieve all gyms. Pass `limit` (with `page` or `cursor`) to paginate, or
+    `stream=ndjson|json` to stream documents as the cursor yields them.
+    `fields=a,b` or `view=basic|summary` limit the returned fields.
+    `raw=true` returns the gyms as Extended JSON transcoded straight from BSON.
+    `hydrate=true` adds `category_name` and `facility_names` to each gym.
+    """
     try:
-        gym_collection = await mongo.get_collection("gyms")
+        if hydrate and (raw or stream):
+            raise HTTPException(status_code=400, detail="hydrate cannot be combined with raw or stream.")
+
+        get_collection = mongo.get_raw_collection if raw else mongo.get_read_collection
+        gym_collection = await get_collection("gyms", "get_gyms")
         
-        gyms_cursor = gym_collection.find({})
-        gyms = []
-        async for gym in gyms_cursor:
-            gym["_id"] = str(gym["_id"])  # Convert ObjectId to string
-            gyms.append(gym)
+        required = [key for key, _ in GYM_SORT] + list(VERSION_FIELDS)
+        if hydrate:
+            required += ["category_id", "facilities"]
+        projection = build_projection(fields, view, GYM_VIEWS, GYM_FIELDS, required=required)
+        gyms_cursor = find_page(gym_collection, {}, GYM_SORT, limit, page, cursor, projection=projection)
+        if stream:
+            return stream_documents(gyms_cursor, "gyms", stream, batch_size)
+
+        gyms = await gyms_cursor.to_list(length=None)
+        names = ()
+        if hydrate:
+            # Names come from the cached id -> name maps, one $in query per
+            # reference collection at most, never one per gym
+            names = await hydrate_gyms(
+                gyms,
+                await mongo.get_read_collection("categories", "resolve_reference_names"),
+                await mongo.get_read_collection("facilities", "resolve_reference_names"),
+            )
+        etag = list_etag(request, gyms, *names)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        return {"gyms": gyms}
+        page_info = {}
+        if limit:
+            page_info.update({
+                "page": None if cursor else (page or 1),
+                "limit": limit,
+                "next_cursor": next_cursor(gyms, limit, GYM_SORT)
+            })
+        if raw:
+            return raw_list_response("gyms", gyms, page_info, headers=etag_headers(etag))
+        return BSONJSONResponse({"gyms": gyms, **page_info}, headers=etag_headers(etag))
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
+#get gyms near a point
+@router.get("/get/gyms/near")
+async def get_gyms_near(
+    request: Request,
+    lng: float,
+    lat: float,
+    radius_km: float = Query(10, gt=0, le=settings.MAX_NEAR_RADIUS_KM),
+    limit: int = Query(20, **LIMIT_QUERY),
+    category_id: Optional[str] = None,
+    facility_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None
+):
+    """
+    Gyms within `radius_km` of (lng, lat), nearest first, each with its
+    computed `distance_km`. Only gyms with a `location` are considered.
+    """
+    try:
+        if not -180 <= lng <= 180 or not -90 <= lat <= 90:
+            raise HTTPException(status_code=400, detail="lng/lat out of range.")
+
+        gym_collection = await mongo.get_read_collection("gyms", "get_gyms_near")
+
+        query = {}
+        if category_id:
+            query["category_id"] = category_id
+        if facility_id:
+            query["facilities"] = facility_id
+
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "key": "location",
+                "distanceField": "distance_km",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "spherical": True,
+                "query": query,
+            }},
+            {"$limit": limit},
+        ]
+        projection = build_projection(fields, view, GYM_VIEWS, GYM_FIELDS, required=["gym_id", *VERSION_FIELDS])
+        if projection:
+            pipeline.append({"$project": {**projection, "distance_km": 1}})
+
+        gyms = await gym_collection.aggregate(pipeline).to_list(length=None)
+        etag = list_etag(request, gyms)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        return BSONJSONResponse({"gyms": gyms, "radius_km": radius_km, "limit": limit}, headers=etag_headers(etag))
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+    
+async def _write_gym_changes(gym_collection, gym_id: str, paths: dict, fields: Optional[str] = None,
+                             view: Optional[str] = None, gallery_add: Optional[list] = None,
+                             gallery_remove: Optional[list] = None):
+    """
+    Diff `paths` and the gallery additions/removals against the stored gym
+    and write only what differs. Returns `(gym, written)`, limited by
+    `fields`/`view`; when nothing differs the stored gym is returned and
+    nothing is written. The write only applies while the touched fields
+    still hold the values that were diffed; otherwise the diff is redone,
+    and after GYM_WRITE_ATTEMPTS conflicts the request fails with 409.
+    """
+    required = ["gym_id", *VERSION_FIELDS]
+    touched = list(dict.fromkeys(path.split(".")[0] for path in paths))
+    if gallery_add or gallery_remove:
+        touched.append("gallery")
+    projection = build_projection(fields, view, GYM_VIEWS, GYM_FIELDS, required=required)
+    # One read serves both the diff and the no-op response
+    read_projection = build_projection(fields, view, GYM_VIEWS, GYM_FIELDS, required=[*required, *touched])
+
+    for _ in range(GYM_WRITE_ATTEMPTS):
+        stored = await gym_collection.find_one({"gym_id": gym_id}, read_projection)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="gym not found.")
+
+        to_set, to_unset = diff_paths(stored, fold_into_scalars(stored, paths))
+        update = {}
+        gallery = stored.get("gallery") or []
+        push = [url for url in dict.fromkeys(gallery_add or []) if url not in gallery]
+        pull = [url for url in dict.fromkeys(gallery_remove or []) if url in gallery]
+        if push and pull:
+            # $push and $pull cannot target the same field in one update
+            to_set["gallery"] = [url for url in gallery if url not in pull] + push
+        elif push:
+            update["$push"] = {"gallery": {"$each": push}}
+        elif pull:
+            update["$pull"] = {"gallery": {"$in": pull}}
+        if to_unset:
+            update["$unset"] = {path: "" for path in to_unset}
+        if not (to_set or update):
+            return stored, False
+
+        await check_duplicates(gym_collection, to_set, exclude={"gym_id": {"$ne": gym_id}})
+        update["$set"] = {**to_set, "updated_at": datetime.utcnow()}
+        gym = await gym_collection.find_one_and_update(
+            {"gym_id": gym_id, **unchanged_filter(stored, touched)},
+            update, projection=projection, return_document=ReturnDocument.AFTER
+        )
+        if gym is not None:
+            count_cache.clear()
+            return gym, True
+        # Deleted, or a touched field changed since the read: read again
+
+    raise HTTPException(status_code=409, detail="gym was modified concurrently, please retry.")
+
+
 #update gym
 @router.put("/update/gym/by/{gym_id}")
 async def update_gym(gym_id: str, gym: GymBase):
-    """Update an existing gym."""
+    """Replace the fields of an existing gym. Fields that did not change are not written."""
     try:
         gym_collection = await mongo.get_collection("gyms")
         
-        update_data = {
-            "icon_name": gym.icon_name,
-            "gym_name": gym.gym_name,
-            "updated_at": datetime.utcnow()
-        }
+        paths = gym.model_dump(exclude_none=True)
+        updated_gym, written = await _write_gym_changes(gym_collection, gym_id, paths)
         
-        result = await gym_collection.update_one(
-            {"gym_id": gym_id},
-            {"$set": update_data}
+        message = "gym updated successfully" if written else "No changes"
+        return BSONJSONResponse({"message": message, "gym": updated_gym})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Gym with this name already exists.")
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+#partially update gym
+@router.patch("/update/gym/by/{gym_id}")
+async def patch_gym(
+    gym_id: str,
+    gym_update: GymUpdate,
+    fields: Optional[str] = None,
+    view: Optional[str] = None
+):
+    """
+    Update only the gym fields sent. `opening_hours`, `membership_options`,
+    `contact` and `booking` are merged key by key (null removes a key);
+    `gallery_add`/`gallery_remove` add or remove gallery images, and an
+    explicit null clears an optional field such as `location`. Only the
+    paths that differ from the stored gym are written, and a request that
+    changes nothing is not written at all. Returns the gym, limited by
+    `fields`/`view`.
+    """
+    try:
+        if gym_update.gallery is not None and (gym_update.gallery_add or gym_update.gallery_remove):
+            raise HTTPException(status_code=400, detail="Send either gallery or gallery_add/gallery_remove.")
+        if set(gym_update.gallery_add or []) & set(gym_update.gallery_remove or []):
+            raise HTTPException(status_code=400, detail="An image cannot be both added and removed.")
+
+        gym_collection = await mongo.get_collection("gyms")
+        
+        paths = explicit_paths(gym_update)
+        gallery_add = paths.pop("gallery_add", None)
+        gallery_remove = paths.pop("gallery_remove", None)
+        paths = merge_paths(paths, GYM_MERGE_FIELDS)
+        for name in GYM_CLEARABLE_FIELDS:
+            if name in gym_update.model_fields_set and getattr(gym_update, name) is None:
+                paths[name] = None  # explicit null clears the field
+        if gym_update.location is not None:
+            # A GeoJSON point is only valid as a whole
+            paths = {path: value for path, value in paths.items() if not path.startswith("location.")}
+            paths["location"] = gym_update.location.model_dump()
+        
+        updated_gym, written = await _write_gym_changes(
+            gym_collection, gym_id, paths, fields, view, gallery_add, gallery_remove
         )
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="gym not found.")
-        return {"message": "gym updated successfully"}
+        
+        message = "gym updated successfully" if written else "No changes"
+        return BSONJSONResponse({"message": message, "gym": updated_gym})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Gym with this name already exists.")
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
     
@@ -102,6 +362,9 @@ async def delete_gym(gym_id: str):
         result = await gym_collection.delete_one({"gym_id": gym_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="gym not found.")
+        count_cache.clear()
         return {"message": "gym deleted successfully"}
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
\ No newline at end of file
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.db.database import mongo
+from app.api.v1.schemas.gym_schema import GymBase
+from app.api.v1.schemas.trainer_schema import TrainerBase
+from app.utils.export import export_documents, model_columns, select_columns
+from app.utils.pagination import BATCH_SIZE_QUERY, GYM_SORT, TRAINER_SORT
+from app.utils.projection import GYM_FIELDS, GYM_VIEWS, TRAINER_FIELDS, TRAINER_VIEWS, build_projection
+from typing import Optional
+
+
+router = APIRouter()
+
+# CSV columns, nested schema fields flattened to dotted paths
+TRAINER_COLUMNS = ["trainer_id", *model_columns(TrainerBase)]
+GYM_COLUMNS = ["gym_id", *model_columns(GymBase), "created_at", "updated_at"]
+
+
+#export trainers
+@router.get("/export/trainers")
+async def export_trainers(
+    format: str = "csv",
+    status: Optional[str] = None,
+    specialization: Optional[str] = None,
+    min_experience: Optional[int] = None,
+    max_experience: Optional[int] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
+    batch_size: int = Query(500, **BATCH_SIZE_QUERY)
+):
+    """
+    Stream all matching trainers as CSV (nested fields flattened, e.g.
+    `pricing.per_session`) or NDJSON. Each row ends with a `_cursor`; pass
+    the last one received as `cursor` to resume an interrupted download.
+    """
+    try:
+        trainer_collection = await mongo.get_read_collection("trainers", "export_trainers")
+
+        filter_query = {}
+        if status:
+            filter_query["status"] = status
+        if specialization:
+            filter_query["primary_specialization"] = specialization
+        if min_experience is not None or max_experience is not None:
+            filter_query["experience"] = {}
+            if min_experience is not None:
+                filter_query["experience"]["$gte"] = min_experience
+            if max_experience is not None:
+                filter_query["experience"]["$lte"] = max_experience
+
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=[key for key, _ in TRAINER_SORT])
+        return export_documents(
+            trainer_collection, filter_query, TRAINER_SORT, format,
+            columns=select_columns(TRAINER_COLUMNS, projection), projection=projection,
+            cursor=cursor, batch_size=batch_size, filename="trainers"
+        )
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+#export gyms
+@router.get("/export/gyms")
+async def export_gyms(
+    format: str = "csv",
+    status: Optional[str] = None,
+    city: Optional[str] = None,
+    category_id: Optional[str] = None,
+    facility_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    cursor: Optional[str] = None,
+    batch_size: int = Query(500, **BATCH_SIZE_QUERY)
+):
+    """
+    Stream all matching gyms as CSV or NDJSON. Each row ends with a
+    `_cursor`; pass the last one received as `cursor` to resume an
+    interrupted download.
+    """
+    try:
+        gym_collection = await mongo.get_read_collection("gyms", "export_gyms")
+
+        filter_query = {}
+        if status:
+            filter_query["status"] = status
+        if city:
+            filter_query["city"] = city
+        if category_id:
+            filter_query["category_id"] = category_id
+        if facility_id:
+            filter_query["facilities"] = facility_id
+
+        projection = build_projection(fields, view, GYM_VIEWS, GYM_FIELDS, required=[key for key, _ in GYM_SORT])
+        return export_documents(
+            gym_collection, filter_query, GYM_SORT, format,
+            columns=select_columns(GYM_COLUMNS, projection), projection=projection,
+            cursor=cursor, batch_size=batch_size, filename="gyms"
+        )
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
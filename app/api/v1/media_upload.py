@@ -5,34 +5,18 @@ from app.utils.file_uploader import upload_to_s3_with_progress
 from datetime import datetime
 from bson import ObjectId
 from uuid import uuid4
-import boto3
 import base64
-import os
 import io
+from app.core.config import settings
 from app.utils.validation import validate_signature
-from botocore.exceptions import ClientError
-
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from app.utils.s3 import get_s3_client
 
 # Initialize FastAPI router
 router = APIRouter()
 
-# AWS S3 Configuration
-AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
-AWS_SECRET_KEY = os.getenv("AWS_SECRET_KEY")
-AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
-AWS_REGION = os.getenv("AWS_REGION")
-
-# Initialize S3 Client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=AWS_REGION,
-)
+# AWS S3 Configuration (the client itself is created on first use)
+AWS_BUCKET_NAME = settings.AWS_BUCKET_NAME
+AWS_REGION = settings.AWS_REGION
 
 @router.post("/upload/image", response_model=dict)
 async def upload_image(
@@ -58,7 +42,7 @@ async def upload_image(
         unique_file_name = f"{uuid4()}.{file_extension}"
 
         # Upload file to S3
-        s3_client.upload_fileobj(
+        get_s3_client().upload_fileobj(
             io.BytesIO(image_data),  # Convert binary data into a file-like object
             AWS_BUCKET_NAME,
             unique_file_name,
@@ -83,6 +67,9 @@ async def delete_image(
     # user: dict = Depends(validate_signature)
     ):
 
+    # botocore is only loaded once S3 is actually used
+    from botocore.exceptions import ClientError
+
     params = {
         "Bucket": AWS_BUCKET_NAME,
         "Key": file_name,
@@ -91,7 +78,7 @@ async def delete_image(
     try:
         try:
             #Check if file exists
-            s3_client.head_object(**params)
+            get_s3_client().head_object(**params)
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 return {
@@ -103,7 +90,7 @@ async def delete_image(
                 raise e  # re-raise other errors
 
             # Delete the file from S3
-        result = s3_client.delete_object(**params)
+        result = get_s3_client().delete_object(**params)
 
         return {
             "status": True,
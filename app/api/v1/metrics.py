@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException
+from app.db.database import change_watcher, mongo
+from app.utils.cache import CACHES
+
+
+router = APIRouter()
+
+
+#get database driver metrics
+@router.get("/get/db/stats")
+async def get_db_stats():
+    """Live MongoDB client metrics: collection handle cache and connection pool."""
+    try:
+        return {
+            "collections": mongo.collection_stats(),
+            "pool": mongo.pool_metrics.snapshot(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+
+#get per-route mongo command latency
+@router.get("/get/db/commands")
+async def get_db_commands():
+    """Mongo command latency histograms per (route, collection, command)."""
+    try:
+        return {"commands": mongo.command_metrics.snapshot()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+
+#get slow query log
+@router.get("/get/db/slow-queries")
+async def get_db_slow_queries():
+    """Most recent Mongo commands slower than MONGO_SLOW_QUERY_MS."""
+    try:
+        return {
+            "threshold_ms": mongo.command_metrics.slow_ms,
+            "slow_queries": mongo.command_metrics.slow_queries(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
+
+
+#get in-process cache counters
+@router.get("/get/cache/stats")
+async def get_cache_stats():
+    """Hit / miss / eviction counters of the in-process caches and how they are invalidated."""
+    try:
+        return {
+            "caches": {name: cache.stats() for name, cache in CACHES.items()},
+            "invalidation": change_watcher.stats(),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
@@ -1,4 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+from typing import List, Literal, Optional
+
+
+class GeoPoint(BaseModel):
+    """GeoJSON point; coordinates are [longitude, latitude]."""
+    type: Literal["Point"] = "Point"
+    coordinates: List[float]
+
+    @field_validator("coordinates")
+    @classmethod
+    def check_coordinates(cls, value):
+        if len(value) != 2 or not -180 <= value[0] <= 180 or not -90 <= value[1] <= 90:
+            raise ValueError("coordinates must be [longitude, latitude]")
+        return value
+
 
 class GymBase(BaseModel):
     gym_name: str
@@ -16,4 +31,35 @@ class GymBase(BaseModel):
     logo_url: str
     cover_image_url: str
     gallery: list
-    status: str
\ No newline at end of file
+    status: str
+    location: Optional[GeoPoint] = None
+
+
+class GymUpdate(BaseModel):
+    """
+    Partial gym update: only the fields sent are changed. Objects such as
+    `opening_hours` are merged key by key (a null value removes the key),
+    lists are replaced. `gallery_add`/`gallery_remove` edit the gallery in
+    place instead of replacing it. A top-level null means "not sent", except
+    for fields that are optional on the gym itself (`location`), where it
+    clears the field.
+    """
+    gym_name: Optional[str] = None
+    category_id: Optional[str] = None
+    city: Optional[str] = None
+    distance: Optional[float] = None
+    address: Optional[str] = None
+    contact: Optional[dict] = None
+    booking: Optional[dict] = None
+    about: Optional[str] = None
+    facilities: Optional[list] = None
+    facility_notes: Optional[str] = None
+    opening_hours: Optional[dict] = None
+    membership_options: Optional[dict] = None
+    logo_url: Optional[str] = None
+    cover_image_url: Optional[str] = None
+    gallery: Optional[list] = None
+    gallery_add: Optional[List[str]] = None
+    gallery_remove: Optional[List[str]] = None
+    status: Optional[str] = None
+    location: Optional[GeoPoint] = None
@@ -1,107 +1,161 @@
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.db.database import mongo
+from app.db.indexes import check_duplicates
 from app.api.v1.schemas.trainer_schema import (
     TrainerCreate, 
     TrainerUpdate, 
     TrainerInDB,
     TrainerBasic
 )
+from app.utils.pagination import (
+    COUNT_MODES, LIMIT_QUERY, PAGE_QUERY, RANK_SORT, TRAINER_SORT, cached_count, count_cache, decode_cursor, encode_cursor,
+    fetch_page, next_cursor,
+)
+from app.utils.projection import TRAINER_FIELDS, TRAINER_VIEWS, build_projection, trim_to_projection
+from app.utils.etag import VERSION_FIELDS, VERSION_PROJECTION, document_etag, etag_headers, etag_matches, list_etag, not_modified
+from app.utils.json_response import BSONJSONResponse, raw_list_response
+from app.utils.search_index import tokenize, trainer_search_index
+from app.utils.bulk import run_bulk
+from app.utils.patch import changed_filter, explicit_paths, literal_set_stage
+from app.utils.trainer_fields import (
+    availability, availability_filter, parse_day, parse_time, skills_filter_mask, skills_mask, skills_mask_expression,
+)
 from typing import List, Optional
+import re
 
 
 router = APIRouter()
 
+# Always projected on list pages: the keyset sort keys and the ETag version fields
+LIST_REQUIRED_FIELDS = list(dict.fromkeys([key for key, _ in TRAINER_SORT] + list(VERSION_FIELDS)))
+
+# Fields needed to (re)index a trainer in the in-process search index
+SEARCH_INDEX_PROJECTION = {"trainer_id": 1, "status": 1, **{field: 1 for field in trainer_search_index.fields}}
+
+
+def _trainer_document(trainer: TrainerCreate) -> dict:
+    """Stored document for a new trainer, including the derived query fields."""
+    trainer_data = {
+        "trainer_id": str(ObjectId()),
+        "full_name": trainer.full_name,
+        "experience": trainer.experience,
+        "primary_specialization": trainer.primary_specialization,
+        "languages": trainer.languages,
+        "short_bio": trainer.short_bio,
+        
+        # Skills & Certifications
+        "skills": trainer.skills.model_dump(),
+        "skills_mask": skills_mask(trainer.skills),
+        "certifications": [
+            {
+                "title": cert.title,
+                "description": cert.description,
+                "file_url": cert.file_url,
+                "file_name": cert.file_name,
+                "file_size": cert.file_size,
+            }
+            for cert in trainer.certifications
+        ],
+        
+        # Availability
+        "preferred_mode": {
+            "online": trainer.preferred_mode.online,
+            "in_person": trainer.preferred_mode.in_person,
+        },
+        "weekly_schedule": [
+            {
+                "days": schedule.days,
+                "checked": schedule.checked,
+                "time_slots": schedule.time_slots,
+            }
+            for schedule in trainer.weekly_schedule
+        ],
+        "availability": availability(trainer.weekly_schedule),
+        
+        # Pricing & Media
+        "pricing": {
+            "per_session": trainer.pricing.per_session,
+            "weekly_plan": trainer.pricing.weekly_plan,
+            "monthly_plan": trainer.pricing.monthly_plan,
+            "currency": trainer.pricing.currency,
+        },
+        "media": {
+            "profile_photo_url": trainer.media.profile_photo_url,
+            "profile_photo_name": trainer.media.profile_photo_name,
+            "intro_video_url": trainer.media.intro_video_url,
+            "intro_video_name": trainer.media.intro_video_name,
+            "publish_status": trainer.media.publish_status,
+        },
+        
+        # Metadata
+        "status": trainer.status or "active",  # Default status
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+    return trainer_data
+
+
 # Create new trainer
-@router.post("/create/new/trainer", response_model=dict)
+@router.post("/create/new/trainer")
 async def create_trainer(trainer: TrainerCreate):
     """Create a new trainer."""
     try:
         trainer_collection = await mongo.get_collection("trainers")
         
-        # Check if trainer with similar name already exists (optional)
-        existing_trainer = await trainer_collection.find_one({
-            "full_name": trainer.full_name,
-            "primary_specialization": trainer.primary_specialization
-        })
-        
-        if existing_trainer:
-            raise HTTPException(
-                status_code=400, 
-                detail="Trainer with similar name and specialization already exists."
-            )
-        
-        trainer_data = {
-            "trainer_id": str(ObjectId()),
-            "full_name": trainer.full_name,
-            "experience": trainer.experience,
-            "primary_specialization": trainer.primary_specialization,
-            "languages": trainer.languages,
-            "short_bio": trainer.short_bio,
-            
-            # Skills & Certifications
-            "skills": {
-                "hatha_yoga": trainer.skills.hatha_yoga,
-                "mobility_flexibility": trainer.skills.mobility_flexibility,
-                "strength_training": trainer.skills.strength_training,
-                "guided_meditation": trainer.skills.guided_meditation,
-                "rehab_friendly_workouts": trainer.skills.rehab_friendly_workouts,
-            },
-            "certifications": [
-                {
-                    "title": cert.title,
-                    "description": cert.description,
-                    "file_url": cert.file_url,
-                    "file_name": cert.file_name,
-                    "file_size": cert.file_size,
-                }
-                for cert in trainer.certifications
-            ],
-            
-            # Availability
-            "preferred_mode": {
-                "online": trainer.preferred_mode.online,
-                "in_person": trainer.preferred_mode.in_person,
-            },
-            "weekly_schedule": [
-                {
-                    "days": schedule.days,
-                    "checked": schedule.checked,
-                    "time_slots": schedule.time_slots,
-                }
-                for schedule in trainer.weekly_schedule
-            ],
-            
-            # Pricing & Media
-            "pricing": {
-                "per_session": trainer.pricing.per_session,
-                "weekly_plan": trainer.pricing.weekly_plan,
-                "monthly_plan": trainer.pricing.monthly_plan,
-                "currency": trainer.pricing.currency,
-            },
-            "media": {
-                "profile_photo_url": trainer.media.profile_photo_url,
-                "profile_photo_name": trainer.media.profile_photo_name,
-                "intro_video_url": trainer.media.intro_video_url,
-                "intro_video_name": trainer.media.intro_video_name,
-                "publish_status": trainer.media.publish_status,
-            },
-            
-            # Metadata
-            "status": "active",  # Default status
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-        }
+        # Duplicates (same name and specialization) are rejected by a unique
+        # index (or by check_duplicates while that index is missing)
+        trainer_data = _trainer_document(trainer)
         
+        await check_duplicates(trainer_collection, trainer_data)
         result = await trainer_collection.insert_one(trainer_data)
+        trainer_search_index.upsert(trainer_data)
+        count_cache.clear()
         
-        return {
+        return BSONJSONResponse({
             "message": "Trainer created successfully", 
             "trainer_id": str(result.inserted_id),
             "trainer_data": trainer_data
-        }
+        })
+    
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=400, 
+            detail="Trainer with similar name and specialization already exists."
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+# Bulk create / upsert trainers
+@router.post("/create/bulk/trainers")
+async def create_trainers_bulk(request: Request, mode: str = "insert", chunk_size: Optional[int] = None):
+    """
+    Create many trainers from a JSON array of TrainerCreate objects or an
+    NDJSON body. Trainers are matched on full name + primary specialization;
+    `mode=upsert` updates the matches instead of reporting them as
+    duplicates. Returns one result per item.
+    """
+    try:
+        trainer_collection = await mongo.get_collection("trainers")
+        
+        async def reindex(written):
+            # Upserted trainers keep their stored trainer_id, so re-read them
+            keys = [{"full_name": t["full_name"], "primary_specialization": t["primary_specialization"]} for t in written]
+            async for stored in trainer_collection.find({"$or": keys}, SEARCH_INDEX_PROJECTION):
+                trainer_search_index.upsert(stored)
+            count_cache.clear()
+        
+        return await run_bulk(
+            request, trainer_collection, TrainerCreate, _trainer_document,
+            id_field="trainer_id", key_fields=("full_name", "primary_specialization"),
+            mode=mode, chunk_size=chunk_size, on_flush=reindex, server_defaults=("status",)
+        )
     
     except HTTPException as he:
         raise he
@@ -109,16 +163,28 @@ async def create_trainer(trainer: TrainerCreate):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Get all trainers with pagination
-@router.get("/get/all/trainers", response_model=dict)
+@router.get("/get/all/trainers")
 async def get_all_trainers(
-    page: int = 1, 
-    limit: int = 10, 
+    request: Request,
+    page: int = Query(1, **PAGE_QUERY),
+    limit: int = Query(10, **LIMIT_QUERY),
     status: Optional[str] = None,
-    specialization: Optional[str] = None
+    specialization: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    count: str = "exact",
+    raw: bool = False
 ):
-    """Retrieve all trainers with pagination and optional filters."""
+    """
+    Retrieve all trainers with pagination and optional filters.
+    Pass the returned `next_cursor` as `cursor` to page without skipping.
+    `count=exact|estimated|none` selects how the total is computed.
+    `raw=true` returns the trainers as Extended JSON transcoded straight from BSON.
+    """
     try:
-        trainer_collection = await mongo.get_collection("trainers")
+        get_collection = mongo.get_raw_collection if raw else mongo.get_read_collection
+        trainer_collection = await get_collection("trainers", "get_all_trainers")
         
         # Build filter query
         filter_query = {}
@@ -127,45 +193,63 @@ async def get_all_trainers(
         if specialization:
             filter_query["primary_specialization"] = specialization
         
-        # Calculate skip
-        skip = (page - 1) * limit
-        
-        # Get total count
-        total_count = await trainer_collection.count_documents(filter_query)
+        # Get the page with keyset (cursor) or page pagination, plus the total
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=LIST_REQUIRED_FIELDS)
+        trainers, total_count = await fetch_page(
+            trainer_collection, filter_query, TRAINER_SORT, limit, page, cursor, projection, count
+        )
         
-        # Get trainers with pagination
-        trainers_cursor = trainer_collection.find(filter_query).skip(skip).limit(limit)
-        trainers = []
+        etag = list_etag(request, trainers, total_count)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        async for trainer in trainers_cursor:
-            trainer["_id"] = str(trainer["_id"])
-            trainers.append(trainer)
-        
-        return {
-            "trainers": trainers,
+        page_info = {
             "total": total_count,
             "page": page,
             "limit": limit,
-            "total_pages": (total_count + limit - 1) // limit
+            "total_pages": (total_count + limit - 1) // limit if total_count is not None else None,
+            "next_cursor": next_cursor(trainers, limit, TRAINER_SORT)
         }
+        if raw:
+            return raw_list_response("trainers", trainers, page_info, headers=etag_headers(etag))
+        return BSONJSONResponse({"trainers": trainers, **page_info}, headers=etag_headers(etag))
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Get trainer by ID
-@router.get("/get/trainer/{trainer_id}", response_model=dict)
-async def get_trainer_by_id(trainer_id: str):
-    """Get a specific trainer by ID."""
+@router.get("/get/trainer/{trainer_id}")
+async def get_trainer_by_id(
+    request: Request,
+    trainer_id: str,
+    fields: Optional[str] = None,
+    view: Optional[str] = None
+):
+    """
+    Get a specific trainer by ID. `fields`/`view` limit the returned fields.
+    Honours If-None-Match with a 304 when the trainer has not changed.
+    """
     try:
-        trainer_collection = await mongo.get_collection("trainers")
+        trainer_collection = await mongo.get_read_collection("trainers", "get_trainer_by_id")
+        
+        if request.headers.get("if-none-match"):
+            # Revalidation needs only the version fields (covered by an index)
+            version = await trainer_collection.find_one({"trainer_id": trainer_id}, VERSION_PROJECTION)
+            if not version:
+                raise HTTPException(status_code=404, detail="Trainer not found.")
+            etag = document_etag(request, version)
+            if etag_matches(request, etag):
+                return not_modified(etag)
         
-        trainer = await trainer_collection.find_one({"trainer_id": trainer_id})
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=["trainer_id", *VERSION_FIELDS])
+        trainer = await trainer_collection.find_one({"trainer_id": trainer_id}, projection)
         
         if not trainer:
             raise HTTPException(status_code=404, detail="Trainer not found.")
         
-        trainer["_id"] = str(trainer["_id"])
-        return trainer
+        return BSONJSONResponse(trainer, headers=etag_headers(document_etag(request, trainer)))
     
     except HTTPException as he:
         raise he
@@ -173,128 +257,88 @@ async def get_trainer_by_id(trainer_id: str):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Update trainer
-@router.put("/update/trainer/{trainer_id}", response_model=dict)
-async def update_trainer(trainer_id: str, trainer_update: TrainerUpdate):
-    """Update an existing trainer."""
+@router.put("/update/trainer/{trainer_id}")
+async def update_trainer(
+    trainer_id: str,
+    trainer_update: TrainerUpdate,
+    fields: Optional[str] = None,
+    view: Optional[str] = None
+):
+    """
+    Update an existing trainer and return it. Only the fields present in the
+    body are written: nested objects are patched field by field (sending
+    `{"pricing": {"per_session": 40}}` keeps the other prices) and lists are
+    replaced. `fields`/`view` limit the returned trainer. An update that
+    changes nothing is not written.
+    """
     try:
         trainer_collection = await mongo.get_collection("trainers")
         
-        # Check if trainer exists
-        existing_trainer = await trainer_collection.find_one({"trainer_id": trainer_id})
-        if not existing_trainer:
-            raise HTTPException(status_code=404, detail="Trainer not found.")
-        
-        # Build update dictionary with only provided fields
-        update_data = {"updated_at": datetime.utcnow()}
-        
-        # Basic Details
-        if trainer_update.full_name is not None:
-            update_data["full_name"] = trainer_update.full_name
-        if trainer_update.experience is not None:
-            update_data["experience"] = trainer_update.experience
-        if trainer_update.primary_specialization is not None:
-            update_data["primary_specialization"] = trainer_update.primary_specialization
-        if trainer_update.languages is not None:
-            update_data["languages"] = trainer_update.languages
-        if trainer_update.short_bio is not None:
-            update_data["short_bio"] = trainer_update.short_bio
-        
-        # Skills & Certifications
-        if trainer_update.skills is not None:
-            update_data["skills"] = {
-                "hatha_yoga": trainer_update.skills.hatha_yoga,
-                "mobility_flexibility": trainer_update.skills.mobility_flexibility,
-                "strength_training": trainer_update.skills.strength_training,
-                "guided_meditation": trainer_update.skills.guided_meditation,
-                "rehab_friendly_workouts": trainer_update.skills.rehab_friendly_workouts,
-            }
-        
-        if trainer_update.certifications is not None:
-            update_data["certifications"] = [
-                {
-                    "title": cert.title,
-                    "description": cert.description,
-                    "file_url": cert.file_url,
-                    "file_name": cert.file_name,
-                    "file_size": cert.file_size,
-                }
-                for cert in trainer_update.certifications
-            ]
-        
-        # Availability
-        if trainer_update.preferred_mode is not None:
-            update_data["preferred_mode"] = {
-                "online": trainer_update.preferred_mode.online,
-                "in_person": trainer_update.preferred_mode.in_person,
-            }
-        
-        if trainer_update.weekly_schedule is not None:
-            update_data["weekly_schedule"] = [
-                {
-                    "days": schedule.days,
-                    "checked": schedule.checked,
-                    "time_slots": schedule.time_slots,
-                }
-                for schedule in trainer_update.weekly_schedule
-            ]
-        
-        # Pricing & Media
-        if trainer_update.pricing is not None:
-            update_data["pricing"] = {
-                "per_session": trainer_update.pricing.per_session,
-                "weekly_plan": trainer_update.pricing.weekly_plan,
-                "monthly_plan": trainer_update.pricing.monthly_plan,
-                "currency": trainer_update.pricing.currency,
-            }
-        
-        if trainer_update.media is not None:
-            update_data["media"] = {
-                "profile_photo_url": trainer_update.media.profile_photo_url,
-                "profile_photo_name": trainer_update.media.profile_photo_name,
-                "intro_video_url": trainer_update.media.intro_video_url,
-                "intro_video_name": trainer_update.media.intro_video_name,
-                "publish_status": trainer_update.media.publish_status,
-            }
+        changes = explicit_paths(trainer_update)
+        if "weekly_schedule" in changes:
+            changes["availability"] = availability(trainer_update.weekly_schedule)
+        
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS)
+        # The write also reads back what the search index needs; those extra
+        # fields are trimmed from the response again
+        write_projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=list(SEARCH_INDEX_PROJECTION))
+        
+        updated_trainer = None
+        if changes:
+            pipeline = [literal_set_stage({**changes, "updated_at": datetime.utcnow()})]
+            if any(path.startswith("skills.") for path in changes):
+                # Recomputed server-side from the merged skills
+                pipeline.append({"$set": {"skills_mask": skills_mask_expression()}})
+            
+            # Matches only when some field actually differs, in the same round trip
+            updated_trainer = await trainer_collection.find_one_and_update(
+                {"trainer_id": trainer_id, **changed_filter(changes)},
+                pipeline,
+                projection=write_projection,
+                return_document=ReturnDocument.AFTER
+            )
         
-        if trainer_update.status is not None:
-            update_data["status"] = trainer_update.status
+        if updated_trainer is None:
+            trainer = await trainer_collection.find_one({"trainer_id": trainer_id}, projection)
+            if trainer is None:
+                raise HTTPException(status_code=404, detail="Trainer not found.")
+            return BSONJSONResponse({"message": "No changes", "trainer": trainer})
         
-        # Perform update
-        result = await trainer_collection.update_one(
-            {"trainer_id": trainer_id},
-            {"$set": update_data}
-        )
+        trainer_search_index.upsert(updated_trainer)
+        count_cache.clear()
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Trainer not found.")
-        
-        return {"message": "Trainer updated successfully"}
+        return BSONJSONResponse({"message": "Trainer updated successfully", "trainer": trim_to_projection(updated_trainer, projection)})
     
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=400, 
+            detail="Trainer with similar name and specialization already exists."
+        )
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Delete trainer (soft delete by changing status)
-@router.delete("/delete/trainer/{trainer_id}", response_model=dict)
+@router.delete("/delete/trainer/{trainer_id}")
 async def delete_trainer(trainer_id: str):
     """Delete a trainer (soft delete - change status to 'deleted')."""
     try:
         trainer_collection = await mongo.get_collection("trainers")
         
-        # Check if trainer exists
-        existing_trainer = await trainer_collection.find_one({"trainer_id": trainer_id})
-        if not existing_trainer:
-            raise HTTPException(status_code=404, detail="Trainer not found.")
-        
-        # Soft delete by updating status
-        result = await trainer_collection.update_one(
-            {"trainer_id": trainer_id},
-            {"$set": {"status": "deleted", "updated_at": datetime.utcnow()}}
+        # Soft delete by updating status; already deleted trainers are not rewritten
+        deleted = await trainer_collection.find_one_and_update(
+            {"trainer_id": trainer_id, "status": {"$ne": "deleted"}},
+            {"$set": {"status": "deleted", "updated_at": datetime.utcnow()}},
+            projection={"_id": 1}
         )
         
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Trainer not found.")
+        if deleted is None:
+            if not await trainer_collection.find_one({"trainer_id": trainer_id}, {"_id": 1}):
+                raise HTTPException(status_code=404, detail="Trainer not found.")
+            return {"message": "Trainer already deleted"}
+        trainer_search_index.remove(trainer_id)
+        count_cache.clear()
         
         return {"message": "Trainer deleted successfully (soft delete)"}
     
@@ -304,7 +348,7 @@ async def delete_trainer(trainer_id: str):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Hard delete trainer (permanent removal)
-@router.delete("/hard-delete/trainer/{trainer_id}", response_model=dict)
+@router.delete("/hard-delete/trainer/{trainer_id}")
 async def hard_delete_trainer(trainer_id: str):
     """Permanently delete a trainer from database."""
     try:
@@ -314,6 +358,8 @@ async def hard_delete_trainer(trainer_id: str):
         
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Trainer not found.")
+        trainer_search_index.remove(trainer_id)
+        count_cache.clear()
         
         return {"message": "Trainer permanently deleted"}
     
@@ -323,65 +369,160 @@ async def hard_delete_trainer(trainer_id: str):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Get trainers by specialization
-@router.get("/get/trainers/by/specialization/{specialization}", response_model=dict)
+@router.get("/get/trainers/by/specialization/{specialization}")
 async def get_trainers_by_specialization(
+    request: Request,
     specialization: str,
-    page: int = 1,
-    limit: int = 10
+    page: int = Query(1, **PAGE_QUERY),
+    limit: int = Query(10, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    count: str = "exact",
+    raw: bool = False
 ):
-    """Get trainers by their primary specialization."""
+    """
+    Get trainers by their primary specialization. `raw=true` returns them as
+    Extended JSON transcoded straight from BSON.
+    """
     try:
-        trainer_collection = await mongo.get_collection("trainers")
+        get_collection = mongo.get_raw_collection if raw else mongo.get_read_collection
+        trainer_collection = await get_collection("trainers", "get_trainers_by_specialization")
         
         filter_query = {
             "primary_specialization": specialization,
             "status": "active"
         }
         
-        skip = (page - 1) * limit
-        total_count = await trainer_collection.count_documents(filter_query)
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=LIST_REQUIRED_FIELDS)
+        trainers, total_count = await fetch_page(
+            trainer_collection, filter_query, TRAINER_SORT, limit, page, cursor, projection, count
+        )
         
-        trainers_cursor = trainer_collection.find(filter_query).skip(skip).limit(limit)
-        trainers = []
+        etag = list_etag(request, trainers, total_count)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        async for trainer in trainers_cursor:
-            trainer["_id"] = str(trainer["_id"])
-            trainers.append(trainer)
+        page_info = {
+            "total": total_count,
+            "page": page,
+            "limit": limit,
+            "specialization": specialization,
+            "next_cursor": next_cursor(trainers, limit, TRAINER_SORT)
+        }
+        if raw:
+            return raw_list_response("trainers", trainers, page_info, headers=etag_headers(etag))
+        return BSONJSONResponse({"trainers": trainers, **page_info}, headers=etag_headers(etag))
+    
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+# Get trainers available on a day and time window
+@router.get("/get/trainers/available")
+async def get_available_trainers(
+    request: Request,
+    day: str,
+    start: str,
+    end: Optional[str] = None,
+    mode: Optional[str] = None,
+    page: int = Query(1, **PAGE_QUERY),
+    limit: int = Query(10, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    count: str = "exact",
+    raw: bool = False
+):
+    """
+    Active trainers free for the whole `start`-`end` window on `day`
+    (e.g. day=tuesday&start=18:00&end=19:00; `end` defaults to one hour
+    after `start`), optionally filtered by `mode` (online or in_person).
+    A window past midnight (start=23:30&end=00:30) continues into the next day.
+    `raw=true` returns them as Extended JSON transcoded straight from BSON.
+    """
+    try:
+        get_collection = mongo.get_raw_collection if raw else mongo.get_read_collection
+        trainer_collection = await get_collection("trainers", "get_available_trainers")
+        
+        day_index = parse_day(day)
+        window_start = parse_time(start)
+        window_end = parse_time(end) if end else (window_start + 60 if window_start is not None else None)
+        if day_index is None:
+            raise HTTPException(status_code=400, detail=f"Invalid day '{day}'.")
+        if window_start is None or window_end is None or window_end == window_start:
+            raise HTTPException(status_code=400, detail="Invalid time window.")
+        if mode is not None and mode not in ("online", "in_person"):
+            raise HTTPException(status_code=400, detail="mode must be 'online' or 'in_person'.")
+        
+        filter_query = {"status": "active", **availability_filter(day_index, window_start, window_end)}
+        if mode:
+            filter_query[f"preferred_mode.{mode}"] = True
+        
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=LIST_REQUIRED_FIELDS)
+        trainers, total_count = await fetch_page(
+            trainer_collection, filter_query, TRAINER_SORT, limit, page, cursor, projection, count
+        )
         
-        return {
-            "trainers": trainers,
+        etag = list_etag(request, trainers, total_count)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        page_info = {
             "total": total_count,
             "page": page,
             "limit": limit,
-            "specialization": specialization
+            "next_cursor": next_cursor(trainers, limit, TRAINER_SORT)
         }
+        if raw:
+            return raw_list_response("trainers", trainers, page_info, headers=etag_headers(etag))
+        return BSONJSONResponse({"trainers": trainers, **page_info}, headers=etag_headers(etag))
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # Search trainers with multiple filters
-@router.get("/search/trainers", response_model=dict)
+@router.get("/search/trainers")
 async def search_trainers(
+    request: Request,
     query: Optional[str] = None,
     min_experience: Optional[int] = None,
     max_experience: Optional[int] = None,
-    languages: Optional[List[str]] = None,
-    skills: Optional[List[str]] = None,
-    page: int = 1,
-    limit: int = 10
+    languages: Optional[List[str]] = Query(None),
+    skills: Optional[List[str]] = Query(None),
+    page: int = Query(1, **PAGE_QUERY),
+    limit: int = Query(10, **LIMIT_QUERY),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    count: str = "exact"
 ):
-    """Advanced search for trainers with multiple filters."""
+    """
+    Advanced search for trainers with multiple filters. Results of a text
+    `query` are ordered by relevance, best match first.
+    """
     try:
-        trainer_collection = await mongo.get_collection("trainers")
+        trainer_collection = await mongo.get_read_collection("trainers", "search_trainers")
         
         # Build filter query
         filter_query = {"status": "active"}
         
-        if query:
+        ranked = None
+        if query and trainer_search_index.ready and tokenize(query):
+            # Relevance-ranked ids from the in-process inverted index
+            ranked = trainer_search_index.search(query)
+            filter_query["trainer_id"] = {"$in": [trainer_id for trainer_id, _ in ranked]}
+        elif query:
+            # Index not loaded, or no word tokens to look up (e.g. "++"):
+            # fall back to an escaped substring match
+            pattern = re.escape(query)
             filter_query["$or"] = [
-                {"full_name": {"$regex": query, "$options": "i"}},
-                {"primary_specialization": {"$regex": query, "$options": "i"}},
-                {"short_bio": {"$regex": query, "$options": "i"}},
+                {"full_name": {"$regex": pattern, "$options": "i"}},
+                {"primary_specialization": {"$regex": pattern, "$options": "i"}},
+                {"short_bio": {"$regex": pattern, "$options": "i"}},
             ]
         
         if min_experience is not None:
@@ -397,32 +538,33 @@ async def search_trainers(
             filter_query["languages"] = {"$in": languages}
         
         if skills:
-            # Convert skills list to skill queries
-            skill_queries = []
-            for skill in skills:
-                skill_field = skill.lower().replace(" ", "_")
-                if skill_field in ["hatha_yoga", "mobility_flexibility", "strength_training", 
-                                  "guided_meditation", "rehab_friendly_workouts"]:
-                    skill_queries.append({f"skills.{skill_field}": True})
-            
-            if skill_queries:
-                filter_query["$and"] = skill_queries
-        
-        skip = (page - 1) * limit
-        total_count = await trainer_collection.count_documents(filter_query)
-        
-        trainers_cursor = trainer_collection.find(filter_query).skip(skip).limit(limit)
-        trainers = []
+            # All requested skills must be set in the precomputed skills_mask
+            required_mask = skills_filter_mask(skills)
+            if required_mask:
+                filter_query["skills_mask"] = {"$bitsAllSet": required_mask}
+        
+        projection = build_projection(fields, view, TRAINER_VIEWS, TRAINER_FIELDS, required=LIST_REQUIRED_FIELDS)
+        if ranked is not None:
+            trainers, total_count, next_page_cursor = await _ranked_search_page(
+                trainer_collection, filter_query, ranked, limit, page, cursor, projection, count
+            )
+        else:
+            trainers, total_count = await fetch_page(
+                trainer_collection, filter_query, TRAINER_SORT, limit, page, cursor, projection, count
+            )
+            next_page_cursor = next_cursor(trainers, limit, TRAINER_SORT)
         
-        async for trainer in trainers_cursor:
-            trainer["_id"] = str(trainer["_id"])
-            trainers.append(trainer)
+        # Relevance scores shift as other trainers change, so they are part of the tag
+        etag = list_etag(request, trainers, total_count, next_page_cursor, [trainer.get("search_score") for trainer in trainers])
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        return {
+        return BSONJSONResponse({
             "trainers": trainers,
             "total": total_count,
             "page": page,
             "limit": limit,
+            "next_cursor": next_page_cursor,
             "filters_applied": {
                 "query": query,
                 "min_experience": min_experience,
@@ -430,7 +572,53 @@ async def search_trainers(
                 "languages": languages,
                 "skills": skills
             }
-        }
+        }, headers=etag_headers(etag))
     
+    except HTTPException as he:
+        raise he
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+async def _ranked_search_page(trainer_collection, filter_query, ranked, limit, page, cursor, projection, count="exact"):
+    """
+    Cut one page out of the relevance ranking, keeping only the trainers that
+    also pass the other filters. Returns (trainers, total, next_cursor); the
+    total follows `count` like fetch_page.
+    """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid count '{count}'. Use one of: {', '.join(COUNT_MODES)}")
+
+    # The index can lag behind the collection, so ranked ids are only a
+    # superset of the matches until they are checked against filter_query
+    filtered = bool(set(filter_query) - {"status", "trainer_id"})
+    if filtered:
+        matching = set(await trainer_collection.distinct("trainer_id", filter_query))
+        ranked = [(trainer_id, score) for trainer_id, score in ranked if trainer_id in matching]
+
+    offset = decode_cursor(cursor, RANK_SORT)[0] if cursor else (page - 1) * limit
+    page_scores = dict(ranked[offset:offset + limit])
+
+    documents = {}
+    page_filter = {**filter_query, "trainer_id": {"$in": list(page_scores)}}
+    async for trainer in trainer_collection.find(page_filter, projection):
+        documents[trainer["trainer_id"]] = trainer
+
+    trainers = []
+    for trainer_id, score in page_scores.items():
+        trainer = documents.get(trainer_id)
+        if trainer is not None:
+            trainer["search_score"] = round(score, 4)
+            trainers.append(trainer)
+
+    if count == "none":
+        total = None
+    elif filtered:
+        total = len(ranked)  # already checked against filter_query
+    elif count == "exact":
+        total = await trainer_collection.count_documents(filter_query)
+    else:
+        total = await cached_count(trainer_collection, filter_query)
+
+    has_more = offset + limit < len(ranked)
+    return trainers, total, encode_cursor({"_rank": offset + limit}, RANK_SORT) if has_more else None
@@ -1,21 +1,126 @@
 from dotenv import load_dotenv
+import importlib.util
 import os
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+# Module pymongo needs for each wire compressor; without it the compressor
+# is silently dropped from the handshake
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _optional_int(name: str):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+
 class Settings:
     def __init__(self):
         self.MONGO_URI = os.getenv("MONGO_DB_URL")
         self.MONGO_DB = os.getenv("MONGO_DB_NAME")
         # self.ADV_MONGO_DB = os.getenv("ADV_MONGO_DB_NAME")
 
+        # Reconcile app/db/indexes.py specs during startup
+        self.MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+        # Refuse to start when a unique index is missing, instead of falling
+        # back to app-level duplicate checks
+        self.MONGO_STRICT_UNIQUE_INDEXES = os.getenv("MONGO_STRICT_UNIQUE_INDEXES", "false").lower() == "true"
+
+        # Connection pool / wire tuning (unset values keep the driver defaults)
+        self.MONGO_MAX_POOL_SIZE = _optional_int("MONGO_MAX_POOL_SIZE")
+        self.MONGO_MIN_POOL_SIZE = _optional_int("MONGO_MIN_POOL_SIZE")
+        self.MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+        self.MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+        self.MONGO_SERVER_SELECTION_TIMEOUT_MS = _optional_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+        # Comma separated, in order of preference: "zstd,snappy,zlib"
+        self.MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+        self.MONGO_ZLIB_COMPRESSION_LEVEL = _optional_int("MONGO_ZLIB_COMPRESSION_LEVEL")
+
+        # Read routing (app/db/read_routing.py); max staleness must be >= 90 seconds
+        self.MONGO_READ_ROUTING = os.getenv("MONGO_READ_ROUTING", "true").lower() == "true"
+        self.MONGO_READ_MAX_STALENESS_S = _optional_int("MONGO_READ_MAX_STALENESS_S")
+
+        # Command monitoring: commands slower than this go to the slow-query log
+        self.MONGO_SLOW_QUERY_MS = int(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+        self.MONGO_SLOW_QUERY_LOG_SIZE = int(os.getenv("MONGO_SLOW_QUERY_LOG_SIZE", "200"))
+
+        # Largest `limit` accepted by the paginated list endpoints
+        self.MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "100"))
+        # Largest `batch_size` of the streaming and export endpoints
+        self.MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "5000"))
+        # Largest `radius_km` of the gyms-near search
+        self.MAX_NEAR_RADIUS_KM = float(os.getenv("MAX_NEAR_RADIUS_KM", "100"))
+
+        # Lifetime of cached totals for list endpoints called with count=estimated
+        self.MONGO_COUNT_CACHE_TTL_S = int(os.getenv("MONGO_COUNT_CACHE_TTL_S", "30"))
+
+        # In-process cache for the category / facility reference tables
+        self.REFERENCE_CACHE_TTL_S = int(os.getenv("REFERENCE_CACHE_TTL_S", "300"))
+        self.REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "256"))
+
+        # Bulk create / upsert endpoints: items per bulk_write and per request
+        self.BULK_WRITE_CHUNK_SIZE = int(os.getenv("BULK_WRITE_CHUNK_SIZE", "500"))
+        self.BULK_WRITE_CHUNK_SIZE_MAX = int(os.getenv("BULK_WRITE_CHUNK_SIZE_MAX", "5000"))
+        self.BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+        # Largest JSON array body (it is parsed whole) / NDJSON line accepted
+        self.BULK_MAX_BODY_BYTES = int(os.getenv("BULK_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+
+        # Load the in-process trainer search index at startup (else regex fallback)
+        self.TRAINER_SEARCH_INDEX = os.getenv("TRAINER_SEARCH_INDEX", "true").lower() == "true"
+
+        # Invalidate in-process caches from a change stream (needs a replica
+        # set; without one the watcher polls, see below)
+        self.CHANGE_STREAMS = os.getenv("CHANGE_STREAMS", "true").lower() == "true"
+        # In ttl_only mode (no change streams, or CHANGE_STREAMS=false) poll
+        # for documents updated since the last poll this often, for the
+        # caches without a TTL such as the search index; 0 disables it
+        self.CHANGE_STREAM_FALLBACK_REFRESH_S = int(os.getenv("CHANGE_STREAM_FALLBACK_REFRESH_S", "60"))
+
+        # S3 media storage (app/utils/s3.py creates the client on first use)
+        self.AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
+        self.AWS_SECRET_KEY = os.getenv("AWS_SECRET_KEY")
+        self.AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+        self.AWS_REGION = os.getenv("AWS_REGION")
+        self.AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", "10"))
+
         if not isinstance(self.MONGO_URI, str) or not self.MONGO_URI.strip():
             raise ValueError("Environment variable 'MONGO_DATABASE_URL' is missing or not set correctly.")
 
         if not isinstance(self.MONGO_DB, str) or not self.MONGO_DB.strip():
             raise ValueError("Environment variable 'MONGO_DB_NAME' is missing or not set correctly.")
 
+        for compressor in self.mongo_compressors:
+            if compressor not in COMPRESSOR_MODULES:
+                raise ValueError(f"Unsupported MONGO_COMPRESSORS entry '{compressor}'. Use zstd, snappy or zlib.")
+            if importlib.util.find_spec(COMPRESSOR_MODULES[compressor]) is None:
+                raise ValueError(
+                    f"MONGO_COMPRESSORS entry '{compressor}' needs the '{COMPRESSOR_MODULES[compressor]}' module, which is not installed."
+                )
+
+        if self.MONGO_READ_MAX_STALENESS_S is not None and 0 <= self.MONGO_READ_MAX_STALENESS_S < 90:
+            raise ValueError("MONGO_READ_MAX_STALENESS_S must be at least 90 seconds (or -1 for no limit).")
+
+    @property
+    def mongo_compressors(self) -> list:
+        return [c.strip() for c in self.MONGO_COMPRESSORS.split(",") if c.strip()]
+
+    def mongo_client_options(self) -> dict:
+        """Keyword arguments for AsyncIOMotorClient built from the tuning settings."""
+        options = {
+            "maxPoolSize": self.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": self.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": self.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": self.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": self.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "zlibCompressionLevel": self.MONGO_ZLIB_COMPRESSION_LEVEL,
+        }
+        options = {key: value for key, value in options.items() if value is not None}
+        if self.mongo_compressors:
+            options["compressors"] = ",".join(self.mongo_compressors)
+        return options
+
     # mysql_host = os.getenv("MYSQL_HOST")
     # mysql_port = int(os.getenv("MYSQL_PORT"))
     # mysql_user = os.getenv("MYSQL_USER")
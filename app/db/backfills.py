@@ -0,0 +1,91 @@
+"""
+Backfill jobs for derived fields stored on existing documents.
+
+    python -m app.db.backfills skills_mask --dry-run
+    python -m app.db.backfills skills_mask --batch-size 500
+    python -m app.db.backfills availability
+"""
+import argparse
+import asyncio
+import logging
+from pymongo import UpdateOne
+from app.utils.trainer_fields import availability, skills_mask
+
+
+async def _backfill(collection, projection: dict, derive, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """
+    Recompute derived fields with `derive(document) -> dict` and write the
+    ones that changed with unordered bulk updates of `batch_size`.
+    """
+    stats = {"scanned": 0, "updated": 0}
+    batch = []
+    async for document in collection.find({}, projection).batch_size(batch_size):
+        stats["scanned"] += 1
+        derived = derive(document)
+        if all(document.get(field) == value for field, value in derived.items()):
+            continue
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": derived}))
+        if len(batch) >= batch_size:
+            stats["updated"] += await _flush(collection, batch, dry_run)
+            batch = []
+    if batch:
+        stats["updated"] += await _flush(collection, batch, dry_run)
+    logging.info(f"Backfill on '{collection.name}': {stats}")
+    return stats
+
+
+async def _flush(collection, batch: list, dry_run: bool) -> int:
+    if dry_run:
+        return len(batch)
+    result = await collection.bulk_write(batch, ordered=False)
+    return result.modified_count
+
+
+async def backfill_skills_mask(collection, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Populate `skills_mask` on trainers from their `skills` sub-document."""
+    return await _backfill(
+        collection,
+        {"skills": 1, "skills_mask": 1},
+        lambda trainer: {"skills_mask": skills_mask(trainer.get("skills"))},
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+
+
+async def backfill_availability(collection, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Populate `availability` minute intervals on trainers from `weekly_schedule`."""
+    return await _backfill(
+        collection,
+        {"weekly_schedule": 1, "availability": 1},
+        lambda trainer: {"availability": availability(trainer.get("weekly_schedule"))},
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+
+
+# name -> (collection, job)
+BACKFILLS = {
+    "skills_mask": ("trainers", backfill_skills_mask),
+    "availability": ("trainers", backfill_availability),
+}
+
+
+async def _main(args):
+    from app.db.database import mongo
+
+    await mongo.connect()
+    try:
+        collection_name, job = BACKFILLS[args.job]
+        stats = await job(await mongo.get_collection(collection_name), batch_size=args.batch_size, dry_run=args.dry_run)
+        prefix = "[dry-run] would update" if args.dry_run else "updated"
+        print(f"{args.job}: scanned {stats['scanned']}, {prefix} {stats['updated']}")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill derived fields on existing documents.")
+    parser.add_argument("job", choices=sorted(BACKFILLS))
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="only count the documents that would change")
+    asyncio.run(_main(parser.parse_args()))
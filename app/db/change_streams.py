@@ -0,0 +1,221 @@
+"""
+Cross-worker cache invalidation.
+
+Every worker keeps its own in-process caches (reference tables, counts, the
+trainer search index). ChangeStreamWatcher follows one change stream over
+the watched collections and hands each change to the handlers subscribed
+for that collection, so a write made by any worker or pod reaches all of
+them.
+
+Without a replica set (no change streams), or with CHANGE_STREAMS=false, the
+watcher runs in "ttl_only" mode: caches with a TTL are only as fresh as
+their TTL, and the handlers that follow documents (subscribed with
+`full_document_fields`, e.g. the search index, which has no TTL) are fed the
+documents whose `updated_at` moved since the previous poll.
+"""
+import asyncio
+import inspect
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+from pymongo.errors import OperationFailure, PyMongoError
+from app.db.monitoring import WATCH_ROUTE_PREFIX, current_route
+
+# Server errors meaning change streams are not available at all
+# (standalone server, or the storage engine does not support them)
+UNSUPPORTED_CODES = {40573, 40324, 115}
+
+# The resume token can no longer be used: start a new stream
+LOST_TOKEN_CODES = {260, 280, 286}  # InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost
+
+MAX_BACKOFF_S = 60
+
+# How long an idle getMore waits on the server for new events
+MAX_AWAIT_TIME_MS = 1000
+
+# ttl_only polls look back this much further than the previous poll, to
+# cover clock skew between the app servers that stamp `updated_at`
+POLL_OVERLAP_S = 5
+
+
+class ChangeStreamWatcher:
+    """
+    Run with start(db) / stop(). Handlers take the change event; they may be
+    coroutines. Events other than insert/update/replace/delete (drop, rename,
+    invalidate) are passed on too, so handlers should treat them as "clear
+    everything".
+    """
+
+    def __init__(self, name: str, collections: Iterable[str], fallback_refresh_s: float = 60):
+        self.name = name
+        self.collections = tuple(collections)
+        self.fallback_refresh_s = fallback_refresh_s
+        self.mode = "stopped"
+        self.resume_token = None
+        self.events = 0
+        self.errors = 0
+        self.restarts = 0
+        self.refreshes = 0
+        self._handlers = defaultdict(list)  # collection -> [(handler, follows documents)]
+        self._full_document_fields = set()
+        self._task = None
+
+    def subscribe(self, collection: str, handler: Callable, full_document_fields: Iterable[str] = ()):
+        """
+        Call `handler(change)` for every change to `collection`. Fields listed
+        in `full_document_fields` are included in `change["fullDocument"]`
+        (the document after the change) for inserts, updates and replaces.
+        """
+        if collection not in self.collections:
+            raise ValueError(f"'{collection}' is not watched by {self.name}")
+        full_document_fields = tuple(full_document_fields)
+        self._handlers[collection].append((handler, bool(full_document_fields)))
+        self._full_document_fields.update(full_document_fields)
+
+    def _pipeline(self) -> list:
+        project = {"operationType": 1, "ns": 1, "documentKey": 1}
+        project.update({f"fullDocument.{field}": 1 for field in self._full_document_fields})
+        return [
+            {"$match": {"ns.coll": {"$in": list(self.collections)}}},
+            {"$project": project},
+        ]
+
+    async def start(self, db, change_streams: bool = True):
+        """
+        Start following changes in the background. With `change_streams`
+        False the watcher goes straight to ttl_only polling.
+        """
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(db) if change_streams else self._poll(db))
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.mode = "stopped"
+
+    async def _run(self, db):
+        current_route.set(WATCH_ROUTE_PREFIX + self.name)
+        backoff = 1
+        while True:
+            try:
+                async with db.watch(
+                    self._pipeline(),
+                    full_document="updateLookup" if self._full_document_fields else None,
+                    resume_after=self.resume_token,
+                    max_await_time_ms=MAX_AWAIT_TIME_MS,
+                ) as stream:
+                    if self.mode != "change_streams":
+                        logging.info(f"Change stream '{self.name}' watching {', '.join(self.collections)}.")
+                    self.mode = "change_streams"
+                    backoff = 1
+                    while stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            await self._dispatch(change)
+                        # Advances on idle batches too, so a reconnect resumes close to now
+                        self.resume_token = stream.resume_token
+            except OperationFailure as e:
+                if e.code in UNSUPPORTED_CODES:
+                    self._fall_back(e)
+                    await self._poll(db)
+                    return
+                self.errors += 1
+                if e.code in LOST_TOKEN_CODES:
+                    # Changes since the token are gone: start over and drop
+                    # everything the missed changes could have made stale
+                    logging.warning(f"Change stream '{self.name}' cannot resume ({e}); starting a new stream.")
+                    self.resume_token = None
+                    await self._dispatch_all()
+                else:
+                    logging.warning(f"Change stream '{self.name}' failed: {e}")
+            except PyMongoError as e:
+                # Network errors that the driver could not resume from itself
+                self.errors += 1
+                logging.warning(f"Change stream '{self.name}' interrupted: {e}")
+            except Exception as e:
+                self._fall_back(e)
+                await self._poll(db)
+                return
+            self.restarts += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_S)
+
+    def _fall_back(self, error: Exception):
+        logging.warning(f"Change streams unavailable ({error}); in-process caches rely on their TTL and polling.")
+
+    async def _poll(self, db):
+        """
+        ttl_only mode: every fallback_refresh_s, hand the documents whose
+        `updated_at` moved since the last poll to the handlers that follow
+        documents, as update events. Caches with a TTL are left to it.
+        """
+        self.mode = "ttl_only"
+        if self.fallback_refresh_s <= 0:
+            return
+        current_route.set(WATCH_ROUTE_PREFIX + self.name)
+        since = datetime.utcnow()
+        while True:
+            await asyncio.sleep(self.fallback_refresh_s)
+            polled_at = datetime.utcnow()
+            try:
+                await self.poll_once(db, since - timedelta(seconds=POLL_OVERLAP_S))
+                since = polled_at
+            except PyMongoError as e:
+                self.errors += 1
+                logging.warning(f"Polling for '{self.name}' failed: {e}")
+
+    async def poll_once(self, db, since: datetime):
+        self.refreshes += 1
+        projection = {field: 1 for field in self._full_document_fields}
+        for collection in self.collections:
+            handlers = [handler for handler, follows_documents in self._handlers.get(collection, ()) if follows_documents]
+            if not handlers:
+                continue
+            async for document in db[collection].find({"updated_at": {"$gt": since}}, projection):
+                change = {
+                    "operationType": "update",
+                    "ns": {"coll": collection},
+                    "documentKey": {"_id": document.get("_id")},
+                    "fullDocument": document,
+                }
+                await self._notify(change, handlers)
+
+    async def _dispatch(self, change: dict):
+        self.events += 1
+        await self._notify(change)
+
+    async def _notify(self, change: dict, handlers=None):
+        collection = change.get("ns", {}).get("coll")
+        if handlers is None:
+            handlers = [handler for handler, _ in self._handlers.get(collection, ())]
+        for handler in handlers:
+            try:
+                result = handler(change)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Change stream handler for '{collection}' failed: {e}")
+
+    async def _dispatch_all(self):
+        for collection in self.collections:
+            await self._notify({"operationType": "invalidate", "ns": {"coll": collection}})
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "collections": list(self.collections),
+            "events": self.events,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "refreshes": self.refreshes,
+            "resumable": self.resume_token is not None,
+        }
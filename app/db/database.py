@@ -1,12 +1,76 @@
+import logging
+from app.core.config import settings
 from app.db.mongodb import MongoDB
+from app.db.indexes import ensure_indexes, missing_unique, missing_unique_indexes
+from app.db.change_streams import ChangeStreamWatcher
+from app.utils.cache import category_cache, facility_cache
+from app.utils.pagination import count_cache
+from app.utils.search_index import trainer_search_index
 
 # Initialize MongoDB and MySQL instances
 mongo = MongoDB()
 
+# Keeps every worker's in-process caches in step with writes made elsewhere
+change_watcher = ChangeStreamWatcher(
+    "cache_invalidation",
+    ("gyms", "trainers", "categories", "facilities"),
+    fallback_refresh_s=settings.CHANGE_STREAM_FALLBACK_REFRESH_S,
+)
+
+
+def _clear(*caches):
+    def handler(change):
+        for cache in caches:
+            cache.clear()
+    return handler
+
+
+async def _sync_trainer_search_index(change):
+    if not trainer_search_index.ready:
+        return
+    if change["operationType"] in ("insert", "update", "replace"):
+        # fullDocument is missing when the trainer was deleted in the
+        # meantime; the delete event that follows handles it
+        if change.get("fullDocument") is not None:
+            trainer_search_index.upsert(change["fullDocument"])
+        return
+    if change["operationType"] == "delete":
+        # Hard deletes only carry the _id, not the trainer_id
+        trainer_search_index.remove_key(change["documentKey"]["_id"])
+        return
+    # drop / rename / invalidate, or a resume token that expired
+    await trainer_search_index.load(await mongo.get_collection("trainers"))
+
+
+change_watcher.subscribe("categories", _clear(category_cache))
+change_watcher.subscribe("facilities", _clear(facility_cache))
+change_watcher.subscribe("gyms", _clear(count_cache))
+change_watcher.subscribe("trainers", _clear(count_cache))
+change_watcher.subscribe(
+    "trainers", _sync_trainer_search_index,
+    full_document_fields=["_id", "trainer_id", "status", *trainer_search_index.fields],
+)
+
 
 async def connect_all():
     # Establish both MongoDB and MySQL connections
     await mongo.connect()
+    if settings.MONGO_ENSURE_INDEXES:
+        # Rebuilds drop the index first, so they are left to the CLI
+        await ensure_indexes(mongo.db, rebuild=False)
+    missing = await missing_unique_indexes(mongo.db)
+    if missing:
+        message = (
+            f"Unique indexes missing or failed to build: {', '.join(missing)}. "
+            "Remove the duplicates and run `python -m app.db.indexes`."
+        )
+        if settings.MONGO_STRICT_UNIQUE_INDEXES:
+            raise RuntimeError(message)
+        logging.error(f"{message} Duplicates are checked by the app until then.")
+    missing_unique.clear()
+    missing_unique.update(missing)
+    if settings.TRAINER_SEARCH_INDEX:
+        await trainer_search_index.load(await mongo.get_collection("trainers"))
    
 
 async def close_all():
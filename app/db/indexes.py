@@ -0,0 +1,318 @@
+"""
+Declarative index specs for the API collections.
+
+Missing indexes are created at startup (see connect_all); indexes that
+differ from their spec are only dropped and rebuilt from the command line:
+
+    python -m app.db.indexes --dry-run      # show what would change
+    python -m app.db.indexes                # create / rebuild indexes
+    python -m app.db.indexes --prune        # also drop indexes not in the spec
+    python -m app.db.indexes --explain      # flag router queries doing a COLLSCAN
+"""
+import argparse
+import asyncio
+import logging
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+from app.utils.pagination import CATEGORY_SORT, FACILITY_SORT, GYM_SORT, TRAINER_SORT
+
+# Options compared when deciding whether an existing index matches its spec.
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+DUPLICATE_KEY_ERROR = 11000
+
+# "collection.index" names of the unique specs connect_all found missing
+missing_unique = set()
+
+
+# Every spec needs a name so it can be reconciled against list_indexes().
+# The "*_unique" name indexes enforce duplicate checks for the create
+# handlers. They replaced non-unique indexes under new names, so a build that
+# fails on existing duplicates leaves the old index in place (listed as
+# "extra" until --prune) instead of dropping it; until the duplicates are
+# removed and the build succeeds, check_duplicates stands in for it.
+INDEX_SPECS = {
+    "trainers": [
+        {"name": "trainer_id_1", "keys": [("trainer_id", 1)], "unique": True},
+        # Covers the version-only lookup of conditional GETs (app.utils.etag)
+        {"name": "trainer_id_1_updated_at_1_created_at_1", "keys": [("trainer_id", 1), ("updated_at", 1), ("created_at", 1)]},
+        {
+            "name": "full_name_1_primary_specialization_1_unique",
+            "keys": [("full_name", 1), ("primary_specialization", 1)],
+            "unique": True,
+        },
+        {"name": "created_at_1_trainer_id_1", "keys": [("created_at", 1), ("trainer_id", 1)]},
+        # ttl_only polling of the change stream watcher (app.db.change_streams)
+        {"name": "updated_at_1", "keys": [("updated_at", 1)]},
+        {"name": "status_1_created_at_1_trainer_id_1", "keys": [("status", 1), ("created_at", 1), ("trainer_id", 1)]},
+        {
+            "name": "status_1_primary_specialization_1_created_at_1_trainer_id_1",
+            "keys": [("status", 1), ("primary_specialization", 1), ("created_at", 1), ("trainer_id", 1)],
+        },
+        {"name": "status_1_experience_1", "keys": [("status", 1), ("experience", 1)]},
+        {"name": "status_1_languages_1", "keys": [("status", 1), ("languages", 1)]},
+        {"name": "status_1_skills_mask_1", "keys": [("status", 1), ("skills_mask", 1)]},
+        {
+            "name": "status_1_availability.day_1_availability.start_1_availability.end_1",
+            "keys": [("status", 1), ("availability.day", 1), ("availability.start", 1), ("availability.end", 1)],
+        },
+    ],
+    "gyms": [
+        {"name": "gym_id_1", "keys": [("gym_id", 1)], "unique": True},
+        {"name": "gym_name_1_unique", "keys": [("gym_name", 1)], "unique": True},
+        {"name": "category_id_1", "keys": [("category_id", 1)]},
+        {"name": "created_at_1_gym_id_1", "keys": [("created_at", 1), ("gym_id", 1)]},
+        {"name": "location_2dsphere", "keys": [("location", "2dsphere")]},
+    ],
+    "categories": [
+        {"name": "category_id_1", "keys": [("category_id", 1)], "unique": True},
+        {"name": "category_name_1_unique", "keys": [("category_name", 1)], "unique": True},
+        {"name": "created_at_1_category_id_1", "keys": [("created_at", 1), ("category_id", 1)]},
+    ],
+    "facilities": [
+        {"name": "facility_id_1", "keys": [("facility_id", 1)], "unique": True},
+        {"name": "facility_name_1_unique", "keys": [("facility_name", 1)], "unique": True},
+        {"name": "created_at_1_facility_id_1", "keys": [("created_at", 1), ("facility_id", 1)]},
+    ],
+    "jobs": [
+        {"name": "job_id_1", "keys": [("job_id", 1)], "unique": True},
+    ],
+    "template_files": [
+        {"name": "template_id_1", "keys": [("template_id", 1)], "unique": True},
+    ],
+}
+
+
+# Representative filters issued by the routers, used by the explain report.
+ROUTER_QUERIES = [
+    {"route": "create_trainers_bulk", "collection": "trainers", "filter": {"full_name": "x", "primary_specialization": "x"}},
+    {"route": "get_all_trainers", "collection": "trainers", "filter": {}, "sort": TRAINER_SORT},
+    {"route": "get_all_trainers", "collection": "trainers", "filter": {"status": "active", "primary_specialization": "x"}, "sort": TRAINER_SORT},
+    {"route": "get_trainer_by_id", "collection": "trainers", "filter": {"trainer_id": "x"}},
+    {"route": "get_trainers_by_specialization", "collection": "trainers", "filter": {"primary_specialization": "x", "status": "active"}, "sort": TRAINER_SORT},
+    {"route": "search_trainers", "collection": "trainers", "filter": {"status": "active", "trainer_id": {"$in": ["x", "y"]}}},
+    {"route": "search_trainers", "collection": "trainers", "filter": {"status": "active", "experience": {"$gte": 1, "$lte": 10}}},
+    {"route": "search_trainers", "collection": "trainers", "filter": {"status": "active", "languages": {"$in": ["English"]}}},
+    {"route": "search_trainers", "collection": "trainers", "filter": {"status": "active", "skills_mask": {"$bitsAllSet": 5}}},
+    {
+        "route": "get_available_trainers",
+        "collection": "trainers",
+        "filter": {"status": "active", "availability": {"$elemMatch": {"day": 1, "start": {"$lte": 1080}, "end": {"$gte": 1140}}}},
+        "sort": TRAINER_SORT,
+    },
+    {
+        "route": "get_available_trainers",
+        "collection": "trainers",
+        "filter": {"status": "active", "$and": [
+            {"availability": {"$elemMatch": {"day": 6, "start": {"$lte": 1410}, "end": {"$gte": 1440}}}},
+            {"availability": {"$elemMatch": {"day": 0, "start": {"$lte": 0}, "end": {"$gte": 30}}}},
+        ]},
+        "sort": TRAINER_SORT,
+    },
+    {"route": "get_gyms", "collection": "gyms", "filter": {}, "sort": GYM_SORT},
+    {"route": "create_gyms_bulk", "collection": "gyms", "filter": {"gym_name": "x"}},
+    {"route": "update_gym", "collection": "gyms", "filter": {"gym_id": "x"}},
+    {"route": "patch_gym", "collection": "gyms", "filter": {"gym_id": "x"}},
+    {"route": "get_categories", "collection": "categories", "filter": {}, "sort": CATEGORY_SORT},
+    {"route": "create_categories_bulk", "collection": "categories", "filter": {"category_name": "x"}},
+    {"route": "update_category", "collection": "categories", "filter": {"category_id": "x"}},
+    {"route": "get_facilities", "collection": "facilities", "filter": {}, "sort": FACILITY_SORT},
+    {"route": "create_facilities_bulk", "collection": "facilities", "filter": {"facility_name": "x"}},
+    {"route": "update_facility", "collection": "facilities", "filter": {"facility_id": "x"}},
+    {"route": "upload_zip", "collection": "jobs", "filter": {"job_id": "x"}},
+]
+
+
+def _spec_options(spec: dict) -> dict:
+    return {option: spec[option] for option in INDEX_OPTIONS if option in spec}
+
+
+def _index_matches(existing: dict, spec: dict) -> bool:
+    if list(existing["key"].items()) != list(spec["keys"]):
+        return False
+    return _spec_options(existing) == _spec_options(spec)
+
+
+async def plan_indexes(db, prune: bool = False) -> list:
+    """
+    Compare INDEX_SPECS with the server and return the list of actions
+    needed as (action, collection, index_name) tuples.
+    """
+    actions = []
+    for collection_name, specs in INDEX_SPECS.items():
+        existing = {}
+        async for index in db[collection_name].list_indexes():
+            existing[index["name"]] = index
+
+        wanted = {spec["name"] for spec in specs}
+        for spec in specs:
+            current = existing.get(spec["name"])
+            if current is None:
+                actions.append(("create", collection_name, spec["name"]))
+            elif not _index_matches(current, spec):
+                actions.append(("rebuild", collection_name, spec["name"]))
+
+        for index_name in existing:
+            if index_name != "_id_" and index_name not in wanted:
+                actions.append(("drop" if prune else "extra", collection_name, index_name))
+    return actions
+
+
+async def ensure_indexes(db, dry_run: bool = False, prune: bool = False, rebuild: bool = True) -> list:
+    """
+    Create, rebuild (and optionally drop) indexes so they match INDEX_SPECS.
+    With `rebuild=False` mismatched indexes are only reported, since a
+    rebuild drops the index before building it again.
+    """
+    actions = await plan_indexes(db, prune=prune)
+    specs = {
+        (collection_name, spec["name"]): spec
+        for collection_name, collection_specs in INDEX_SPECS.items()
+        for spec in collection_specs
+    }
+
+    for action, collection_name, index_name in actions:
+        if dry_run or action == "extra":
+            continue
+        if action == "rebuild" and not rebuild:
+            logging.warning(f"Index {collection_name}.{index_name} differs from its spec; rebuild it with `python -m app.db.indexes`")
+            continue
+        collection = db[collection_name]
+        try:
+            if action in ("rebuild", "drop"):
+                await collection.drop_index(index_name)
+            if action in ("create", "rebuild"):
+                spec = specs[(collection_name, index_name)]
+                await collection.create_index(spec["keys"], name=index_name, **_spec_options(spec))
+            logging.info(f"Index {action}: {collection_name}.{index_name}")
+        except Exception as e:
+            logging.error(f"Index {action} failed for {collection_name}.{index_name}: {e}")
+    return actions
+
+
+async def missing_unique_indexes(db) -> list:
+    """
+    Names ("collection.index") of unique specs that are missing on the server
+    or do not match their spec. The create handlers rely on these indexes
+    alone to reject duplicates.
+    """
+    unique = {
+        (collection_name, spec["name"])
+        for collection_name, specs in INDEX_SPECS.items()
+        for spec in specs
+        if spec.get("unique")
+    }
+    return [
+        f"{collection_name}.{index_name}"
+        for action, collection_name, index_name in await plan_indexes(db)
+        if action in ("create", "rebuild") and (collection_name, index_name) in unique
+    ]
+
+
+async def find_duplicates(collection, documents: list, exclude: Optional[dict] = None) -> list:
+    """
+    For each document, the name of a unique spec in `missing_unique` whose
+    values another stored document (not matching `exclude`) already holds,
+    else None. Specs whose fields are not all in a document are skipped.
+    One query per missing spec; empty while every unique index is in place.
+    """
+    found = [None] * len(documents)
+    for spec in INDEX_SPECS.get(collection.name, []):
+        if not spec.get("unique") or f"{collection.name}.{spec['name']}" not in missing_unique:
+            continue
+        fields = [field for field, _ in spec["keys"]]
+        values = {
+            position: tuple(document[field] for field in fields)
+            for position, document in enumerate(documents)
+            if all(field in document for field in fields)
+        }
+        if not values:
+            continue
+
+        query = {"$or": [dict(zip(fields, key)) for key in dict.fromkeys(values.values())]}
+        if exclude:
+            query = {**exclude, **query}
+        taken = set()
+        async for document in collection.find(query, {field: 1 for field in fields}):
+            taken.add(tuple(document.get(field) for field in fields))
+        for position, key in values.items():
+            if found[position] is None and key in taken:
+                found[position] = spec["name"]
+    return found
+
+
+async def check_duplicates(collection, document: dict, exclude: Optional[dict] = None):
+    """
+    Raise DuplicateKeyError, as the missing unique index would have, when
+    `document` duplicates a stored one. Unlike the index this check races
+    with concurrent writes; it only bridges the time until the index builds.
+    """
+    index_name = (await find_duplicates(collection, [document], exclude))[0]
+    if index_name is not None:
+        raise DuplicateKeyError(
+            f"E11000 duplicate key error collection: {collection.name} index: {index_name} (checked by the app)",
+            DUPLICATE_KEY_ERROR,
+        )
+
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def explain_report(db, queries=ROUTER_QUERIES) -> list:
+    """Run explain() on each router query and flag the ones doing a COLLSCAN."""
+    report = []
+    for query in queries:
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        explanation = await cursor.explain()
+        stages = list(_plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {})))
+        report.append({
+            "route": query["route"],
+            "collection": query["collection"],
+            "filter": query["filter"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def _main(args):
+    from app.db.database import mongo
+
+    await mongo.connect()
+    try:
+        actions = await ensure_indexes(mongo.db, dry_run=args.dry_run, prune=args.prune)
+        prefix = "[dry-run] " if args.dry_run else ""
+        if not actions:
+            print("Indexes are up to date.")
+        for action, collection_name, index_name in actions:
+            print(f"{prefix}{action:<8} {collection_name}.{index_name}")
+        if not args.dry_run:
+            for name in await missing_unique_indexes(mongo.db):
+                print(f"MISSING  {name} (unique; remove the duplicates and run again)")
+
+        if args.explain:
+            for entry in await explain_report(mongo.db):
+                flag = "COLLSCAN" if entry["collscan"] else "ok"
+                print(f"{flag:<9} {entry['route']:<32} {entry['collection']}: {' <- '.join(entry['stages'])}")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes with INDEX_SPECS.")
+    parser.add_argument("--dry-run", action="store_true", help="only print the planned changes")
+    parser.add_argument("--prune", action="store_true", help="drop indexes that are not in the spec")
+    parser.add_argument("--explain", action="store_true", help="report router queries that still COLLSCAN")
+    asyncio.run(_main(parser.parse_args()))
@@ -1,17 +1,52 @@
 import motor.motor_asyncio
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import CollectionInvalid
 from app.core.config import settings
+from app.db.monitoring import CommandMetricsListener, PoolMetricsListener
+from app.db.read_routing import route_read_preference
 import logging
 
+# Collections used by the API routers. They are created (if missing) and their
+# handles cached once in connect(), so get_collection() never hits the catalog.
+KNOWN_COLLECTIONS = (
+    "gyms",
+    "categories",
+    "facilities",
+    "trainers",
+    "jobs",
+    "template_files",
+)
+
+# Codec for the raw read path: documents stay undecoded BSON bytes.
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
 class MongoDB:
     def __init__(self):
         self.client = None
         self.db = None
+        self.collections = {}
+        self.read_collections = {}
+        self.catalog_lookups_avoided = 0
+        self.pool_metrics = PoolMetricsListener()
+        self.command_metrics = CommandMetricsListener(
+            slow_ms=settings.MONGO_SLOW_QUERY_MS,
+            slow_log_size=settings.MONGO_SLOW_QUERY_LOG_SIZE,
+        )
 
     async def connect(self):
-        """Connect to MongoDB."""
+        """Connect to MongoDB and bootstrap the known collections."""
         try:
-            self.client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+            self.pool_metrics.reset()
+            self.command_metrics.reset()
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(
+                settings.MONGO_URI,
+                event_listeners=[self.pool_metrics, self.command_metrics],
+                **settings.mongo_client_options(),
+            )
             self.db = self.client[settings.MONGO_DB]
+            await self.bootstrap_collections()
             logging.info(f"Connected to MongoDB: {settings.MONGO_DB}")
         except Exception as e:
             logging.error(f"Failed to connect to MongoDB: {e}")
@@ -23,21 +58,72 @@ class MongoDB:
             self.client.close()
             self.client = None
             self.db = None
+            self.collections = {}
+            self.read_collections = {}
             logging.info("MongoDB connection closed.")
 
+    async def bootstrap_collections(self, collection_names=KNOWN_COLLECTIONS):
+        """
+        Create any missing collections with a single catalog lookup and cache
+        a handle for each of them.
+        """
+        if self.db is None:
+            raise Exception("Database connection is not established. Call connect() first.")
+
+        existing_collections = set(await self.db.list_collection_names())
+        for collection_name in collection_names:
+            if collection_name not in existing_collections:
+                await self._create_collection(collection_name)
+            self.collections[collection_name] = self.db[collection_name]
+
+        missing = set(collection_names) - set(await self.db.list_collection_names())
+        if missing:
+            raise Exception(f"Collections could not be created: {sorted(missing)}")
+
     async def get_collection(self, collection_name: str):
         """
-        Get a collection from the database. MongoDB creates collections lazily.
+        Get a collection handle. Known collections are served from the cache
+        filled at connect() time without any server round trip.
         """
         if self.db is None:
             raise Exception("Database connection is not established. Call connect() first.")
 
-        collections = await self.db.list_collection_names()
-        if collection_name not in collections:
-            create_collection_if_not_exists = await self.create_collection_if_not_exists(collection_name)
-            # logging.info(f"Collection '{collection_name}' does not exist. Creating it implicitly.")
-        
-        return self.db[collection_name]
+        collection = self.collections.get(collection_name)
+        if collection is not None:
+            self.catalog_lookups_avoided += 1
+            return collection
+
+        # Unknown collection: check the catalog once, then cache the handle.
+        await self.create_collection_if_not_exists(collection_name)
+        collection = self.db[collection_name]
+        self.collections[collection_name] = collection
+        return collection
+
+    async def get_read_collection(self, collection_name: str, route: str):
+        """
+        Get a collection handle that reads with the preference declared for
+        `route` in app/db/read_routing.py. Only use it for reads.
+        """
+        key = (collection_name, route)
+        collection = self.read_collections.get(key)
+        if collection is None:
+            base = await self.get_collection(collection_name)
+            collection = base.with_options(read_preference=route_read_preference(route))
+            self.read_collections[key] = collection
+        return collection
+
+    async def get_raw_collection(self, collection_name: str, route: str):
+        """
+        Like get_read_collection(), but documents come back as RawBSONDocument
+        so they can be transcoded to JSON without building Python dicts.
+        """
+        key = (collection_name, route, "raw")
+        collection = self.read_collections.get(key)
+        if collection is None:
+            base = await self.get_read_collection(collection_name, route)
+            collection = base.with_options(codec_options=RAW_CODEC_OPTIONS)
+            self.read_collections[key] = collection
+        return collection
 
     async def create_collection_if_not_exists(self, collection_name: str):
         """Explicitly create a collection if it doesn't exist."""
@@ -46,7 +132,21 @@ class MongoDB:
 
         existing_collections = await self.db.list_collection_names()
         if collection_name not in existing_collections:
+            await self._create_collection(collection_name)
+        else:
+            logging.info(f"Collection '{collection_name}' already exists.")
+
+    async def _create_collection(self, collection_name: str):
+        try:
             await self.db.create_collection(collection_name)
             logging.info(f"Collection '{collection_name}' created.")
-        else:
+        except CollectionInvalid:
+            # Another worker created it between our catalog lookup and now.
             logging.info(f"Collection '{collection_name}' already exists.")
+
+    def collection_stats(self) -> dict:
+        """Counters for the collection handle cache."""
+        return {
+            "cached_collections": sorted(self.collections),
+            "catalog_lookups_avoided": self.catalog_lookups_avoided,
+        }
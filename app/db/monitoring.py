@@ -0,0 +1,241 @@
+"""pymongo event listeners that publish live driver metrics."""
+import logging
+import threading
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from pymongo import monitoring
+from pymongo.monitoring import ConnectionCheckOutFailedReason
+
+# Route currently being served, set by the request middleware in app/main.py.
+# Motor runs driver calls with a copy of the caller's context, so command
+# listeners see the value of the request that issued the command.
+current_route: ContextVar[str] = ContextVar("current_route", default="-")
+
+# Route tag of the change stream watcher's commands. Its getMores wait up to
+# maxAwaitTimeMS for events on purpose, so they stay out of the slow-query log.
+WATCH_ROUTE_PREFIX = "watch "
+
+# Upper bounds (ms) of the command duration histogram buckets.
+DURATION_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+# Command field holding the filter for the commands the API issues.
+FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool activity across all servers of a client.
+    pymongo calls the listener from driver threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.open = 0
+            self.checked_out = 0
+            self.waiting = 0
+            self.created_total = 0
+            self.closed_total = 0
+            self.checkouts_total = 0
+            self.checkout_timeouts_total = 0
+            self.checkout_failures_total = 0
+            self.pool_clears_total = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "created_total": self.created_total,
+                "closed_total": self.closed_total,
+                "checkouts_total": self.checkouts_total,
+                "checkout_timeouts_total": self.checkout_timeouts_total,
+                "checkout_failures_total": self.checkout_failures_total,
+                "pool_clears_total": self.pool_clears_total,
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears_total += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+            self.created_total += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+            self.closed_total += 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            if event.reason == ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts_total += 1
+            else:
+                self.checkout_failures_total += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+            self.checkouts_total += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+
+def filter_shape(value):
+    """Replace the literal values of a filter with their type names."""
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = filter_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return type(value).__name__
+
+
+def _command_filter(command_name: str, command: dict):
+    if command_name in FILTER_FIELDS:
+        return command.get(FILTER_FIELDS[command_name])
+    if command_name == "aggregate":
+        pipeline = command.get("pipeline") or [{}]
+        return pipeline[0].get("$match")
+    if command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        return statements[0].get("q")
+    return None
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Records a duration histogram per (route, collection, command) and keeps
+    the most recent commands slower than `slow_ms` in a bounded log.
+    """
+
+    def __init__(self, slow_ms: int = 100, slow_log_size: int = 200):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._stats = {}
+        self._slow = deque(maxlen=slow_log_size)
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._stats.clear()
+            self._slow.clear()
+
+    def started(self, event):
+        command_name = event.command_name
+        collection = event.command.get(command_name)
+        if command_name == "getMore":
+            collection = event.command.get("collection")
+        if not isinstance(collection, str):
+            collection = "-"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                current_route.get(),
+                collection,
+                command_name,
+                _command_filter(command_name, event.command),
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        duration_ms = event.duration_micros / 1000
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            route, collection, command_name, command_filter = pending
+
+            key = (route, collection, command_name)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = {"count": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * len(DURATION_BUCKETS_MS)}
+                self._stats[key] = stats
+            stats["count"] += 1
+            stats["failed"] += int(failed)
+            stats["total_ms"] += duration_ms
+            stats["max_ms"] = max(stats["max_ms"], duration_ms)
+            for index, bound in enumerate(DURATION_BUCKETS_MS):
+                if duration_ms <= bound:
+                    stats["buckets"][index] += 1
+                    break
+
+            if duration_ms < self.slow_ms:
+                return
+            if command_name == "getMore" and route.startswith(WATCH_ROUTE_PREFIX):
+                return
+            entry = {
+                "at": datetime.utcnow().isoformat(),
+                "route": route,
+                "collection": collection,
+                "command": command_name,
+                "duration_ms": round(duration_ms, 3),
+                "filter_shape": filter_shape(command_filter) if command_filter is not None else None,
+                "failed": failed,
+            }
+            self._slow.append(entry)
+        logging.warning(f"Slow MongoDB command: {entry}")
+
+    def snapshot(self) -> list:
+        """Per (route, collection, command) latency stats, slowest total first."""
+        with self._lock:
+            items = [(key, dict(stats, buckets=list(stats["buckets"]))) for key, stats in self._stats.items()]
+
+        snapshot = []
+        for (route, collection, command_name), stats in items:
+            snapshot.append({
+                "route": route,
+                "collection": collection,
+                "command": command_name,
+                "count": stats["count"],
+                "failed": stats["failed"],
+                "total_ms": round(stats["total_ms"], 3),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "histogram_ms": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(DURATION_BUCKETS_MS, stats["buckets"])
+                },
+            })
+        return sorted(snapshot, key=lambda entry: entry["total_ms"], reverse=True)
+
+    def slow_queries(self) -> list:
+        """Most recent slow commands, newest first."""
+        with self._lock:
+            return list(reversed(self._slow))
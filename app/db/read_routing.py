@@ -0,0 +1,91 @@
+"""
+Per-route read preferences.
+
+Read-only routes declare where their reads may go in ROUTE_READ_PREFERENCES;
+handlers then ask for `await mongo.get_read_collection(name, route)`. Writes
+keep using `mongo.get_collection(name)`, which always targets the primary.
+
+To check the routing against a local replica set stand-in, e.g.
+
+    mongod --replSet rs0 --port 27017 --dbpath /tmp/rs0-0
+    mongod --replSet rs0 --port 27018 --dbpath /tmp/rs0-1
+    mongosh --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"}]})'
+
+point MONGO_DB_URL at "mongodb://localhost:27017,localhost:27018/?replicaSet=rs0"
+and run `python -m app.db.read_routing`, which prints the member that served
+each route's read next to the current primary.
+"""
+import asyncio
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from app.core.config import settings
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# List and search endpoints tolerate replication lag; single-document reads
+# prefer the primary so an admin sees their own edit straight away.
+LIST_READ = {"mode": "secondaryPreferred"}
+
+ROUTE_READ_PREFERENCES = {
+    "get_all_trainers": LIST_READ,
+    "get_trainers_by_specialization": LIST_READ,
+    "search_trainers": LIST_READ,
+    "get_available_trainers": LIST_READ,
+    "get_trainer_by_id": {"mode": "primaryPreferred"},
+    "get_gyms": LIST_READ,
+    "get_gyms_near": LIST_READ,
+    # These fill the in-process reference caches right after a write cleared
+    # them; a lagging secondary would get its stale page cached for the TTL
+    "get_categories": {"mode": "primaryPreferred"},
+    "get_facilities": {"mode": "primaryPreferred"},
+    "resolve_reference_names": {"mode": "primaryPreferred"},
+    # Long-running dumps belong on a secondary whenever there is one
+    "export_trainers": LIST_READ,
+    "export_gyms": LIST_READ,
+}
+
+
+def route_read_preference(route: str):
+    """
+    Build the pymongo read preference declared for a route. Unknown routes,
+    or MONGO_READ_ROUTING=false, read from the primary.
+    """
+    declared = ROUTE_READ_PREFERENCES.get(route)
+    if not settings.MONGO_READ_ROUTING or declared is None:
+        return Primary()
+
+    mode = READ_PREFERENCE_MODES[declared["mode"]]
+    if mode is Primary:
+        return Primary()
+
+    max_staleness = declared.get("max_staleness", settings.MONGO_READ_MAX_STALENESS_S)
+    return mode(max_staleness=max_staleness if max_staleness is not None else -1)
+
+
+async def _main():
+    from app.db.database import mongo
+    from app.db.mongodb import KNOWN_COLLECTIONS
+
+    await mongo.connect()
+    try:
+        primary = mongo.client.primary
+        print(f"primary: {primary}")
+        for route in ROUTE_READ_PREFERENCES:
+            # Routes not named after their collection read the categories
+            collection_name = next((name for name in KNOWN_COLLECTIONS if name.rstrip("s") in route), "categories")
+            collection = await mongo.get_read_collection(collection_name, route)
+            cursor = collection.find({}, {"_id": 1}).limit(1)
+            await cursor.to_list(length=1)
+            print(f"{route:<32} {collection.read_preference.mongos_mode:<20} -> {cursor.address}")
+    finally:
+        mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -6,7 +6,13 @@ from app.api.v1.create_facilities import router as facilities_router
 from app.api.v1.media_upload import router as media_uploader_router
 from app.api.v1.authentication import router as sign_in_router
 from app.api.v1.trainers import router as trainers_router
-from app.db.database import connect_all, close_all
+from app.api.v1.metrics import router as metrics_router
+from app.api.v1.exports import router as exports_router
+from app.core.config import settings
+from app.db.database import change_watcher, connect_all, close_all, mongo
+from app.db.monitoring import current_route
+from app.utils.json_response import BSONJSONResponse
+from starlette.routing import Match
 import logging
 import re
 
@@ -19,7 +25,7 @@ logging.basicConfig(
         logging.StreamHandler()         # Print logs to the console
     ]
 )
-app = FastAPI()
+app = FastAPI(default_response_class=BSONJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -31,6 +37,22 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def tag_mongo_commands_with_route(request: Request, call_next):
+    """Expose the matched route template to the Mongo command listener."""
+    route_name = request.url.path
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            route_name = getattr(route, "path", route_name)
+            break
+    token = current_route.set(f"{request.method} {route_name}")
+    try:
+        return await call_next(request)
+    finally:
+        current_route.reset(token)
+
+
 @app.get("/", tags=["Root"])
 async def read_root(request: Request):
     """Simple root endpoint so GET / doesn't return 404."""
@@ -41,11 +63,15 @@ async def read_root(request: Request):
 async def startup_db():
     # Connect to MongoDB and MySQL during application startup
     await connect_all()
+    # Cross-worker cache invalidation; without change streams (disabled or
+    # not supported) it polls for updated documents instead
+    await change_watcher.start(mongo.db, change_streams=settings.CHANGE_STREAMS)
     #asyncio.create_task(auto_sync_impressions(3600))
     #asyncio.create_task(run_task_at_time(auto_sync_impressions, target_hour=3, target_minute=0))
 @app.on_event("shutdown")
 async def shutdown_db():
     # Close database connections during application shutdown
+    await change_watcher.stop()
     await close_all()
 
 
@@ -55,4 +81,6 @@ app.include_router(category_router, prefix="/api/v1", tags=["Categories"])
 app.include_router(facilities_router, prefix="/api/v1", tags=["Facilities"])
 app.include_router(media_uploader_router,prefix="/api/v1",tags=["media_upload"])
 app.include_router(sign_in_router,prefix="/api/v1/auth",tags=["Sign-In"])
-app.include_router(trainers_router, prefix="/api/v1", tags=["Trainers"])
\ No newline at end of file
+app.include_router(trainers_router, prefix="/api/v1", tags=["Trainers"])
+app.include_router(metrics_router, prefix="/api/v1", tags=["Metrics"])
+app.include_router(exports_router, prefix="/api/v1", tags=["Exports"])
\ No newline at end of file
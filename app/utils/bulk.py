@@ -0,0 +1,208 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, Sequence, Type
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.db.indexes import DUPLICATE_KEY_ERROR, find_duplicates
+
+BULK_MODES = ("insert", "upsert")
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _too_large():
+    return HTTPException(status_code=413, detail=f"Body over the limit of {settings.BULK_MAX_BODY_BYTES} bytes.")
+
+
+async def _read_body(request: Request) -> bytes:
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.BULK_MAX_BODY_BYTES:
+            raise _too_large()
+    return bytes(body)
+
+
+async def iter_request_items(request: Request, max_items: Optional[int] = None):
+    """
+    Yield `(index, item)` from a JSON array body (or `{"items": [...]}`), or
+    `(index, line)` from an NDJSON body, which is read incrementally. Stops
+    after `max_items + 1` items, leaving the rest of an NDJSON body unread,
+    so the caller can tell the body went over `max_items`. Bodies declaring
+    more than BULK_MAX_BODY_BYTES are rejected with 413 before any read.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.BULK_MAX_BODY_BYTES:
+        raise _too_large()
+    stop = max_items + 1 if max_items is not None else None
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+                    if index == stop:
+                        return
+            if len(buffer) > settings.BULK_MAX_BODY_BYTES:
+                raise _too_large()
+        if buffer.strip():
+            yield index, buffer
+        return
+
+    try:
+        items = orjson.loads(await _read_body(request))
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON (application/x-ndjson).")
+    if isinstance(items, dict) and isinstance(items.get("items"), list):
+        items = items["items"]
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON (application/x-ndjson).")
+    for index, item in enumerate(items[:stop]):
+        yield index, item
+
+
+def _validate(model: Type[BaseModel], item):
+    if isinstance(item, (bytes, str)):
+        return model.model_validate_json(item)
+    return model.model_validate(item)
+
+
+class BulkWriter:
+    """
+    Unordered bulk_write in chunks with one result per request item. Write
+    errors are mapped back to their item, so a duplicate or bad row only
+    fails itself.
+    """
+
+    def __init__(self, collection, id_field: str, key_fields: Sequence[str], mode: str, chunk_size: int,
+                 on_flush: Optional[Callable[[list], Awaitable]] = None, server_defaults: Sequence[str] = ()):
+        self.collection = collection
+        self.id_field = id_field
+        self.key_fields = tuple(key_fields)
+        self.server_defaults = tuple(server_defaults)
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.on_flush = on_flush
+        self.results = []
+        self._pending = []  # (index, document, fields supplied by the item)
+        self._seen_keys = set()
+
+    def _key(self, document: dict) -> dict:
+        return {field: document.get(field) for field in self.key_fields}
+
+    def reject(self, index: int, status: str, detail):
+        self.results.append({"index": index, "status": status, "detail": detail})
+
+    async def add(self, index: int, document: dict, supplied: Iterable[str] = ()):
+        key = tuple(self._key(document).values())
+        if key in self._seen_keys:
+            self.reject(index, "duplicate", f"Duplicate of an earlier item on {', '.join(self.key_fields)}.")
+            return
+        self._seen_keys.add(key)
+        self._pending.append((index, document, frozenset(supplied)))
+        if len(self._pending) >= self.chunk_size:
+            await self.flush()
+
+    def _operation(self, document: dict, supplied: frozenset):
+        if self.mode == "insert":
+            return InsertOne(document)
+        # Server defaults (e.g. status) only apply to new documents, so an
+        # upsert does not revive soft-deleted rows unless the item asks to
+        defaults = [field for field in self.server_defaults if field not in supplied]
+        insert_only = {field: document[field] for field in (self.id_field, "created_at", *defaults) if field in document}
+        fields = {field: value for field, value in document.items() if field not in insert_only}
+        fields["updated_at"] = datetime.utcnow()
+        return UpdateOne(self._key(document), {"$set": fields, "$setOnInsert": insert_only}, upsert=True)
+
+    async def flush(self):
+        pending, self._pending = self._pending, []
+        if self.mode == "insert" and pending:
+            # Stands in for a unique index that is missing on the server;
+            # upserts match on the key and never insert a second copy
+            duplicates = await find_duplicates(self.collection, [document for _, document, _ in pending])
+            for (index, _, _), index_name in zip(pending, duplicates):
+                if index_name is not None:
+                    self.reject(index, "duplicate", f"Duplicate key on {index_name}.")
+            pending = [item for item, index_name in zip(pending, duplicates) if index_name is None]
+        if not pending:
+            return
+
+        # Existing names fail with E11000 on their unique index and are
+        # reported per item, so no lookup round trip is needed first.
+        errors = {}
+        upserted = set()
+        try:
+            result = await self.collection.bulk_write([self._operation(document, supplied) for _, document, supplied in pending], ordered=False)
+            upserted = set(result.upserted_ids or {})
+        except BulkWriteError as e:
+            errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+            upserted = {item["index"] for item in e.details.get("upserted", [])}
+
+        written = []
+        for position, (index, document, _) in enumerate(pending):
+            error = errors.get(position)
+            if error is not None:
+                status = "duplicate" if error.get("code") == DUPLICATE_KEY_ERROR else "error"
+                self.reject(index, status, error.get("errmsg"))
+                continue
+            created = self.mode == "insert" or position in upserted
+            self.results.append({
+                "index": index,
+                "status": "created" if created else "updated",
+                self.id_field: document[self.id_field] if created else None,
+            })
+            written.append(document)
+
+        if written and self.on_flush is not None:
+            await self.on_flush(written)
+
+    def summary(self) -> dict:
+        self.results.sort(key=lambda result: result["index"])
+        counts = {status: 0 for status in ("created", "updated", "duplicate", "invalid", "error")}
+        for result in self.results:
+            counts[result["status"]] += 1
+        return {"received": len(self.results), **counts}
+
+
+async def run_bulk(request: Request, collection, model: Type[BaseModel], build_document: Callable[[BaseModel], dict],
+                   id_field: str, key_fields: Sequence[str], mode: str = "insert", chunk_size: Optional[int] = None,
+                   on_flush: Optional[Callable[[list], Awaitable]] = None,
+                   server_defaults: Sequence[str] = ()) -> dict:
+    """
+    Validate every item of a bulk request with `model`, build its document
+    with `build_document` and write them in chunks. Items are matched on
+    `key_fields` for duplicate detection and upserts. Upserts only set the
+    `server_defaults` fields on insert, unless the item sends them. Reading
+    stops at BULK_MAX_ITEMS; `truncated` tells whether the body held more.
+    """
+    if mode not in BULK_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'. Use one of: {', '.join(BULK_MODES)}")
+    chunk_size = chunk_size or settings.BULK_WRITE_CHUNK_SIZE
+    if not 1 <= chunk_size <= settings.BULK_WRITE_CHUNK_SIZE_MAX:
+        raise HTTPException(status_code=400, detail=f"chunk_size must be between 1 and {settings.BULK_WRITE_CHUNK_SIZE_MAX}.")
+
+    writer = BulkWriter(collection, id_field, key_fields, mode, chunk_size, on_flush, server_defaults)
+    truncated = False
+    async for index, item in iter_request_items(request, settings.BULK_MAX_ITEMS):
+        if index >= settings.BULK_MAX_ITEMS:
+            writer.reject(index, "error", f"Over the limit of {settings.BULK_MAX_ITEMS} items per request; later items were not read.")
+            truncated = True
+            break
+        try:
+            validated = _validate(model, item)
+        except ValidationError as e:
+            writer.reject(index, "invalid", e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+        await writer.add(index, build_document(validated), validated.model_fields_set)
+    await writer.flush()
+
+    summary = writer.summary()
+    return {"mode": mode, "summary": summary, "truncated": truncated, "results": writer.results}
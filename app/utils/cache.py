@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from app.core.config import settings
+
+# Every cache by name, for the stats endpoint and for invalidation hooks.
+CACHES = {}
+
+
+class TTLCache:
+    """
+    In-process cache with a per-entry time to live and LRU eviction once
+    `maxsize` entries are stored. Meant to be used from the event loop only.
+
+    Readers take `generation` before loading from the database and pass it
+    to set(): if the cache was cleared in between (a write happened), the
+    possibly stale value is not stored.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; called after writes to the cached collection."""
+        self._data.clear()
+        self.generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Small, rarely changing reference tables served by the list endpoints.
+category_cache = TTLCache("categories", settings.REFERENCE_CACHE_MAX_ENTRIES, settings.REFERENCE_CACHE_TTL_S)
+facility_cache = TTLCache("facilities", settings.REFERENCE_CACHE_MAX_ENTRIES, settings.REFERENCE_CACHE_TTL_S)
@@ -0,0 +1,52 @@
+import hashlib
+from typing import Optional
+from bson import json_util
+from fastapi import Request, Response
+
+# Stored fields that change whenever a document is written.
+VERSION_FIELDS = ("updated_at", "created_at")
+
+# Projection for the version-only lookup done before a conditional GET.
+VERSION_PROJECTION = {"_id": 0, **{field: 1 for field in VERSION_FIELDS}}
+
+
+def document_version(document: dict) -> list:
+    return [document.get(field) for field in VERSION_FIELDS]
+
+
+def make_etag(request: Request, *parts) -> str:
+    """
+    Strong ETag over the request path and query string plus `parts`, so
+    the same documents fetched with a different projection or page get a
+    different tag.
+    """
+    key = (request.url.path, sorted(request.query_params.multi_items()), parts)
+    return '"' + hashlib.sha1(json_util.dumps(key, sort_keys=True).encode()).hexdigest() + '"'
+
+
+def document_etag(request: Request, document: dict) -> str:
+    return make_etag(request, document_version(document))
+
+
+def list_etag(request: Request, documents: list, *extra) -> str:
+    """ETag of a list page: ids and versions of its documents, plus `extra` (totals, cursors)."""
+    return make_etag(request, [[document.get("_id"), *document_version(document)] for document in documents], *extra)
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """True when the client's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def etag_headers(etag: str) -> dict:
+    # Cache, but revalidate with If-None-Match on every use
+    return {"ETag": etag, "Cache-Control": "no-cache"}
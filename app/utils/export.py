@@ -0,0 +1,130 @@
+import csv
+import io
+import typing
+from collections.abc import Mapping
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.utils.json_response import dumps
+from app.utils.pagination import encode_cursor, find_page
+from app.utils.streaming import encode_document
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Column / field carrying each row's resume token.
+CURSOR_FIELD = "_cursor"
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    # Unwrap Optional[Model] / List[...] down to a model class, if any
+    if isinstance(annotation, type):
+        return annotation if issubclass(annotation, BaseModel) else None
+    if typing.get_origin(annotation) is typing.Union:
+        models = [_nested_model(arg) for arg in typing.get_args(annotation) if arg is not type(None)]
+        return models[0] if len(models) == 1 else None
+    return None
+
+
+def model_columns(model: Type[BaseModel], prefix: str = "") -> List[str]:
+    """
+    Flat CSV columns for a schema: nested models become dotted columns
+    (`pricing.per_session`, `skills.hatha_yoga`); lists and free-form dicts
+    stay one column holding JSON.
+    """
+    columns = []
+    for name, field in model.model_fields.items():
+        nested = _nested_model(field.annotation)
+        if nested is not None:
+            columns.extend(model_columns(nested, f"{prefix}{name}."))
+        else:
+            columns.append(f"{prefix}{name}")
+    return columns
+
+
+def select_columns(columns: List[str], projection: Optional[dict]) -> List[str]:
+    """Columns covered by a projection built with build_projection()."""
+    if not projection:
+        return columns
+    return [
+        column for column in columns
+        if any(column == path or column.startswith(path + ".") or path.startswith(column + ".") for path in projection)
+    ]
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict, Mapping)):
+        return dumps(value).decode()
+    return str(value)
+
+
+def _value(document, column: str):
+    value = document
+    for part in column.split("."):
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(part)
+    return value
+
+
+async def _csv_chunks(documents, columns: List[str], sort: List[Tuple[str, int]], batch_size: int,
+                      header: bool = True):
+    # One CSV chunk per cursor batch keeps memory flat
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([*columns, CURSOR_FIELD])
+    rows = 0
+    async for document in documents:
+        writer.writerow([*(_cell(_value(document, column)) for column in columns), encode_cursor(document, sort)])
+        rows += 1
+        if rows % batch_size == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def _ndjson_chunks(documents, sort: List[Tuple[str, int]]):
+    async for document in documents:
+        document[CURSOR_FIELD] = encode_cursor(document, sort)
+        yield encode_document(document) + b"\n"
+
+
+def export_documents(collection, filter_query: dict, sort: List[Tuple[str, int]], export_format: str,
+                     columns: List[str], projection: Optional[dict] = None, cursor: Optional[str] = None,
+                     batch_size: int = 500, filename: str = "export") -> StreamingResponse:
+    """
+    Stream every document matching `filter_query` as CSV (flattened
+    `columns`) or NDJSON, in `sort` order. Every row carries a `_cursor`
+    token; passing the last received one as `cursor` resumes the export
+    right after that row (without repeating the CSV header).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{export_format}'. Use csv or ndjson.")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1.")
+
+    documents = find_page(collection, filter_query, sort, cursor=cursor, projection=projection).batch_size(batch_size)
+    if export_format == "csv":
+        # A resumed download is appended to the partial file: no second header
+        chunks = _csv_chunks(documents, columns, sort, batch_size, header=not cursor)
+    else:
+        chunks = _ndjson_chunks(documents, sort)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
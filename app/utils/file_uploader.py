@@ -1,24 +1,14 @@
 import base64
 import io
 import asyncio
-import boto3
-import os
 from uuid import uuid4
 from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.utils.s3 import get_s3_client
 
 # AWS Config
-AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
-AWS_SECRET_KEY = os.getenv("AWS_SECRET_KEY")
-AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
-AWS_REGION = os.getenv("AWS_REGION")
-
-# S3 client
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=AWS_ACCESS_KEY,
-    aws_secret_access_key=AWS_SECRET_KEY,
-    region_name=AWS_REGION,
-)
+AWS_BUCKET_NAME = settings.AWS_BUCKET_NAME
+AWS_REGION = settings.AWS_REGION
 
 # Thread executor for uploads
 executor = ThreadPoolExecutor()
@@ -40,7 +30,7 @@ async def upload_to_s3_with_progress(file_data, filename, content_type, job_coll
 
     async def do_upload():
         def _upload():
-            s3_client.upload_fileobj(
+            get_s3_client().upload_fileobj(
                 io.BytesIO(file_data),
                 AWS_BUCKET_NAME,
                 filename,
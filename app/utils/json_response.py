@@ -0,0 +1,64 @@
+from decimal import Decimal
+from typing import Any, Optional
+import orjson
+from bson import Decimal128, ObjectId, json_util
+from bson.raw_bson import RawBSONDocument
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    # libbson's BSON -> Extended JSON transcoder
+    import bsonjs
+except ImportError:
+    bsonjs = None
+
+
+def _bson_default(value):
+    # orjson encodes str/int/float/bool/None/dict/list/datetime natively and
+    # calls this only for the remaining types.
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode Mongo documents straight to JSON bytes (ObjectId and Decimal128 as strings)."""
+    return orjson.dumps(content, default=_bson_default)
+
+
+class BSONJSONResponse(JSONResponse):
+    """
+    JSON response that encodes BSON documents with orjson. Handlers that
+    return it directly skip FastAPI's jsonable_encoder pass and the
+    `_id` -> str conversion loops.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def raw_bson_to_json(document: RawBSONDocument) -> bytes:
+    """
+    Relaxed Extended JSON ({"$oid": ...}, {"$date": ...}) for a document read
+    with RawBSONDocument, transcoded from its BSON bytes by bsonjs when it is
+    installed.
+    """
+    if bsonjs is not None:
+        return bsonjs.dumps(document.raw).encode()
+    return json_util.dumps(document, json_options=json_util.RELAXED_JSON_OPTIONS).encode()
+
+
+def raw_list_response(key: str, documents: list, extra: Optional[dict] = None, headers: Optional[dict] = None) -> Response:
+    """`{"<key>": [...], **extra}` built from raw documents without decoding them."""
+    body = b'{"' + key.encode() + b'":[' + b",".join(map(raw_bson_to_json, documents)) + b"]"
+    body += b"," + dumps(extra)[1:] if extra else b"}"
+    return Response(body, media_type=BSONJSONResponse.media_type, headers=headers)
@@ -0,0 +1,161 @@
+import base64
+from collections.abc import Mapping
+from typing import List, Optional, Tuple
+from bson import json_util
+from fastapi import HTTPException
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# Stable sort orders used for keyset (cursor) pagination. The last key must be
+# unique so that every document has exactly one position in the order.
+TRAINER_SORT = [("created_at", 1), ("trainer_id", 1)]
+GYM_SORT = [("created_at", 1), ("gym_id", 1)]
+CATEGORY_SORT = [("created_at", 1), ("category_id", 1)]
+FACILITY_SORT = [("created_at", 1), ("facility_id", 1)]
+# Offset cursors over an in-memory ranking (e.g. search relevance).
+RANK_SORT = [("_rank", 1)]
+
+# Bounds of the `page` / `limit` / `batch_size` query parameters of the list endpoints
+PAGE_QUERY = {"ge": 1}
+LIMIT_QUERY = {"ge": 1, "le": settings.MAX_PAGE_LIMIT}
+BATCH_SIZE_QUERY = {"ge": 1, "le": settings.MAX_BATCH_SIZE}
+
+# `count=` modes of the paginated listings:
+#   exact     - exact total; page pagination gets page and total in one $facet (default)
+#   estimated - collection metadata or a short-lived cached count
+#   none      - no total at all
+COUNT_MODES = ("exact", "estimated", "none")
+
+# (collection, filter) -> total, for count=estimated
+count_cache = TTLCache("counts", maxsize=1000, ttl=settings.MONGO_COUNT_CACHE_TTL_S)
+
+
+def encode_cursor(document: dict, sort: List[Tuple[str, int]]) -> str:
+    """Build an opaque cursor pointing just after `document` in `sort` order."""
+    payload = {"k": [key for key, _ in sort], "v": [_get_path(document, key) for key, _ in sort]}
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: List[Tuple[str, int]]) -> list:
+    """Return the sort key values stored in a cursor built by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["k"] != [key for key, _ in sort] or len(payload["v"]) != len(sort):
+            raise ValueError("cursor does not match this listing")
+        return payload["v"]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def keyset_filter(values: list, sort: List[Tuple[str, int]]) -> dict:
+    """
+    Filter matching the documents strictly after `values` in `sort` order:
+    (a > x) or (a == x and b > y) or ...
+    """
+    clauses = []
+    for index, (key, direction) in enumerate(sort):
+        clause = {prev_key: values[prev_index] for prev_index, (prev_key, _) in enumerate(sort[:index])}
+        clause[key] = {"$gt" if direction == 1 else "$lt": values[index]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def apply_cursor(filter_query: dict, cursor: Optional[str], sort: List[Tuple[str, int]]) -> dict:
+    """Combine a listing filter with the keyset condition of `cursor` (if any)."""
+    if not cursor:
+        return filter_query
+    keyset = keyset_filter(decode_cursor(cursor, sort), sort)
+    if not filter_query:
+        return keyset
+    return {"$and": [filter_query, keyset]}
+
+
+def find_page(collection, filter_query: dict, sort: List[Tuple[str, int]], limit: Optional[int] = None,
+              page: Optional[int] = None, cursor: Optional[str] = None, **find_kwargs):
+    """
+    Motor cursor for one page of `filter_query` in `sort` order. `cursor`
+    (keyset) takes precedence over `page` (skip); no limit returns everything.
+    """
+    documents = collection.find(apply_cursor(filter_query, cursor, sort), **find_kwargs).sort(sort)
+    if page and limit and not cursor:
+        documents = documents.skip((page - 1) * limit)
+    if limit:
+        documents = documents.limit(limit)
+    return documents
+
+
+async def fetch_page(collection, filter_query: dict, sort: List[Tuple[str, int]], limit: int, page: int = 1,
+                     cursor: Optional[str] = None, projection: Optional[dict] = None, count: str = "exact"):
+    """
+    Return `(documents, total)` for one page of a listing. `total` is None
+    for count=none. count=exact (the default) with page pagination uses the
+    single-round-trip $facet; cursor pages and the other modes read the
+    page with an indexed find().
+    """
+    if count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid count '{count}'. Use one of: {', '.join(COUNT_MODES)}")
+
+    if count != "exact" or cursor:
+        # Keyset pages must stay on find() so the index serves the cursor
+        # condition; their exact total is an index-served count.
+        documents = await find_page(collection, filter_query, sort, limit, page, cursor, projection=projection).to_list(length=limit)
+        if count == "exact":
+            total = await collection.count_documents(filter_query)
+        elif count == "estimated":
+            total = await cached_count(collection, filter_query)
+        else:
+            total = None
+        return documents, total
+
+    # The leading $match/$sort use the indexes and the projection trims every
+    # match before the facet counts them and cuts the requested page.
+    # Without a projection every full matching document flows into the
+    # facet.
+    pipeline = [{"$match": filter_query}, {"$sort": dict(sort)}]
+    if projection:
+        pipeline.append({"$project": projection})
+    items = []
+    if page and page > 1:
+        items.append({"$skip": (page - 1) * limit})
+    items.append({"$limit": limit})
+    pipeline.append({"$facet": {"total": [{"$count": "count"}], "items": items}})
+    result = await collection.aggregate(pipeline).to_list(length=1)
+    facet = result[0] if result else {"total": [], "items": []}
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    return facet["items"], total
+
+
+async def cached_count(collection, filter_query: dict) -> int:
+    """
+    Approximate total for count=estimated: collection metadata for an empty
+    filter, otherwise a count cached for MONGO_COUNT_CACHE_TTL_S seconds.
+    """
+    key = (collection.name, json_util.dumps(filter_query, sort_keys=True))
+    total = count_cache.get(key)
+    if total is not None:
+        return total
+
+    # A write that clears the cache mid-count must not see this total cached
+    generation = count_cache.generation
+    if filter_query:
+        total = await collection.count_documents(filter_query)
+    else:
+        total = await collection.estimated_document_count()
+    count_cache.set(key, total, generation)
+    return total
+
+
+def next_cursor(documents: list, limit: Optional[int], sort: List[Tuple[str, int]]) -> Optional[str]:
+    """Cursor for the page after `documents`, or None when this is the last page."""
+    if not limit or not documents or len(documents) < limit:
+        return None
+    return encode_cursor(documents[-1], sort)
+
+
+def _get_path(document: Mapping, path: str):
+    value = document
+    for part in path.split("."):
+        # Mapping also covers RawBSONDocument pages from the raw read path
+        value = value.get(part) if isinstance(value, Mapping) else None
+    return value
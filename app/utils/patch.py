@@ -0,0 +1,140 @@
+from collections.abc import Mapping
+from typing import Iterable, Tuple
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+def explicit_paths(model: BaseModel, prefix: str = "") -> dict:
+    """
+    `{dotted path: value}` for the fields the client explicitly set. Nested
+    models become dotted paths (`pricing.per_session`) so a partial patch
+    leaves their other fields alone; lists are replaced whole. A top-level
+    None means "not sent" and is skipped; an explicit None inside a nested
+    object clears that field.
+    """
+    paths = {}
+    for name in type(model).model_fields:
+        if name not in model.model_fields_set:
+            continue
+        value = getattr(model, name)
+        if value is None and not prefix:
+            continue
+        if isinstance(value, BaseModel):
+            paths.update(explicit_paths(value, f"{prefix}{name}."))
+        elif isinstance(value, list):
+            paths[prefix + name] = [item.model_dump() if isinstance(item, BaseModel) else item for item in value]
+        else:
+            paths[prefix + name] = value
+    return paths
+
+
+def changed_filter(paths: dict) -> dict:
+    """Matches only documents where at least one of `paths` differs, so no-op updates skip the write."""
+    return {"$or": [{path: {"$ne": value}} for path, value in paths.items()]}
+
+
+def literal_set_stage(paths: dict) -> dict:
+    """Pipeline-update `$set` stage writing `paths` as plain values (never as expressions)."""
+    return {"$set": {path: {"$literal": value} for path, value in paths.items()}}
+
+
+MISSING = object()
+
+
+def _flatten(value: dict, prefix: str) -> dict:
+    paths = {}
+    for key, item in value.items():
+        if not key or "." in key or key.startswith("$"):
+            raise HTTPException(status_code=400, detail=f"Invalid key '{key}' in {prefix}.")
+        path = f"{prefix}.{key}"
+        if isinstance(item, dict) and item:
+            paths.update(_flatten(item, path))
+        else:
+            paths[path] = item
+    return paths
+
+
+def merge_paths(paths: dict, fields: Iterable[str]) -> dict:
+    """
+    Expand the object values of `fields` into one dotted path per key
+    (`opening_hours.mon`), so they are merged into the stored object rather
+    than replacing it. A None value marks the key for removal.
+    """
+    merged = {}
+    for path, value in paths.items():
+        if path in fields and isinstance(value, dict) and value:
+            merged.update(_flatten(value, path))
+        else:
+            merged[path] = value
+    return merged
+
+
+def stored_value(document: Mapping, path: str, default=MISSING):
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, Mapping) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+def diff_paths(document: Mapping, paths: dict) -> Tuple[dict, list]:
+    """
+    Compare `paths` with the stored `document` and return the `$set` and
+    `$unset` parts for the paths that actually differ. None values are
+    unsets, and only count when the path exists.
+    """
+    to_set, to_unset = {}, []
+    for path, value in paths.items():
+        current = stored_value(document, path)
+        if value is None:
+            if current is not MISSING:
+                to_unset.append(path)
+        elif current is MISSING or current != value:
+            to_set[path] = value
+    return to_set, to_unset
+
+
+def _scalar_parent_depth(document: Mapping, parts: list):
+    # Depth of the first stored parent of `parts` that is not an object
+    for depth in range(1, len(parts)):
+        current = stored_value(document, ".".join(parts[:depth]))
+        if current is MISSING:
+            return None
+        if not isinstance(current, Mapping):
+            return depth
+    return None
+
+
+def fold_into_scalars(document: Mapping, paths: dict) -> dict:
+    """
+    Rewrite merged paths whose stored parent is not an object (a string,
+    null, a list...) so that parent is replaced whole: Mongo cannot `$set`
+    `opening_hours.mon.open` when `opening_hours.mon` is "6-22". None values
+    under such a parent have nothing to remove and are dropped.
+    """
+    folded = {}
+    for path, value in paths.items():
+        parts = path.split(".")
+        depth = _scalar_parent_depth(document, parts)
+        if depth is None:
+            folded[path] = value
+            continue
+        if value is None:
+            continue
+        whole = folded.setdefault(".".join(parts[:depth]), {})
+        for part in parts[depth:-1]:
+            whole = whole.setdefault(part, {})
+        whole[parts[-1]] = value
+    return folded
+
+
+def unchanged_filter(document: Mapping, fields: Iterable[str]) -> dict:
+    """
+    Matches only while `fields` still hold the values read in `document`, so
+    a read-diff-write cycle does not overwrite a concurrent write to them.
+    """
+    return {
+        field: document[field] if field in document else {"$exists": False}
+        for field in dict.fromkeys(fields)
+    }
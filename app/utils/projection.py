@@ -0,0 +1,70 @@
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from app.api.v1.schemas.gym_schema import GymBase
+from app.api.v1.schemas.trainer_schema import TrainerBase, TrainerBasic
+
+# Schema field -> stored document path, where the two differ.
+TRAINER_FIELD_PATHS = {"id": "trainer_id", "profile_photo_url": "media.profile_photo_url"}
+
+TRAINER_FIELDS = {"_id", "trainer_id", *TrainerBase.model_fields}
+GYM_FIELDS = {"_id", "gym_id", "created_at", "updated_at", *GymBase.model_fields}
+
+# Named views for `view=`. None means the whole document.
+TRAINER_VIEWS = {
+    "basic": [TRAINER_FIELD_PATHS.get(field, field) for field in TrainerBasic.model_fields],
+    "summary": [
+        "trainer_id", "full_name", "primary_specialization", "experience", "languages",
+        "status", "pricing", "preferred_mode", "media.profile_photo_url", "created_at",
+    ],
+    "full": None,
+}
+
+GYM_VIEWS = {
+    "basic": ["gym_id", "gym_name", "city", "status", "logo_url"],
+    "summary": [
+        "gym_id", "gym_name", "category_id", "city", "distance", "address",
+        "contact", "facilities", "logo_url", "location", "status", "created_at",
+    ],
+    "full": None,
+}
+
+
+def build_projection(fields: Optional[str], view: Optional[str], views: dict, allowed: set,
+                     required: Iterable[str] = ()) -> Optional[dict]:
+    """
+    Translate `fields=a,b.c` or `view=<name>` into a Mongo projection.
+    Returns None (whole document) when neither is given. `required` paths,
+    such as the pagination sort keys, are always included.
+    """
+    if fields:
+        paths = [path.strip() for path in fields.split(",") if path.strip()]
+        unknown = [path for path in paths if path.split(".")[0] not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    elif view:
+        if view not in views:
+            raise HTTPException(status_code=400, detail=f"Unknown view '{view}'. Use one of: {', '.join(views)}")
+        paths = views[view]
+    else:
+        return None
+
+    if paths is None:
+        return None
+    paths = set(paths) | set(required)
+    # Mongo rejects a path together with one of its parents ("path collision").
+    return {
+        path: 1 for path in sorted(paths)
+        if not any(path.startswith(parent + ".") for parent in paths)
+    }
+
+
+def trim_to_projection(document: dict, projection: Optional[dict]) -> dict:
+    """
+    Drop the top-level fields of `document` that `projection` did not ask
+    for, e.g. extra fields a handler read for its own use. `_id` is kept
+    as Mongo would, and a None projection keeps everything.
+    """
+    if projection is None:
+        return document
+    kept = {"_id", *(path.split(".")[0] for path in projection)}
+    return {key: value for key, value in document.items() if key in kept}
@@ -0,0 +1,63 @@
+from typing import Iterable
+from app.utils.cache import TTLCache, category_cache, facility_cache
+
+# Cache key of the id -> name map, next to the cached list pages
+NAMES_KEY = "names"
+
+
+class ReferenceNames:
+    """
+    id -> name for a reference collection (categories, facilities). The map
+    lives in that collection's TTLCache, so the writes that clear the cached
+    list pages clear it too. Ids it does not know yet are resolved with one
+    `$in` query per call; unknown ids are remembered as None. Pass a
+    collection that reads from the primary (route "resolve_reference_names"),
+    or a lagging secondary's names end up cached for the whole TTL.
+    """
+
+    def __init__(self, id_field: str, name_field: str, cache: TTLCache):
+        self.id_field = id_field
+        self.name_field = name_field
+        self.cache = cache
+
+    async def resolve(self, collection, ids: Iterable[str]) -> dict:
+        # Sorted, so the returned map (and any ETag over it) is the same in every worker
+        ids = sorted(set(ids))
+        generation = self.cache.generation
+        names = self.cache.get(NAMES_KEY) or {}
+        missing = [id_ for id_ in ids if id_ not in names]
+        if missing:
+            found = {
+                document[self.id_field]: document.get(self.name_field)
+                async for document in collection.find(
+                    {self.id_field: {"$in": missing}}, {"_id": 0, self.id_field: 1, self.name_field: 1}
+                )
+            }
+            # Copy on write: the cached map is never mutated in place
+            names = {**names, **{id_: found.get(id_) for id_ in missing}}
+            self.cache.set(NAMES_KEY, names, generation)
+        return {id_: names.get(id_) for id_ in ids}
+
+
+category_names = ReferenceNames("category_id", "category_name", category_cache)
+facility_names = ReferenceNames("facility_id", "facility_name", facility_cache)
+
+
+async def hydrate_gyms(gyms: list, category_collection, facility_collection) -> tuple:
+    """
+    Embed `category_name` and `facility_names` (in `facilities` order) in
+    each gym. At most one query per reference collection for the whole list,
+    none when the names are cached. Returns the two id -> name maps used.
+    """
+    categories = await category_names.resolve(
+        category_collection, (gym["category_id"] for gym in gyms if gym.get("category_id"))
+    )
+    facilities = await facility_names.resolve(
+        facility_collection, (facility_id for gym in gyms for facility_id in gym.get("facilities") or [])
+    )
+    for gym in gyms:
+        if "category_id" in gym:
+            gym["category_name"] = categories.get(gym["category_id"])
+        if "facilities" in gym:
+            gym["facility_names"] = [facilities.get(facility_id) for facility_id in gym["facilities"] or []]
+    return categories, facilities
@@ -0,0 +1,30 @@
+import threading
+from app.core.config import settings
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    The process-wide S3 client, created with its boto3 session and config on
+    first use. boto3/botocore are imported here rather than at module level
+    because loading them is a large part of the app's import time. S3
+    clients are thread-safe, so upload threads share this one.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import boto3
+                from botocore.config import Config
+
+                session = boto3.session.Session(
+                    aws_access_key_id=settings.AWS_ACCESS_KEY,
+                    aws_secret_access_key=settings.AWS_SECRET_KEY,
+                    region_name=settings.AWS_REGION,
+                )
+                _client = session.client(
+                    "s3", config=Config(max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS)
+                )
+    return _client
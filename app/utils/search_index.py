@@ -0,0 +1,138 @@
+import bisect
+import logging
+import math
+import re
+from collections import defaultdict
+
+# Searchable trainer fields and their relevance weight.
+TRAINER_SEARCH_FIELDS = {
+    "full_name": 3.0,
+    "primary_specialization": 2.0,
+    "short_bio": 1.0,
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text) -> list:
+    """Lowercase word tokens of `text`."""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    In-process inverted index with prefix matching and weighted TF-IDF
+    ranking. Query cost depends on the number of matching postings, not on
+    the number of indexed documents.
+    """
+
+    def __init__(self, id_field: str, fields: dict, indexed_status: str = "active"):
+        self.id_field = id_field
+        self.fields = fields
+        self.indexed_status = indexed_status
+        self.ready = False
+        self._postings = defaultdict(dict)  # term -> {doc_id: weighted term frequency}
+        self._doc_terms = {}  # doc_id -> set of terms, for removal
+        self._terms = []  # sorted vocabulary, for prefix lookups
+        self._keys = {}  # _id -> doc_id, for deletes that only carry the _id
+        self._doc_keys = {}  # doc_id -> _id
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    async def load(self, collection):
+        """
+        (Re)build the index from every document with the indexed status. The
+        new index is built aside and swapped in at the end, so searches keep
+        using the previous one while the cursor is read.
+        """
+        fresh = InvertedIndex(self.id_field, self.fields, self.indexed_status)
+        projection = {self.id_field: 1, "status": 1, **{field: 1 for field in self.fields}}
+        async for document in collection.find({"status": self.indexed_status}, projection):
+            fresh.upsert(document)
+        self._postings, self._doc_terms, self._terms = fresh._postings, fresh._doc_terms, fresh._terms
+        self._keys, self._doc_keys = fresh._keys, fresh._doc_keys
+        self.ready = True
+        logging.info(f"Search index on '{collection.name}' loaded with {len(self)} documents.")
+
+    def upsert(self, document: dict):
+        """Index a document, replacing any previous version of it."""
+        doc_id = document.get(self.id_field)
+        if doc_id is None:
+            return
+        key = document.get("_id", self._doc_keys.get(doc_id))
+        self.remove(doc_id)
+        if document.get("status", self.indexed_status) != self.indexed_status:
+            return
+        if key is not None:
+            self._keys[key] = doc_id
+            self._doc_keys[doc_id] = key
+
+        weights = defaultdict(float)
+        for field, weight in self.fields.items():
+            for term in tokenize(document.get(field)):
+                weights[term] += weight
+
+        for term, weight in weights.items():
+            postings = self._postings[term]
+            if not postings:
+                bisect.insort(self._terms, term)
+            postings[doc_id] = weight
+        self._doc_terms[doc_id] = set(weights)
+
+    def remove(self, doc_id):
+        self._keys.pop(self._doc_keys.pop(doc_id, None), None)
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                if index < len(self._terms) and self._terms[index] == term:
+                    self._terms.pop(index)
+
+    def remove_key(self, key):
+        """Remove the document whose `_id` is `key` (e.g. from a delete event)."""
+        doc_id = self._keys.get(key)
+        if doc_id is not None:
+            self.remove(doc_id)
+
+    def _expand(self, prefix: str) -> list:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        return self._terms[start:end]
+
+    def search(self, query: str) -> list:
+        """
+        Return `[(doc_id, score), ...]` for documents matching every query
+        token (each token also matches as a prefix), best match first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        total_docs = max(len(self._doc_terms), 1)
+        scores = None
+        for token in dict.fromkeys(tokens):
+            token_scores = defaultdict(float)
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + total_docs / len(postings))
+                # exact term matches rank above prefix expansions
+                boost = 1.0 if term == token else 0.25
+                for doc_id, weight in postings.items():
+                    token_scores[doc_id] += weight * idf * boost
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id] for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                return []
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+trainer_search_index = InvertedIndex("trainer_id", TRAINER_SEARCH_FIELDS)
@@ -0,0 +1,47 @@
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from bson.raw_bson import RawBSONDocument
+from app.utils.json_response import dumps, raw_bson_to_json
+
+# Supported `stream=` modes of the list endpoints.
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def encode_document(document) -> bytes:
+    if isinstance(document, RawBSONDocument):
+        return raw_bson_to_json(document)
+    return dumps(document)
+
+
+async def _ndjson_chunks(documents):
+    async for document in documents:
+        yield encode_document(document) + b"\n"
+
+
+async def _json_array_chunks(documents, key: str):
+    # {"<key>": [doc, doc, ...]} written one document at a time
+    yield b'{"' + key.encode() + b'":['
+    separator = b""
+    async for document in documents:
+        yield separator + encode_document(document)
+        separator = b","
+    yield b"]}"
+
+
+def stream_documents(documents, key: str, mode: str, batch_size: int = 100) -> StreamingResponse:
+    """
+    Stream a Motor cursor as NDJSON or as a chunked `{"<key>": [...]}` JSON
+    body. Documents are written as the cursor yields them, `batch_size` per
+    server round trip, so memory stays flat regardless of the result size.
+    """
+    if mode not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream mode '{mode}'. Use ndjson or json.")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1.")
+
+    documents = documents.batch_size(batch_size)
+    chunks = _ndjson_chunks(documents) if mode == "ndjson" else _json_array_chunks(documents, key)
+    return StreamingResponse(chunks, media_type=STREAM_MEDIA_TYPES[mode])
@@ -0,0 +1,143 @@
+"""Derived trainer fields that are precomputed on write for indexed filtering."""
+import re
+from typing import Optional, Tuple
+from app.api.v1.schemas.trainer_schema import SkillsSchema
+
+# Bit of each skill in the stored `skills_mask`, in SkillsSchema field order.
+# New skills must be appended to SkillsSchema so existing bits keep their meaning.
+SKILL_BITS = {skill: 1 << index for index, skill in enumerate(SkillsSchema.model_fields)}
+
+
+def normalize_skill(name: str) -> str:
+    """'Hatha Yoga' -> 'hatha_yoga'"""
+    return name.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def skills_mask(skills) -> int:
+    """Bitmask of the enabled skills of a SkillsSchema or a stored skills dict."""
+    if skills is None:
+        return 0
+    if isinstance(skills, SkillsSchema):
+        skills = skills.model_dump()
+    return sum(bit for skill, bit in SKILL_BITS.items() if skills.get(skill))
+
+
+def skills_mask_expression() -> dict:
+    """Aggregation expression for skills_mask over the stored `skills`, for pipeline updates."""
+    return {"$add": [{"$cond": [f"$skills.{skill}", bit, 0]} for skill, bit in SKILL_BITS.items()]}
+
+
+def skills_filter_mask(names) -> int:
+    """Bitmask for a list of requested skill names; unknown names are ignored."""
+    mask = 0
+    for name in names or []:
+        # OR, not sum: "Hatha Yoga" and "hatha_yoga" name the same bit
+        mask |= SKILL_BITS.get(normalize_skill(name), 0)
+    return mask
+
+
+# Availability -----------------------------------------------------------------
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MINUTES_PER_DAY = 24 * 60
+
+_TIME_RE = re.compile(r"^\s*(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?\s*$", re.IGNORECASE)
+_SLOT_SPLIT_RE = re.compile(r"\s*(?:-|–|—|\bto\b)\s*", re.IGNORECASE)
+
+
+def parse_day(text) -> Optional[int]:
+    """'Tue', 'tues', 'Tuesday' -> 1 (Monday is 0). None if unrecognised."""
+    if not isinstance(text, str) or len(text.strip()) < 2:
+        return None
+    name = text.strip().lower().rstrip(".")
+    for index, day in enumerate(DAYS):
+        if day.startswith(name):
+            return index
+    return None
+
+
+def parse_time(text) -> Optional[int]:
+    """'6:30 PM', '18:30', '6pm', '6.30' -> minutes after midnight."""
+    match = _TIME_RE.match(text or "")
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), (match.group(3) or "").lower()
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    if hour == 24 and minute == 0:
+        return MINUTES_PER_DAY
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def parse_time_slot(text) -> Optional[Tuple[int, int]]:
+    """'06:00 AM - 08:00 AM' or '18:00 to 20:00' -> (start, end) minutes."""
+    if not isinstance(text, str):
+        return None
+    parts = _SLOT_SPLIT_RE.split(text.strip())
+    if len(parts) != 2:
+        return None
+    start, end = parse_time(parts[0]), parse_time(parts[1])
+    if start is None or end is None or start == end:
+        return None
+    return start, end
+
+
+def availability(weekly_schedule) -> list:
+    """
+    Normalize free-form weekly schedules into sorted, merged per-day minute
+    intervals: [{"day": 1, "start": 1080, "end": 1200}, ...]. Unchecked
+    entries and unparseable days/slots are skipped; slots past midnight are
+    split across the two days.
+    """
+    intervals = {day: [] for day in range(len(DAYS))}
+    for schedule in weekly_schedule or []:
+        if isinstance(schedule, dict):
+            days, checked, time_slots = schedule.get("days"), schedule.get("checked"), schedule.get("time_slots")
+        else:
+            days, checked, time_slots = schedule.days, schedule.checked, schedule.time_slots
+        if not checked:
+            continue
+        for day in filter(lambda d: d is not None, map(parse_day, days or [])):
+            for slot in filter(None, map(parse_time_slot, time_slots or [])):
+                start, end = slot
+                if end > start:
+                    intervals[day].append((start, end))
+                else:
+                    intervals[day].append((start, MINUTES_PER_DAY))
+                    intervals[(day + 1) % len(DAYS)].append((0, end))
+
+    result = []
+    for day, day_intervals in intervals.items():
+        merged = []
+        for start, end in sorted(day_intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        result.extend({"day": day, "start": start, "end": end} for start, end in merged)
+    return result
+
+
+def _free_on(day: int, start: int, end: int) -> dict:
+    return {"availability": {"$elemMatch": {"day": day, "start": {"$lte": start}, "end": {"$gte": end}}}}
+
+
+def availability_filter(day: int, start: int, end: int) -> dict:
+    """
+    Filter for trainers free from `start` to `end` minutes on `day`. A
+    window ending at or before its start, or past midnight, continues into
+    the next day and must be free on both, as `availability` stores slots
+    past midnight split across the two days.
+    """
+    if end <= start:
+        end += MINUTES_PER_DAY
+    if end <= MINUTES_PER_DAY:
+        return _free_on(day, start, end)
+    return {"$and": [
+        _free_on(day, start, MINUTES_PER_DAY),
+        _free_on((day + 1) % len(DAYS), 0, end - MINUTES_PER_DAY),
+    ]}
@@ -0,0 +1,127 @@
+"""
+Gyms with their category and facility names: the client-side join the admin
+UI does today (get_gyms + get_categories + get_facilities, joined in
+Python), one lookup per gym, a single $lookup pipeline, and hydrate_gyms()
+with a cold and a warm id -> name cache (what get_gyms?hydrate=true does).
+
+Seeds a throwaway "<MONGO_DB_NAME>_bench" database on MONGO_DB_URL:
+
+    python -m benchmarks.gym_hydration_benchmark --gyms 1000 --runs 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import motor.motor_asyncio
+from app.core.config import settings
+from app.utils.cache import category_cache, facility_cache
+from app.utils.references import hydrate_gyms
+from benchmarks.gym_near_benchmark import make_gym
+
+CATEGORIES = 8
+FACILITIES = 7
+
+
+async def client_join(db):
+    gyms = await db["gyms"].find({}).to_list(length=None)
+    categories = {c["category_id"]: c["category_name"] async for c in db["categories"].find({})}
+    facilities = {f["facility_id"]: f["facility_name"] async for f in db["facilities"].find({})}
+    for gym in gyms:
+        gym["category_name"] = categories.get(gym["category_id"])
+        gym["facility_names"] = [facilities.get(facility_id) for facility_id in gym["facilities"]]
+    return gyms
+
+
+async def per_gym(db):
+    gyms = await db["gyms"].find({}).to_list(length=None)
+    for gym in gyms:
+        category = await db["categories"].find_one({"category_id": gym["category_id"]})
+        facilities = {
+            f["facility_id"]: f["facility_name"]
+            async for f in db["facilities"].find({"facility_id": {"$in": gym["facilities"]}})
+        }
+        gym["category_name"] = category["category_name"] if category else None
+        gym["facility_names"] = [facilities.get(facility_id) for facility_id in gym["facilities"]]
+    return gyms
+
+
+async def lookup_pipeline(db):
+    pipeline = [
+        {"$lookup": {"from": "categories", "localField": "category_id", "foreignField": "category_id", "as": "category"}},
+        {"$lookup": {"from": "facilities", "localField": "facilities", "foreignField": "facility_id", "as": "facility_docs"}},
+    ]
+    gyms = await db["gyms"].aggregate(pipeline).to_list(length=None)
+    for gym in gyms:
+        category = gym.pop("category")
+        gym["category_name"] = category[0]["category_name"] if category else None
+        # $lookup drops order and duplicates; restore them from `facilities`
+        names = {f["facility_id"]: f["facility_name"] for f in gym.pop("facility_docs")}
+        gym["facility_names"] = [names.get(facility_id) for facility_id in gym["facilities"]]
+    return gyms
+
+
+async def hydrated(db):
+    gyms = await db["gyms"].find({}).to_list(length=None)
+    await hydrate_gyms(gyms, db["categories"], db["facilities"])
+    return gyms
+
+
+async def hydrated_cold(db):
+    category_cache.clear()
+    facility_cache.clear()
+    return await hydrated(db)
+
+
+async def timed(func, runs, db):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await func(db)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(args):
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[f"{settings.MONGO_DB}_bench"]
+    try:
+        for name in ("gyms", "categories", "facilities"):
+            await db[name].drop()
+        await db["categories"].insert_many(
+            [{"category_id": f"cat-{i}", "category_name": f"Category {i}"} for i in range(CATEGORIES)]
+        )
+        await db["facilities"].insert_many(
+            [{"facility_id": f"fac-{i}", "facility_name": f"Facility {i}"} for i in range(FACILITIES)]
+        )
+        await db["categories"].create_index("category_id", unique=True)
+        await db["facilities"].create_index("facility_id", unique=True)
+        for start in range(0, args.gyms, 1000):
+            await db["gyms"].insert_many([make_gym(i) for i in range(start, min(start + 1000, args.gyms))])
+
+        results = {
+            "client-side join (3 reads)": await timed(client_join, args.runs, db),
+            "$lookup pipeline": await timed(lookup_pipeline, args.runs, db),
+            "hydrate, cold cache": await timed(hydrated_cold, args.runs, db),
+            "hydrate, warm cache": await timed(hydrated, args.runs, db),
+        }
+        if not args.skip_per_gym:
+            results["one lookup per gym"] = await timed(per_gym, max(args.runs // 10, 1), db)
+
+        print(f"{args.gyms} gyms, {CATEGORIES} categories, {FACILITIES} facilities, {args.runs} runs")
+        for name, samples in results.items():
+            samples.sort()
+            p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+            print(f"  {name:<28} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+    finally:
+        if not args.keep:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gyms", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--skip-per-gym", action="store_true", help="skip the slow one-lookup-per-gym variant")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+Nearest-gym lookup: $geoNear on the 2dsphere index vs fetching every gym
+(what clients do with get_gyms today) and sorting by distance in Python.
+
+Seeds a throwaway "<MONGO_DB_NAME>_bench" database on MONGO_DB_URL:
+
+    python -m benchmarks.gym_near_benchmark --gyms 10000 --runs 50
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+import motor.motor_asyncio
+from app.core.config import settings
+
+# Roughly Sri Lanka
+LNG_RANGE = (79.7, 81.9)
+LAT_RANGE = (5.9, 9.8)
+
+
+def haversine_km(lng1, lat1, lng2, lat2):
+    lng1, lat1, lng2, lat2 = map(math.radians, (lng1, lat1, lng2, lat2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 6371.0088 * 2 * math.asin(math.sqrt(a))
+
+
+def make_gym(index: int) -> dict:
+    return {
+        "gym_id": f"bench-{index}",
+        "gym_name": f"Bench Gym {index}",
+        "category_id": f"cat-{index % 8}",
+        "facilities": [f"fac-{index % 5}", f"fac-{index % 7}"],
+        "city": "Colombo",
+        "about": "x" * 400,
+        "opening_hours": {day: "06:00-22:00" for day in ("mon", "tue", "wed", "thu", "fri", "sat", "sun")},
+        "membership_options": {"monthly": 5000, "yearly": 50000},
+        "gallery": [f"https://example.com/{index}/{n}.jpg" for n in range(6)],
+        "status": "active",
+        "location": {"type": "Point", "coordinates": [random.uniform(*LNG_RANGE), random.uniform(*LAT_RANGE)]},
+    }
+
+
+async def geo_near(collection, lng, lat, radius_km, limit, category_id):
+    pipeline = [
+        {"$geoNear": {
+            "near": {"type": "Point", "coordinates": [lng, lat]},
+            "key": "location",
+            "distanceField": "distance_km",
+            "distanceMultiplier": 0.001,
+            "maxDistance": radius_km * 1000,
+            "spherical": True,
+            "query": {"category_id": category_id},
+        }},
+        {"$limit": limit},
+    ]
+    return await collection.aggregate(pipeline).to_list(length=limit)
+
+
+async def full_scan(collection, lng, lat, radius_km, limit, category_id):
+    gyms = await collection.find({}).to_list(length=None)
+    nearby = []
+    for gym in gyms:
+        if gym["category_id"] != category_id:
+            continue
+        distance = haversine_km(lng, lat, *gym["location"]["coordinates"])
+        if distance <= radius_km:
+            nearby.append((distance, gym))
+    nearby.sort(key=lambda item: item[0])
+    return [gym for _, gym in nearby[:limit]]
+
+
+async def timed(func, runs, *args):
+    samples = []
+    for _ in range(runs):
+        lng, lat = random.uniform(*LNG_RANGE), random.uniform(*LAT_RANGE)
+        start = time.perf_counter()
+        await func(*args[:1], lng, lat, *args[1:])
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(args):
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[f"{settings.MONGO_DB}_bench"]
+    collection = db["gyms"]
+    try:
+        await collection.drop()
+        for start in range(0, args.gyms, 1000):
+            await collection.insert_many([make_gym(i) for i in range(start, min(start + 1000, args.gyms))])
+        await collection.create_index([("location", "2dsphere")])
+
+        params = (args.radius_km, args.limit, "cat-1")
+        results = {
+            "$geoNear + 2dsphere": await timed(geo_near, args.runs, collection, *params),
+            "full scan + Python sort": await timed(full_scan, args.runs, collection, *params),
+        }
+        print(f"{args.gyms} gyms, radius {args.radius_km} km, limit {args.limit}, {args.runs} runs")
+        for name, samples in results.items():
+            samples.sort()
+            p95 = samples[max(int(len(samples) * 0.95) - 1, 0)]
+            print(f"  {name:<26} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+    finally:
+        if not args.keep:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gyms", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--radius-km", type=float, default=15)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    asyncio.run(main(parser.parse_args()))
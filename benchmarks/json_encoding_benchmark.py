@@ -0,0 +1,101 @@
+"""
+Response encoding of trainer list pages: the previous FastAPI path (an
+`_id` -> str loop, then `response_model=dict` validation + serialization or
+jsonable_encoder, then stdlib json) vs BSONJSONResponse (orjson, BSON types
+handled by its default hook).
+
+Runs in-process on generated documents, no database needed:
+
+    python -m benchmarks.json_encoding_benchmark --docs 1000 10000 --runs 20
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.utils.json_response import BSONJSONResponse
+
+DICT_ADAPTER = TypeAdapter(dict)
+
+
+def make_trainer(index: int) -> dict:
+    created_at = datetime(2024, 1, 1) + timedelta(minutes=index)
+    return {
+        "_id": ObjectId(),
+        "trainer_id": str(ObjectId()),
+        "full_name": f"Bench Trainer {index}",
+        "experience": index % 20,
+        "primary_specialization": ("yoga", "strength training", "pilates", "crossfit")[index % 4],
+        "languages": ["English", "Sinhala"],
+        "short_bio": "Certified coach " * 10,
+        "skills": {"weight_loss": True, "strength": index % 2 == 0, "yoga": index % 3 == 0, "rehab": False},
+        "skills_mask": index % 16,
+        "certifications": [
+            {"title": "Level 2", "description": "x" * 60, "file_url": f"https://example.com/{index}.pdf",
+             "file_name": f"{index}.pdf", "file_size": 12345},
+        ],
+        "preferred_mode": {"online": True, "in_person": index % 2 == 0},
+        "weekly_schedule": [{"days": "Monday", "checked": True, "time_slots": ["06:00 - 09:00", "17:00 - 20:00"]}],
+        "availability": [{"day": 0, "start": 360, "end": 540}, {"day": 0, "start": 1020, "end": 1200}],
+        "pricing": {"per_session": 2500.0, "weekly_plan": 12000, "monthly_plan": 40000, "currency": "LKR"},
+        "media": {"profile_photo_url": f"https://example.com/{index}.jpg", "publish_status": "published"},
+        "status": "active",
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def _page(trainers: list) -> dict:
+    return {"trainers": trainers, "total": len(trainers), "page": 1, "limit": len(trainers), "next_cursor": None}
+
+
+def previous_response_model(trainers: list) -> bytes:
+    # What the trainer handlers + response_model=dict did
+    trainers = [dict(trainer, _id=str(trainer["_id"])) for trainer in trainers]
+    content = DICT_ADAPTER.dump_python(DICT_ADAPTER.validate_python(_page(trainers)), mode="json")
+    return JSONResponse(content).body
+
+
+def previous_jsonable_encoder(trainers: list) -> bytes:
+    # What the handlers without a response_model did
+    trainers = [dict(trainer, _id=str(trainer["_id"])) for trainer in trainers]
+    return JSONResponse(jsonable_encoder(_page(trainers))).body
+
+
+def bson_json_response(trainers: list) -> bytes:
+    return BSONJSONResponse(_page(trainers)).body
+
+
+def timed(func, trainers: list, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(trainers)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main(args):
+    encoders = {
+        "response_model=dict + json": previous_response_model,
+        "jsonable_encoder + json": previous_jsonable_encoder,
+        "BSONJSONResponse (orjson)": bson_json_response,
+    }
+    for count in args.docs:
+        trainers = [make_trainer(i) for i in range(count)]
+        print(f"{count} trainers, {args.runs} runs, {len(bson_json_response(trainers)) / 1024:.0f} KiB body")
+        baseline = None
+        for name, func in encoders.items():
+            median = statistics.median(timed(func, trainers, args.runs))
+            baseline = baseline or median
+            print(f"  {name:<28} median {median:8.2f} ms   {baseline / median:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+List reads through the dict path (BSON decoded to dicts, then encoded with
+BSONJSONResponse) vs the raw path (RawBSONDocument transcoded to JSON by
+raw_list_response). Reports CPU time and peak traced memory per response.
+
+By default the BSON comes from generated trainer documents, which isolates
+decode + encode. With --mongo the documents are read from a throwaway
+"<MONGO_DB_NAME>_bench" database on MONGO_DB_URL with each codec instead:
+
+    python -m benchmarks.raw_bson_benchmark --docs 1000 10000 --runs 10
+    python -m benchmarks.raw_bson_benchmark --docs 10000 --mongo
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+import bson
+from bson.raw_bson import RawBSONDocument
+from app.db.mongodb import RAW_CODEC_OPTIONS
+from app.utils.json_response import BSONJSONResponse, bsonjs, raw_list_response
+from benchmarks.json_encoding_benchmark import make_trainer
+
+
+def dict_path(blobs: list) -> bytes:
+    trainers = [bson.decode(blob) for blob in blobs]
+    return BSONJSONResponse({"trainers": trainers, "total": len(trainers)}).body
+
+
+def raw_path(blobs: list) -> bytes:
+    trainers = [RawBSONDocument(blob) for blob in blobs]
+    return raw_list_response("trainers", trainers, {"total": len(trainers)}).body
+
+
+def measure(func, *args) -> tuple:
+    """(CPU ms, peak traced KiB) of one call; memory is traced on a separate run."""
+    start = time.process_time()
+    func(*args)
+    cpu_ms = (time.process_time() - start) * 1000
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / 1024
+
+
+def report(name: str, samples: list):
+    cpu = statistics.median(sample[0] for sample in samples)
+    peak = statistics.median(sample[1] for sample in samples)
+    print(f"  {name:<10} cpu median {cpu:8.2f} ms   peak memory {peak:9.0f} KiB")
+
+
+def run_memory(args):
+    for count in args.docs:
+        blobs = [bson.encode(make_trainer(i)) for i in range(count)]
+        print(f"{count} trainers (in-process), {args.runs} runs")
+        report("dict", [measure(dict_path, blobs) for _ in range(args.runs)])
+        report("raw", [measure(raw_path, blobs) for _ in range(args.runs)])
+
+
+async def run_mongo(args):
+    import motor.motor_asyncio
+    from app.core.config import settings
+
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+    db = client[f"{settings.MONGO_DB}_bench"]
+    try:
+        for count in args.docs:
+            collection = db["trainers"]
+            await collection.drop()
+            for start in range(0, count, 1000):
+                await collection.insert_many([make_trainer(i) for i in range(start, min(start + 1000, count))])
+            raw_collection = collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+
+            async def read_dict():
+                trainers = await collection.find({}).to_list(length=None)
+                return BSONJSONResponse({"trainers": trainers, "total": len(trainers)}).body
+
+            async def read_raw():
+                trainers = await raw_collection.find({}).to_list(length=None)
+                return raw_list_response("trainers", trainers, {"total": len(trainers)}).body
+
+            print(f"{count} trainers (MongoDB), {args.runs} runs")
+            for name, read in (("dict", read_dict), ("raw", read_raw)):
+                samples = []
+                for _ in range(args.runs):
+                    start = time.process_time()
+                    await read()
+                    cpu_ms = (time.process_time() - start) * 1000
+                    tracemalloc.start()
+                    await read()
+                    peak = tracemalloc.get_traced_memory()[1] / 1024
+                    tracemalloc.stop()
+                    samples.append((cpu_ms, peak))
+                report(name, samples)
+    finally:
+        if not args.keep:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--mongo", action="store_true", help="read the documents from MongoDB")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    args = parser.parse_args()
+    if bsonjs is None:
+        print("python-bsonjs is not installed: the raw path falls back to bson.json_util")
+    if args.mongo:
+        asyncio.run(run_mongo(args))
+    else:
+        run_memory(args)
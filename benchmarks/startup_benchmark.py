@@ -0,0 +1,89 @@
+"""
+Cold-start cost: for each module, the time to import it in a fresh
+interpreter (so everything it pulls in is counted), and for app.main the
+time from interpreter start to the first response of `--paths`, served
+in-process through the ASGI interface without starting the lifespan, so
+no database is needed. Also reports whether boto3 got loaded.
+
+    python -m benchmarks.startup_benchmark --runs 5
+    python -m benchmarks.startup_benchmark --modules app.main --paths / /openapi.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "app.core.config",
+    "app.db.database",
+    "app.utils.file_uploader",
+    "app.api.v1.create_gym",
+    "app.api.v1.create_category",
+    "app.api.v1.create_facilities",
+    "app.api.v1.media_upload",
+    "app.api.v1.authentication",
+    "app.api.v1.trainers",
+    "app.api.v1.metrics",
+    "app.api.v1.exports",
+    "app.main",
+]
+
+# Runs in a fresh interpreter per sample
+CHILD = r"""
+import asyncio, importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+result = {"import_ms": (time.perf_counter() - start) * 1000, "boto3": "boto3" in sys.modules}
+
+async def request(app, path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    status = {}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+    await app(scope, receive, send)
+    return status["code"]
+
+if len(sys.argv) > 2:
+    result["requests"] = {}
+    for path in sys.argv[2:]:
+        code = asyncio.run(request(module.app, path))
+        result["requests"][path] = {"status": code, "since_start_ms": (time.perf_counter() - start) * 1000}
+print(json.dumps(result))
+"""
+
+
+def sample(module: str, paths: list) -> dict:
+    env = {"MONGO_DB_URL": "mongodb://localhost:27017", "MONGO_DB_NAME": "startup_bench", **os.environ}
+    args = [sys.executable, "-c", CHILD, module, *(paths if module == "app.main" else [])]
+    output = subprocess.run(args, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    print(f"median of {args.runs} fresh interpreters")
+    for module in args.modules:
+        samples = [sample(module, args.paths) for _ in range(args.runs)]
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        boto3 = "boto3 loaded" if samples[0]["boto3"] else ""
+        print(f"  {module:<32} import {import_ms:8.1f} ms   {boto3}")
+        for path in samples[0].get("requests", {}):
+            first_ms = statistics.median(s["requests"][path]["since_start_ms"] for s in samples)
+            status = samples[0]["requests"][path]["status"]
+            print(f"    first GET {path:<22} {first_ms:8.1f} ms after start   (HTTP {status})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--paths", nargs="+", default=["/", "/openapi.json"])
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
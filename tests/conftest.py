@@ -0,0 +1,5 @@
+import os
+
+# app.core.config refuses to load without these; the unit tests never connect
+os.environ.setdefault("MONGO_DB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DB_NAME", "fithub_test")
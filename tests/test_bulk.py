@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+import orjson
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.utils.bulk import BulkWriter, iter_request_items, run_bulk
+
+
+class Item(BaseModel):
+    name: str
+    status: str = "active"
+
+
+def _document(item: Item) -> dict:
+    return {"item_id": f"id-{item.name}", **item.model_dump()}
+
+
+class FakeRequest:
+    def __init__(self, body: bytes, content_type="application/json", chunk_size=16, declared_length=True):
+        self.headers = {"content-type": content_type}
+        if declared_length:
+            self.headers["content-length"] = str(len(body))
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.read = 0
+
+    async def stream(self):
+        for chunk in self.chunks:
+            self.read += len(chunk)
+            yield chunk
+
+
+class FakeCollection:
+    name = "items"
+
+    def __init__(self, taken=()):
+        self.taken = set(taken)
+        self.batches = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+        errors, upserted = [], []
+        for position, operation in enumerate(operations):
+            document = getattr(operation, "_doc", None)
+            if document is not None and document["name"] in self.taken:
+                errors.append({"index": position, "code": 11000, "errmsg": "E11000 duplicate key"})
+            elif document is None:
+                upserted.append({"index": position})
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "upserted": upserted})
+        return SimpleNamespace(upserted_ids={item["index"]: None for item in upserted})
+
+
+def _run(request, collection, **kwargs):
+    return asyncio.run(run_bulk(request, collection, Item, _document, "item_id", ("name",), **kwargs))
+
+
+def test_per_item_results_and_duplicate_mapping():
+    collection = FakeCollection(taken={"taken"})
+    flushed = []
+
+    async def on_flush(written):
+        flushed.extend(document["name"] for document in written)
+
+    body = orjson.dumps([{"name": "a"}, {"name": "taken"}, {"status": "x"}, {"name": "a"}, {"name": "b"}])
+    result = _run(FakeRequest(body), collection, chunk_size=2, on_flush=on_flush)
+
+    statuses = [(item["index"], item["status"]) for item in result["results"]]
+    assert statuses == [(0, "created"), (1, "duplicate"), (2, "invalid"), (3, "duplicate"), (4, "created")]
+    assert result["summary"]["created"] == 2 and result["summary"]["duplicate"] == 2
+    assert flushed == ["a", "b"] and not result["truncated"]
+
+
+def test_upsert_keeps_server_defaults_insert_only():
+    writer = BulkWriter(FakeCollection(), "item_id", ("name",), "upsert", 10, server_defaults=("status",))
+    operation = writer._operation({"item_id": "id-a", "name": "a", "status": "active"}, frozenset({"name"}))
+    assert operation._filter == {"name": "a"}
+    assert operation._doc["$setOnInsert"] == {"item_id": "id-a", "status": "active"}
+    assert "status" not in operation._doc["$set"]
+
+
+def test_ndjson_reading_stops_at_the_item_limit(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+    body = b"".join(orjson.dumps({"name": f"n{i}"}) + b"\n" for i in range(50))
+    request = FakeRequest(body, "application/x-ndjson")
+    result = _run(request, FakeCollection())
+
+    assert result["truncated"] and result["summary"]["created"] == 2
+    assert result["results"][-1]["status"] == "error"
+    assert request.read < len(body)
+
+
+def test_declared_oversize_body_is_413_before_reading(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_BODY_BYTES", 10)
+    request = FakeRequest(orjson.dumps([{"name": "a"}, {"name": "b"}]))
+    with pytest.raises(HTTPException) as error:
+        _run(request, FakeCollection())
+    assert error.value.status_code == 413 and request.read == 0
+
+
+def test_undeclared_oversize_array_is_413(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_BODY_BYTES", 10)
+    request = FakeRequest(orjson.dumps([{"name": "a"}, {"name": "b"}]), declared_length=False)
+
+    async def read_all():
+        return [item async for item in iter_request_items(request)]
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(read_all())
+    assert error.value.status_code == 413
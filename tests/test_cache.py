@@ -0,0 +1,64 @@
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import CACHES, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache():
+    cache = TTLCache("test", maxsize=2, ttl=10)
+    yield cache
+    CACHES.pop("test", None)
+
+
+def test_get_and_set(cache, clock):
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.set("a", 1)
+    clock[0] += 10
+    assert cache.get("a", "gone") == "gone"
+    assert cache.expirations == 1 and len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_clear_rejects_values_loaded_before_it(cache, clock):
+    generation = cache.generation
+    cache.clear()  # a write lands while the reader is loading
+    cache.set("a", "stale", generation)
+    assert cache.get("a") is None
+
+    cache.set("a", "fresh", cache.generation)
+    assert cache.get("a") == "fresh"
+    assert cache.invalidations == 1
+
+
+def test_stats(cache, clock):
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert stats["size"] == 1 and stats["hit_ratio"] == 0.5
+
+
+def test_cache_is_registered_by_name(cache):
+    assert CACHES["test"] is cache
@@ -0,0 +1,156 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from pymongo.errors import OperationFailure
+from app.db.change_streams import ChangeStreamWatcher
+from app.db.monitoring import WATCH_ROUTE_PREFIX, CommandMetricsListener, current_route
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        since = query["updated_at"]["$gt"]
+        return FakeCursor([document for document in self.documents if document["updated_at"] > since])
+
+
+class FakeDb(dict):
+    def watch(self, *args, **kwargs):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+
+def _watcher():
+    return ChangeStreamWatcher("test", ("trainers", "categories"), fallback_refresh_s=60)
+
+
+def test_subscribe_rejects_unwatched_collection():
+    with pytest.raises(ValueError):
+        _watcher().subscribe("gyms", lambda change: None)
+
+
+def test_dispatch_reaches_only_the_collection_handlers():
+    watcher = _watcher()
+    seen = []
+
+    async def trainer_handler(change):
+        seen.append(("trainers", change["operationType"]))
+
+    watcher.subscribe("trainers", trainer_handler)
+    watcher.subscribe("categories", lambda change: seen.append(("categories", change["operationType"])))
+
+    asyncio.run(watcher._dispatch({"operationType": "insert", "ns": {"coll": "trainers"}}))
+    assert seen == [("trainers", "insert")]
+    assert watcher.events == 1
+
+
+def test_failing_handler_does_not_stop_the_others():
+    watcher = _watcher()
+    seen = []
+    watcher.subscribe("categories", lambda change: 1 / 0)
+    watcher.subscribe("categories", lambda change: seen.append(change["operationType"]))
+
+    asyncio.run(watcher._dispatch({"operationType": "delete", "ns": {"coll": "categories"}}))
+    assert seen == ["delete"]
+    assert watcher.errors == 1
+
+
+def test_dispatch_all_sends_invalidate_everywhere():
+    watcher = _watcher()
+    seen = []
+    watcher.subscribe("trainers", lambda change: seen.append(("trainers", change["operationType"])))
+    watcher.subscribe("categories", lambda change: seen.append(("categories", change["operationType"])))
+
+    asyncio.run(watcher._dispatch_all())
+    assert seen == [("trainers", "invalidate"), ("categories", "invalidate")]
+
+
+def test_pipeline_projects_full_document_fields():
+    watcher = _watcher()
+    watcher.subscribe("trainers", lambda change: None, full_document_fields=["trainer_id", "status"])
+    project = watcher._pipeline()[1]["$project"]
+    assert project["fullDocument.trainer_id"] == 1 and project["fullDocument.status"] == 1
+
+
+def test_poll_feeds_updated_documents_to_document_handlers_only():
+    watcher = _watcher()
+    now = datetime.utcnow()
+    trainers = FakeCollection([
+        {"_id": 1, "trainer_id": "old", "updated_at": now - timedelta(hours=1)},
+        {"_id": 2, "trainer_id": "new", "updated_at": now},
+    ])
+    db = FakeDb(trainers=trainers, categories=FakeCollection([]))
+    followed, cleared = [], []
+    watcher.subscribe("trainers", lambda change: cleared.append(change))
+    watcher.subscribe("trainers", lambda change: followed.append(change), full_document_fields=["trainer_id"])
+
+    asyncio.run(watcher.poll_once(db, now - timedelta(minutes=1)))
+    assert [change["fullDocument"]["trainer_id"] for change in followed] == ["new"]
+    assert followed[0]["operationType"] == "update" and followed[0]["documentKey"] == {"_id": 2}
+    assert cleared == []
+    # Collections without document handlers are not queried
+    assert db["categories"].queries == []
+    assert trainers.queries[0][1] == {"trainer_id": 1}
+
+
+def test_disabled_change_streams_poll_instead():
+    async def scenario():
+        watcher = _watcher()
+        await watcher.start(FakeDb(), change_streams=False)
+        await asyncio.sleep(0)
+        mode = watcher.mode
+        await watcher.stop()
+        return mode, watcher.mode
+
+    assert asyncio.run(scenario()) == ("ttl_only", "stopped")
+
+
+def test_unsupported_change_streams_fall_back_to_polling():
+    async def scenario():
+        watcher = _watcher()
+        await watcher.start(FakeDb())
+        await asyncio.sleep(0)
+        mode = watcher.mode
+        await watcher.stop()
+        return mode
+
+    assert asyncio.run(scenario()) == "ttl_only"
+
+
+def _command(listener, route, command_name, duration_ms):
+    token = current_route.set(route)
+    try:
+        listener.started(SimpleNamespace(
+            command_name=command_name, command={command_name: 1, "collection": "trainers"}, connection_id=1, request_id=1
+        ))
+    finally:
+        current_route.reset(token)
+    listener.succeeded(SimpleNamespace(duration_micros=duration_ms * 1000, connection_id=1, request_id=1))
+
+
+def test_watcher_getmores_stay_out_of_the_slow_query_log():
+    listener = CommandMetricsListener(slow_ms=100)
+    _command(listener, WATCH_ROUTE_PREFIX + "cache_invalidation", "getMore", 1000)
+    assert listener.slow_queries() == []
+    # ...but still count in the latency stats
+    assert listener.snapshot()[0]["count"] == 1
+
+    _command(listener, "GET /api/v1/get/all/trainers", "getMore", 1000)
+    assert len(listener.slow_queries()) == 1
@@ -0,0 +1,104 @@
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app.api.v1.create_category import router as category_router
+from app.db.database import mongo
+from app.utils.cache import category_cache
+from app.utils.etag import document_etag, etag_matches, list_etag, not_modified
+
+UPDATED = datetime(2025, 1, 2, 3, 4, 5)
+
+
+def _request(path="/api/v1/get/all/categories", query=b"", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query, "headers": headers})
+
+
+def test_etag_depends_on_versions_and_query_but_not_parameter_order():
+    document = {"_id": 1, "updated_at": UPDATED, "created_at": UPDATED}
+    tag = document_etag(_request(query=b"a=1&b=2"), document)
+    assert tag == document_etag(_request(query=b"b=2&a=1"), document)
+    assert tag != document_etag(_request(query=b"a=1"), document)
+    assert tag != document_etag(_request(query=b"a=1&b=2"), {**document, "updated_at": datetime(2025, 2, 1)})
+    assert tag.startswith('"') and tag.endswith('"')
+
+
+def test_list_etag_covers_ids_and_extras():
+    documents = [{"_id": 1, "updated_at": UPDATED}, {"_id": 2, "updated_at": UPDATED}]
+    request = _request()
+    assert list_etag(request, documents, 2) != list_etag(request, documents, 3)
+    assert list_etag(request, documents) != list_etag(request, documents[::-1])
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ("*", True),
+    ('"other"', False),
+    (None, False),
+])
+def test_etag_matches_if_none_match(header, matches):
+    assert etag_matches(_request(if_none_match=header), '"abc"') is matches
+
+
+def test_not_modified_has_no_body():
+    response = not_modified('"abc"')
+    assert response.status_code == 304 and response.headers["etag"] == '"abc"' and response.body == b""
+
+
+class FakeFind:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeCategories:
+    name = "categories"
+
+    def __init__(self):
+        self.documents = [{"category_id": "c1", "category_name": "Yoga", "created_at": UPDATED, "updated_at": UPDATED}]
+        self.reads = 0
+
+    def find(self, query, **kwargs):
+        self.reads += 1
+        return FakeFind([dict(document) for document in self.documents])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    categories = FakeCategories()
+
+    async def get_read_collection(name, route):
+        return categories
+
+    monkeypatch.setattr(mongo, "get_read_collection", get_read_collection)
+    category_cache.clear()
+    app = FastAPI()
+    app.include_router(category_router, prefix="/api/v1")
+    yield TestClient(app), categories
+    category_cache.clear()
+
+
+def test_conditional_get_returns_304_until_the_data_changes(client):
+    client, categories = client
+    first = client.get("/api/v1/get/all/categories")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+
+    # Served from the cache: same tag, no read
+    cached = client.get("/api/v1/get/all/categories", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b"" and categories.reads == 1
+
+    # A write clears the cache; the changed page gets a new tag
+    categories.documents[0]["updated_at"] = datetime(2025, 3, 1)
+    category_cache.clear()
+    changed = client.get("/api/v1/get/all/categories", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
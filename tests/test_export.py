@@ -0,0 +1,113 @@
+import asyncio
+import csv
+import io
+from datetime import datetime, timedelta
+import orjson
+from app.utils.export import CURSOR_FIELD, export_documents, model_columns, select_columns
+from app.api.v1.schemas.trainer_schema import TrainerBase
+from app.utils.pagination import TRAINER_SORT
+
+CREATED_AT = datetime(2025, 1, 2, 3, 4, 5)
+
+
+def _matches(document: dict, query: dict) -> bool:
+    """The keyset operators apply_cursor produces."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$gt" in condition and not document[key] > condition["$gt"]:
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        self.documents.sort(key=lambda document: tuple(document[key] for key, _ in sort))
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeTrainers:
+    def __init__(self, count):
+        self.documents = [
+            {
+                "trainer_id": f"t{i}",
+                "created_at": CREATED_AT + timedelta(minutes=i // 2),  # ties broken by trainer_id
+                "full_name": f"Trainer, {i}",
+                "pricing": {"per_session": 10 * i},
+                "languages": ["English"],
+            }
+            for i in range(count)
+        ]
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(document) for document in self.documents if _matches(document, query)])
+
+
+def _body(response) -> bytes:
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+    return asyncio.run(read())
+
+
+def _export(export_format, cursor=None, batch_size=2):
+    columns = ["trainer_id", "full_name", "pricing.per_session", "languages"]
+    response = export_documents(
+        FakeTrainers(5), {}, TRAINER_SORT, export_format, columns, cursor=cursor, batch_size=batch_size, filename="trainers"
+    )
+    return response, _body(response)
+
+
+def test_csv_export_flattens_and_quotes():
+    response, body = _export("csv")
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    assert rows[0] == ["trainer_id", "full_name", "pricing.per_session", "languages", CURSOR_FIELD]
+    assert rows[1][:4] == ["t0", "Trainer, 0", "0", '["English"]']
+    assert len(rows) == 6
+    assert response.headers["content-disposition"] == 'attachment; filename="trainers.csv"'
+
+
+def test_resumed_csv_export_has_no_header_and_no_repeats():
+    _, body = _export("csv")
+    rows = list(csv.reader(io.StringIO(body.decode())))
+    resumed = list(csv.reader(io.StringIO(_export("csv", cursor=rows[2][-1])[1].decode())))
+    assert [row[0] for row in resumed] == ["t2", "t3", "t4"]
+    # Appending the resumed part to the partial download gives the full file
+    assert rows[:3] + resumed == rows
+
+
+def test_ndjson_export_resumes_after_the_cursor():
+    _, body = _export("ndjson")
+    lines = [orjson.loads(line) for line in body.splitlines()]
+    assert [line["trainer_id"] for line in lines] == ["t0", "t1", "t2", "t3", "t4"]
+    _, resumed = _export("ndjson", cursor=lines[3][CURSOR_FIELD])
+    assert [orjson.loads(line)["trainer_id"] for line in resumed.splitlines()] == ["t4"]
+
+
+def test_model_columns_and_projection_selection():
+    columns = model_columns(TrainerBase)
+    assert "pricing.per_session" in columns and "skills.hatha_yoga" in columns and "languages" in columns
+    assert select_columns(columns, {"pricing": 1}) == [column for column in columns if column.startswith("pricing.")]
+    assert select_columns(columns, None) == columns
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api.v1.create_gym import GYM_CLEARABLE_FIELDS, GYM_WRITE_ATTEMPTS, _write_gym_changes
+
+
+class FakeGyms:
+    """Serves `reads` in turn and applies no update, so every write misses unless `applies` is set."""
+
+    name = "gyms"
+
+    def __init__(self, reads, applies=False):
+        self.reads = list(reads)
+        self.applies = applies
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        return self.reads.pop(0) if len(self.reads) > 1 else self.reads[0]
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.updates.append((query, update))
+        return {"gym_id": query["gym_id"], **update["$set"]} if self.applies else None
+
+
+def test_write_is_filtered_on_the_values_it_diffed():
+    gyms = FakeGyms([{"gym_id": "g1", "city": "Kandy", "opening_hours": {"mon": "closed"}}], applies=True)
+    gym, written = asyncio.run(_write_gym_changes(gyms, "g1", {"city": "Galle", "opening_hours.mon.open": "06:00"}))
+    query, update = gyms.updates[0]
+    assert written and query == {"gym_id": "g1", "city": "Kandy", "opening_hours": {"mon": "closed"}}
+    # A scalar stored under the merged key is replaced whole, never dotted into
+    assert update["$set"]["opening_hours.mon"] == {"open": "06:00"}
+
+
+def test_concurrent_change_is_rediffed():
+    gyms = FakeGyms([{"gym_id": "g1", "city": "Kandy"}, {"gym_id": "g1", "city": "Galle"}])
+    gym, written = asyncio.run(_write_gym_changes(gyms, "g1", {"city": "Galle"}))
+    # The second read already holds the requested value, so nothing is written
+    assert not written and len(gyms.updates) == 1
+
+
+def test_persistent_conflict_is_409():
+    gyms = FakeGyms([{"gym_id": "g1", "city": "Kandy"}])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(_write_gym_changes(gyms, "g1", {"city": "Galle"}))
+    assert error.value.status_code == 409 and len(gyms.updates) == GYM_WRITE_ATTEMPTS
+
+
+def test_deleted_gym_is_404():
+    gyms = FakeGyms([{"gym_id": "g1", "city": "Kandy"}, None])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(_write_gym_changes(gyms, "g1", {"city": "Galle"}))
+    assert error.value.status_code == 404
+
+
+def test_null_unsets_optional_gym_fields():
+    assert GYM_CLEARABLE_FIELDS == ("location",)
+    gyms = FakeGyms([{"gym_id": "g1", "location": {"type": "Point", "coordinates": [80.6, 7.3]}}], applies=True)
+    asyncio.run(_write_gym_changes(gyms, "g1", {"location": None}))
+    assert gyms.updates[0][1]["$unset"] == {"location": ""}
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from pymongo.errors import DuplicateKeyError
+from app.db import indexes
+from app.db.indexes import INDEX_SPECS, check_duplicates, ensure_indexes, find_duplicates, missing_unique_indexes
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _matches(document, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict) and "$ne" in condition:
+            if document.get(field) == condition["$ne"]:
+                return False
+        elif document.get(field) != condition:
+            return False
+    return True
+
+
+class FakeCollection:
+    def __init__(self, name, indexes=(), documents=()):
+        self.name = name
+        self.indexes = {index["name"]: index for index in indexes}
+        self.documents = list(documents)
+        self.calls = []
+
+    def list_indexes(self):
+        return FakeCursor(list(self.indexes.values()))
+
+    async def drop_index(self, name):
+        self.calls.append(("drop", name))
+        del self.indexes[name]
+
+    async def create_index(self, keys, name, **options):
+        self.calls.append(("create", name))
+        self.indexes[name] = {"name": name, "key": dict(keys), **options}
+
+    def find(self, query, projection=None):
+        return FakeCursor([document for document in self.documents if _matches(document, query)])
+
+
+def _db(**overrides):
+    return {name: overrides.get(name, FakeCollection(name)) for name in INDEX_SPECS}
+
+
+@pytest.fixture
+def missing():
+    # Cleared in place: app.db.database holds the same set
+    indexes.missing_unique.clear()
+    yield indexes.missing_unique
+    indexes.missing_unique.clear()
+
+
+def test_startup_creates_but_does_not_rebuild():
+    # gym_name_1_unique exists without its unique option
+    gyms = FakeCollection("gyms", [{"name": "gym_name_1_unique", "key": {"gym_name": 1}}])
+    db = _db(gyms=gyms)
+
+    asyncio.run(ensure_indexes(db, rebuild=False))
+    assert ("drop", "gym_name_1_unique") not in gyms.calls
+    assert ("create", "gym_id_1") in gyms.calls
+    assert asyncio.run(missing_unique_indexes(db)) == ["gyms.gym_name_1_unique"]
+
+    asyncio.run(ensure_indexes(db))
+    assert gyms.calls[-2:] == [("drop", "gym_name_1_unique"), ("create", "gym_name_1_unique")]
+    assert asyncio.run(missing_unique_indexes(db)) == []
+
+
+def test_no_app_check_while_the_indexes_exist(missing):
+    gyms = FakeCollection("gyms", documents=[{"gym_id": "g1", "gym_name": "Iron"}])
+    assert asyncio.run(find_duplicates(gyms, [{"gym_name": "Iron"}])) == [None]
+
+
+def test_find_duplicates_per_document(missing):
+    missing.add("gyms.gym_name_1_unique")
+    gyms = FakeCollection("gyms", documents=[{"gym_id": "g1", "gym_name": "Iron"}])
+    found = asyncio.run(find_duplicates(gyms, [{"gym_name": "Iron"}, {"gym_name": "Pulse"}, {"city": "Kandy"}]))
+    assert found == ["gym_name_1_unique", None, None]
+
+
+def test_check_duplicates_excludes_the_document_itself(missing):
+    missing.add("gyms.gym_name_1_unique")
+    gyms = FakeCollection("gyms", documents=[{"gym_id": "g1", "gym_name": "Iron"}])
+    asyncio.run(check_duplicates(gyms, {"gym_name": "Iron"}, exclude={"gym_id": {"$ne": "g1"}}))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(check_duplicates(gyms, {"gym_name": "Iron"}, exclude={"gym_id": {"$ne": "g2"}}))
+
+
+def test_compound_keys_match_on_every_field(missing):
+    missing.add("trainers.full_name_1_primary_specialization_1_unique")
+    trainers = FakeCollection("trainers", documents=[{"full_name": "Ann", "primary_specialization": "yoga"}])
+    found = asyncio.run(find_duplicates(trainers, [
+        {"full_name": "Ann", "primary_specialization": "yoga"},
+        {"full_name": "Ann", "primary_specialization": "pilates"},
+    ]))
+    assert found == ["full_name_1_primary_specialization_1_unique", None]
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_connect_all_with_a_missing_unique_index(monkeypatch, missing, strict):
+    from app.core.config import settings
+    from app.db import database
+
+    db = _db(gyms=FakeCollection("gyms", [{"name": "gym_name_1_unique", "key": {"gym_name": 1}}]))
+
+    async def connect():
+        database.mongo.db = db
+
+    monkeypatch.setattr(database.mongo, "connect", connect)
+    monkeypatch.setattr(database.mongo, "db", None)
+    monkeypatch.setattr(settings, "MONGO_ENSURE_INDEXES", True)
+    monkeypatch.setattr(settings, "MONGO_STRICT_UNIQUE_INDEXES", strict)
+    monkeypatch.setattr(settings, "TRAINER_SEARCH_INDEX", False)
+
+    if strict:
+        with pytest.raises(RuntimeError):
+            asyncio.run(database.connect_all())
+    else:
+        asyncio.run(database.connect_all())
+        assert missing == {"gyms.gym_name_1_unique"}
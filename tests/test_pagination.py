@@ -0,0 +1,205 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from app.utils.pagination import (
+    GYM_SORT, RANK_SORT, TRAINER_SORT, apply_cursor, count_cache, decode_cursor, encode_cursor, fetch_page,
+    keyset_filter, next_cursor,
+)
+
+CREATED_AT = datetime(2025, 1, 2, 3, 4, 5)
+
+
+def _matches(document: dict, query: dict) -> bool:
+    """Evaluate the subset of query operators keyset_filter produces."""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(_matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document[key]
+            for operator, operand in condition.items():
+                if operator == "$gt" and not value > operand:
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+def test_cursor_round_trip():
+    document = {"created_at": CREATED_AT, "trainer_id": "abc", "full_name": "x"}
+    assert decode_cursor(encode_cursor(document, TRAINER_SORT), TRAINER_SORT) == [CREATED_AT, "abc"]
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor({"created_at": CREATED_AT, "trainer_id": "a" * 7}, TRAINER_SORT)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+def test_cursor_reads_nested_paths():
+    assert decode_cursor(encode_cursor({"a": {"b": 3}}, [("a.b", 1)]), [("a.b", 1)]) == [3]
+
+
+def test_cursor_of_other_listing_is_rejected():
+    cursor = encode_cursor({"created_at": CREATED_AT, "gym_id": "g"}, GYM_SORT)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, TRAINER_SORT)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "e30", "!!!"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, TRAINER_SORT)
+    assert error.value.status_code == 400
+
+
+def test_keyset_filter_shape():
+    assert keyset_filter([1, "b"], [("a", 1), ("id", -1)]) == {
+        "$or": [{"a": {"$gt": 1}}, {"a": 1, "id": {"$lt": "b"}}]
+    }
+
+
+def test_keyset_filter_boundaries():
+    sort = [("created_at", 1), ("trainer_id", 1)]
+    query = keyset_filter([10, "m"], sort)
+    assert not _matches({"created_at": 10, "trainer_id": "m"}, query)  # the cursor row itself
+    assert not _matches({"created_at": 10, "trainer_id": "a"}, query)
+    assert _matches({"created_at": 10, "trainer_id": "z"}, query)  # tie on the first key
+    assert not _matches({"created_at": 9, "trainer_id": "z"}, query)
+    assert _matches({"created_at": 11, "trainer_id": "a"}, query)
+
+
+def test_keyset_pages_cover_every_document_once():
+    documents = [{"created_at": day, "trainer_id": f"t{index}"} for index, day in enumerate([1, 1, 1, 2, 3, 3, 4])]
+    ordered = sorted(documents, key=lambda d: (d["created_at"], d["trainer_id"]))
+
+    seen, cursor = [], None
+    while True:
+        query = apply_cursor({}, cursor, TRAINER_SORT)
+        page = [d for d in ordered if _matches(d, query)][:3]
+        seen.extend(page)
+        cursor = next_cursor(page, 3, TRAINER_SORT)
+        if cursor is None:
+            break
+    assert seen == ordered
+
+
+def test_apply_cursor_keeps_listing_filter():
+    cursor = encode_cursor({"created_at": 1, "trainer_id": "a"}, TRAINER_SORT)
+    assert apply_cursor({}, None, TRAINER_SORT) == {}
+    assert apply_cursor({"status": "active"}, None, TRAINER_SORT) == {"status": "active"}
+    assert apply_cursor({}, cursor, TRAINER_SORT) == keyset_filter([1, "a"], TRAINER_SORT)
+    assert apply_cursor({"status": "active"}, cursor, TRAINER_SORT) == {
+        "$and": [{"status": "active"}, keyset_filter([1, "a"], TRAINER_SORT)]
+    }
+
+
+def test_next_cursor_only_for_full_pages():
+    page = [{"created_at": 1, "trainer_id": "a"}, {"created_at": 2, "trainer_id": "b"}]
+    assert next_cursor(page, 3, TRAINER_SORT) is None
+    assert next_cursor([], 3, TRAINER_SORT) is None
+    assert next_cursor(page, None, TRAINER_SORT) is None
+    assert decode_cursor(next_cursor(page, 2, TRAINER_SORT), TRAINER_SORT) == [2, "b"]
+
+
+def test_rank_cursor_carries_offset():
+    assert decode_cursor(encode_cursor({"_rank": 20}, RANK_SORT), RANK_SORT) == [20]
+
+
+class FakeFind:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, sort):
+        return self
+
+    def skip(self, skip):
+        self.documents = self.documents[skip:]
+        return self
+
+    def limit(self, limit):
+        self.documents = self.documents[:limit]
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeTrainers:
+    name = "trainers"
+
+    def __init__(self, total):
+        self.documents = [{"trainer_id": f"t{i}", "created_at": CREATED_AT} for i in range(total)]
+        self.calls = []
+
+    def find(self, query, **kwargs):
+        self.calls.append("find")
+        return FakeFind(list(self.documents))
+
+    def aggregate(self, pipeline):
+        self.calls.append("aggregate")
+        self.pipeline = pipeline
+        facet = pipeline[-1]["$facet"]
+        skip = next((stage["$skip"] for stage in facet["items"] if "$skip" in stage), 0)
+        result = [{"total": [{"count": len(self.documents)}], "items": self.documents[skip:skip + facet["items"][-1]["$limit"]]}]
+        return FakeFind(result)
+
+    async def count_documents(self, query):
+        self.calls.append("count_documents")
+        return len(self.documents)
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated_document_count")
+        return len(self.documents)
+
+
+@pytest.fixture
+def counts():
+    count_cache.clear()
+    yield count_cache
+    count_cache.clear()
+
+
+def test_exact_count_is_the_default_facet(counts):
+    trainers = FakeTrainers(25)
+    documents, total = asyncio.run(fetch_page(trainers, {"status": "active"}, TRAINER_SORT, 10, page=3, projection={"trainer_id": 1}))
+    assert (len(documents), total) == (5, 25)
+    assert trainers.calls == ["aggregate"]
+    # The projection trims documents before the facet
+    assert [next(iter(stage)) for stage in trainers.pipeline] == ["$match", "$sort", "$project", "$facet"]
+
+
+def test_cursor_pages_stay_on_find(counts):
+    trainers = FakeTrainers(25)
+    cursor = encode_cursor(trainers.documents[9], TRAINER_SORT)
+    _, total = asyncio.run(fetch_page(trainers, {}, TRAINER_SORT, 10, cursor=cursor))
+    assert total == 25 and trainers.calls == ["find", "count_documents"]
+
+
+def test_estimated_count_is_cached(counts):
+    trainers = FakeTrainers(25)
+    for _ in range(2):
+        _, total = asyncio.run(fetch_page(trainers, {}, TRAINER_SORT, 10, count="estimated"))
+        assert total == 25
+    assert trainers.calls == ["find", "estimated_document_count", "find"]
+
+    counts.clear()
+    asyncio.run(fetch_page(trainers, {"status": "active"}, TRAINER_SORT, 10, count="estimated"))
+    assert trainers.calls[-1] == "count_documents"
+
+
+def test_no_count(counts):
+    trainers = FakeTrainers(3)
+    documents, total = asyncio.run(fetch_page(trainers, {}, TRAINER_SORT, 10, count="none"))
+    assert len(documents) == 3 and total is None and trainers.calls == ["find"]
+
+
+def test_unknown_count_mode_is_400():
+    with pytest.raises(HTTPException):
+        asyncio.run(fetch_page(FakeTrainers(0), {}, TRAINER_SORT, 10, count="fast"))
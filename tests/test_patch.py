@@ -0,0 +1,139 @@
+import pytest
+from fastapi import HTTPException
+from app.api.v1.schemas.trainer_schema import TrainerUpdate
+from app.utils.patch import (
+    MISSING, changed_filter, diff_paths, explicit_paths, fold_into_scalars, literal_set_stage, merge_paths,
+    stored_value, unchanged_filter,
+)
+
+
+def test_explicit_paths_only_include_sent_fields():
+    update = TrainerUpdate.model_validate({"full_name": "Ann", "experience": 5})
+    assert explicit_paths(update) == {"full_name": "Ann", "experience": 5}
+
+
+def test_explicit_paths_flatten_nested_models():
+    update = TrainerUpdate.model_validate({"pricing": {"per_session": 2500}, "skills": {"hatha_yoga": True}})
+    # Defaults of the nested models are not sent, so they are not written
+    assert explicit_paths(update) == {"pricing.per_session": 2500, "skills.hatha_yoga": True}
+
+
+def test_explicit_paths_replace_lists_whole():
+    update = TrainerUpdate.model_validate({
+        "languages": ["English", "Sinhala"],
+        "certifications": [{"title": "CPR"}],
+    })
+    assert explicit_paths(update) == {
+        "languages": ["English", "Sinhala"],
+        "certifications": [{"title": "CPR", "description": None, "file_url": None, "file_name": None, "file_size": None}],
+    }
+
+
+def test_explicit_paths_none_handling():
+    # A top-level null means "not sent"; a nested null clears that field
+    update = TrainerUpdate.model_validate({"short_bio": None, "pricing": {"per_session": 10, "weekly_plan": None}})
+    assert explicit_paths(update) == {"pricing.per_session": 10, "pricing.weekly_plan": None}
+
+
+def test_explicit_paths_of_empty_update():
+    assert explicit_paths(TrainerUpdate()) == {}
+
+
+def test_changed_filter():
+    assert changed_filter({"full_name": "Ann", "pricing.per_session": 10}) == {
+        "$or": [{"full_name": {"$ne": "Ann"}}, {"pricing.per_session": {"$ne": 10}}]
+    }
+
+
+def test_literal_set_stage_never_evaluates_values():
+    assert literal_set_stage({"short_bio": "$where", "languages": ["$x"]}) == {
+        "$set": {"short_bio": {"$literal": "$where"}, "languages": {"$literal": ["$x"]}}
+    }
+
+
+def test_merge_paths_expands_merge_fields_only():
+    paths = {"opening_hours": {"mon": "6-22", "tue": None}, "contact": {}, "gallery": ["a.jpg"], "city": "Kandy"}
+    assert merge_paths(paths, ("opening_hours", "contact")) == {
+        "opening_hours.mon": "6-22",
+        "opening_hours.tue": None,
+        "contact": {},  # an empty object is left as a whole-field write
+        "gallery": ["a.jpg"],
+        "city": "Kandy",
+    }
+
+
+def test_merge_paths_flattens_nested_objects():
+    paths = {"membership_options": {"monthly": {"price": 5000, "note": None}, "daily": 500}}
+    assert merge_paths(paths, ("membership_options",)) == {
+        "membership_options.monthly.price": 5000,
+        "membership_options.monthly.note": None,
+        "membership_options.daily": 500,
+    }
+
+
+@pytest.mark.parametrize("key", ["", "a.b", "$set"])
+def test_merge_paths_rejects_unsafe_keys(key):
+    with pytest.raises(HTTPException) as error:
+        merge_paths({"opening_hours": {key: "x"}}, ("opening_hours",))
+    assert error.value.status_code == 400
+
+
+def test_stored_value():
+    document = {"opening_hours": {"mon": "6-22", "sun": None}, "city": "Kandy"}
+    assert stored_value(document, "city") == "Kandy"
+    assert stored_value(document, "opening_hours.mon") == "6-22"
+    assert stored_value(document, "opening_hours.sun") is None
+    assert stored_value(document, "opening_hours.tue") is MISSING
+    assert stored_value(document, "city.name") is MISSING
+    assert stored_value(document, "about", default="-") == "-"
+
+
+def test_diff_paths_only_returns_changes():
+    document = {"city": "Kandy", "opening_hours": {"mon": "6-22", "tue": "6-20"}, "gallery": ["a.jpg"]}
+    paths = {
+        "city": "Kandy",
+        "opening_hours.mon": "7-22",
+        "opening_hours.wed": "6-20",
+        "gallery": ["a.jpg"],
+    }
+    assert diff_paths(document, paths) == ({"opening_hours.mon": "7-22", "opening_hours.wed": "6-20"}, [])
+
+
+def test_diff_paths_unsets_only_existing_paths():
+    document = {"opening_hours": {"mon": "6-22", "sun": None}}
+    paths = {"opening_hours.mon": None, "opening_hours.sun": None, "opening_hours.tue": None}
+    assert diff_paths(document, paths) == ({}, ["opening_hours.mon", "opening_hours.sun"])
+
+
+def test_diff_paths_of_identical_document_is_empty():
+    document = {"city": "Kandy", "location": {"type": "Point", "coordinates": [80.6, 7.3]}}
+    assert diff_paths(document, {"city": "Kandy", "location": {"type": "Point", "coordinates": [80.6, 7.3]}}) == ({}, [])
+
+
+def test_fold_into_scalars_replaces_non_object_parents():
+    stored = {"opening_hours": {"mon": "closed", "tue": None, "wed": {"open": "06:00"}}, "contact": None}
+    paths = {
+        "opening_hours.mon.open": "06:00",
+        "opening_hours.mon.close": "22:00",
+        "opening_hours.tue.open": "07:00",
+        "opening_hours.wed.open": "08:00",
+        "opening_hours.thu.open": "09:00",
+        "contact.phone": "011",
+        "contact.email": None,
+    }
+    assert fold_into_scalars(stored, paths) == {
+        "opening_hours.mon": {"open": "06:00", "close": "22:00"},
+        "opening_hours.tue": {"open": "07:00"},
+        "opening_hours.wed.open": "08:00",
+        "opening_hours.thu.open": "09:00",
+        "contact": {"phone": "011"},
+    }
+
+
+def test_unchanged_filter_pins_read_values():
+    stored = {"gym_id": "g1", "city": "Kandy", "contact": {"phone": "011"}}
+    assert unchanged_filter(stored, ["city", "contact", "location", "city"]) == {
+        "city": "Kandy",
+        "contact": {"phone": "011"},
+        "location": {"$exists": False},
+    }
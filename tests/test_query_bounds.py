@@ -0,0 +1,28 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.v1.create_category import router as category_router
+from app.api.v1.create_gym import router as gym_router
+from app.api.v1.exports import router as exports_router
+from app.core.config import settings
+
+app = FastAPI()
+for router in (gym_router, category_router, exports_router):
+    app.include_router(router, prefix="/api/v1")
+client = TestClient(app)
+
+
+# Out-of-range parameters are rejected before the database is touched
+@pytest.mark.parametrize("url", [
+    f"/api/v1/get/gyms/near?lng=80&lat=7&limit={settings.MAX_PAGE_LIMIT + 1}",
+    "/api/v1/get/gyms/near?lng=80&lat=7&limit=0",
+    f"/api/v1/get/gyms/near?lng=80&lat=7&radius_km={settings.MAX_NEAR_RADIUS_KM + 1}",
+    "/api/v1/get/gyms/near?lng=80&lat=7&radius_km=0",
+    f"/api/v1/get/all/gyms?stream=ndjson&batch_size={settings.MAX_BATCH_SIZE + 1}",
+    "/api/v1/get/all/gyms?stream=ndjson&batch_size=0",
+    f"/api/v1/get/all/categories?stream=ndjson&batch_size={settings.MAX_BATCH_SIZE + 1}",
+    f"/api/v1/export/trainers?batch_size={settings.MAX_BATCH_SIZE + 1}",
+    f"/api/v1/export/gyms?batch_size={settings.MAX_BATCH_SIZE + 1}",
+])
+def test_out_of_range_parameters_are_422(url):
+    assert client.get(url).status_code == 422
@@ -0,0 +1,52 @@
+import pytest
+from pymongo.read_preferences import Primary, PrimaryPreferred, SecondaryPreferred
+from app.core.config import settings
+from app.db.read_routing import ROUTE_READ_PREFERENCES, route_read_preference
+
+
+@pytest.fixture(autouse=True)
+def routing_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_READ_ROUTING", True)
+
+
+def test_list_routes_prefer_secondaries():
+    for route in ("get_all_trainers", "search_trainers", "get_gyms", "get_gyms_near"):
+        assert isinstance(route_read_preference(route), SecondaryPreferred)
+
+
+def test_single_document_read_prefers_primary():
+    assert isinstance(route_read_preference("get_trainer_by_id"), PrimaryPreferred)
+
+
+def test_reads_that_fill_in_process_caches_prefer_primary():
+    # A lagging secondary read right after a write would be cached for the TTL
+    for route in ("get_categories", "get_facilities", "resolve_reference_names"):
+        assert isinstance(route_read_preference(route), PrimaryPreferred)
+
+
+def test_unknown_route_reads_from_primary():
+    assert route_read_preference("create_trainer") == Primary()
+
+
+def test_routing_disabled_reads_from_primary(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_READ_ROUTING", False)
+    assert route_read_preference("get_all_trainers") == Primary()
+
+
+def test_max_staleness_defaults_to_setting(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_READ_MAX_STALENESS_S", None)
+    assert route_read_preference("get_gyms").max_staleness == -1
+
+    monkeypatch.setattr(settings, "MONGO_READ_MAX_STALENESS_S", 120)
+    assert route_read_preference("get_gyms").max_staleness == 120
+
+
+def test_route_max_staleness_overrides_setting(monkeypatch):
+    monkeypatch.setattr(settings, "MONGO_READ_MAX_STALENESS_S", 120)
+    monkeypatch.setitem(ROUTE_READ_PREFERENCES, "get_gyms", {"mode": "secondaryPreferred", "max_staleness": 300})
+    assert route_read_preference("get_gyms").max_staleness == 300
+
+
+def test_declared_primary_has_no_staleness(monkeypatch):
+    monkeypatch.setitem(ROUTE_READ_PREFERENCES, "get_gyms", {"mode": "primary"})
+    assert route_read_preference("get_gyms") == Primary()
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from app.utils.cache import category_cache, facility_cache
+from app.utils.references import category_names, hydrate_gyms
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeReferences:
+    def __init__(self, id_field, name_field, names):
+        self.id_field, self.name_field = id_field, name_field
+        self.names = names
+        self.queries = []
+
+    def find(self, query, projection=None):
+        ids = query[self.id_field]["$in"]
+        self.queries.append(ids)
+        return FakeCursor([{self.id_field: id_, self.name_field: self.names[id_]} for id_ in ids if id_ in self.names])
+
+
+@pytest.fixture(autouse=True)
+def caches():
+    category_cache.clear()
+    facility_cache.clear()
+    yield
+    category_cache.clear()
+    facility_cache.clear()
+
+
+def _collections():
+    return (
+        FakeReferences("category_id", "category_name", {"c1": "CrossFit", "c2": "Yoga"}),
+        FakeReferences("facility_id", "facility_name", {"f1": "Pool", "f2": "Sauna"}),
+    )
+
+
+def test_hydrate_embeds_names_with_one_query_per_collection():
+    categories, facilities = _collections()
+    gyms = [
+        {"gym_id": "g1", "category_id": "c2", "facilities": ["f2", "f1"]},
+        {"gym_id": "g2", "category_id": "c1", "facilities": ["f1", "missing"]},
+        {"gym_id": "g3"},
+    ]
+    category_map, facility_map = asyncio.run(hydrate_gyms(gyms, categories, facilities))
+
+    assert [gym.get("category_name") for gym in gyms] == ["Yoga", "CrossFit", None]
+    assert gyms[0]["facility_names"] == ["Sauna", "Pool"]
+    assert gyms[1]["facility_names"] == ["Pool", None]
+    assert "facility_names" not in gyms[2]
+    assert categories.queries == [["c1", "c2"]] and facilities.queries == [["f1", "f2", "missing"]]
+    # Maps are sorted by id so ETags over them agree across workers
+    assert list(category_map) == ["c1", "c2"]
+
+
+def test_cached_names_skip_the_query_until_a_write_clears_them():
+    categories, facilities = _collections()
+    asyncio.run(hydrate_gyms([{"category_id": "c1", "facilities": ["f1"]}], categories, facilities))
+    asyncio.run(hydrate_gyms([{"category_id": "c1", "facilities": ["f1"]}], categories, facilities))
+    assert len(categories.queries) == 1 and len(facilities.queries) == 1
+
+    categories.names["c1"] = "Functional"
+    category_cache.clear()
+    gyms = [{"category_id": "c1"}]
+    asyncio.run(hydrate_gyms(gyms, categories, facilities))
+    assert gyms[0]["category_name"] == "Functional" and len(categories.queries) == 2
+
+
+def test_names_read_before_a_clear_are_not_cached():
+    categories, _ = _collections()
+
+    class ClearingReferences(FakeReferences):
+        def find(self, query, projection=None):
+            category_cache.clear()  # a write lands during the lookup
+            return super().find(query, projection)
+
+    clearing = ClearingReferences("category_id", "category_name", categories.names)
+    asyncio.run(category_names.resolve(clearing, ["c1"]))
+    asyncio.run(category_names.resolve(clearing, ["c1"]))
+    assert len(clearing.queries) == 2
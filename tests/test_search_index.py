@@ -0,0 +1,95 @@
+import asyncio
+from app.utils.search_index import InvertedIndex, tokenize
+
+FIELDS = {"full_name": 3.0, "short_bio": 1.0}
+
+
+class FakeCollection:
+    name = "trainers"
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        documents = [document for document in self.documents if document.get("status") == query["status"]]
+
+        async def cursor():
+            for document in documents:
+                await asyncio.sleep(0)
+                yield document
+        return cursor()
+
+
+def _index(*documents):
+    index = InvertedIndex("trainer_id", FIELDS)
+    for document in documents:
+        index.upsert(document)
+    return index
+
+
+def test_tokenize():
+    assert tokenize("Hatha-Yoga, C# and ++") == ["hatha", "yoga", "c", "and"]
+    assert tokenize(None) == []
+
+
+def test_remove_key_drops_document_by_mongo_id():
+    index = _index({"_id": "oid-1", "trainer_id": "a", "full_name": "Ann Perera"})
+    index.remove_key("oid-1")
+    assert index.search("ann") == [] and len(index) == 0
+    index.remove_key("unknown")  # no-op
+
+
+def test_upsert_without_id_keeps_the_known_key():
+    index = _index({"_id": "oid-1", "trainer_id": "a", "full_name": "Ann Perera"})
+    index.upsert({"trainer_id": "a", "full_name": "Ann Silva"})
+    index.remove_key("oid-1")
+    assert len(index) == 0
+
+
+def test_inactive_documents_are_not_indexed():
+    index = _index({"_id": 1, "trainer_id": "a", "full_name": "Ann", "status": "deleted"})
+    assert index.search("ann") == []
+    index.remove_key(1)
+
+
+def test_load_swaps_in_a_complete_index():
+    old = {"_id": 1, "trainer_id": "old", "full_name": "Old Trainer", "status": "active"}
+    index = _index(old)
+    index.ready = True
+    collection = FakeCollection([
+        {"_id": 2, "trainer_id": "b", "full_name": "Bea Trainer", "status": "active"},
+        {"_id": 3, "trainer_id": "c", "full_name": "Cal Trainer", "status": "active"},
+    ])
+
+    async def scenario():
+        load = asyncio.create_task(index.load(collection))
+        await asyncio.sleep(0)
+        # Mid-load searches still see the previous index, never a partial one
+        during = [doc_id for doc_id, _ in index.search("trainer")]
+        await load
+        return during
+
+    assert asyncio.run(scenario()) == ["old"]
+    assert sorted(doc_id for doc_id, _ in index.search("trainer")) == ["b", "c"]
+    index.remove_key(2)
+    assert [doc_id for doc_id, _ in index.search("trainer")] == ["c"]
+
+
+def test_ranking_weights_fields_and_exact_terms():
+    index = _index(
+        {"trainer_id": "bio", "full_name": "Ann Perera", "short_bio": "yoga teacher"},
+        {"trainer_id": "name", "full_name": "Yoga Nimal", "short_bio": "strength"},
+        {"trainer_id": "prefix", "full_name": "Kamal Silva", "short_bio": "yogalates"},
+    )
+    # A full_name hit outranks a short_bio hit, which outranks a prefix expansion
+    assert [doc_id for doc_id, _ in index.search("yoga")] == ["name", "bio", "prefix"]
+
+
+def test_every_token_must_match_and_prefixes_count():
+    index = _index(
+        {"trainer_id": "a", "full_name": "Ann Perera", "short_bio": "pilates"},
+        {"trainer_id": "b", "full_name": "Ann Silva", "short_bio": "yoga"},
+    )
+    assert [doc_id for doc_id, _ in index.search("ann pil")] == ["a"]
+    assert sorted(doc_id for doc_id, _ in index.search("an")) == ["a", "b"]
+    assert index.search("ann boxing") == []
@@ -0,0 +1,178 @@
+import pytest
+from app.api.v1.schemas.trainer_schema import SkillsSchema, WeeklyScheduleSchema
+from app.utils.trainer_fields import (
+    MINUTES_PER_DAY, SKILL_BITS, availability, availability_filter, parse_day, parse_time, parse_time_slot,
+    skills_filter_mask, skills_mask, skills_mask_expression,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Monday", 0),
+    ("tue", 1),
+    ("Tues", 1),
+    ("Wed.", 2),
+    (" sunday ", 6),
+    ("Th", 3),
+    ("S", None),  # ambiguous single letter
+    ("", None),
+    ("Funday", None),
+    (None, None),
+])
+def test_parse_day(text, expected):
+    assert parse_day(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("18:30", 18 * 60 + 30),
+    ("6:30 PM", 18 * 60 + 30),
+    ("6:30pm", 18 * 60 + 30),
+    ("6pm", 18 * 60),
+    ("6 p.m.", 18 * 60),
+    ("6.30", 6 * 60 + 30),
+    ("06:00 AM", 6 * 60),
+    ("12 AM", 0),
+    ("12:15 PM", 12 * 60 + 15),
+    ("0:00", 0),
+    ("24:00", MINUTES_PER_DAY),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", None, "noon", "25:00", "24:30", "13 PM", "0 AM", "6:60", "6:5", "6:30 XM"])
+def test_parse_time_rejects(text):
+    assert parse_time(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("06:00 AM - 08:00 AM", (360, 480)),
+    ("18:00 to 20:00", (1080, 1200)),
+    ("6pm–8pm", (1080, 1200)),
+    ("22:00 - 02:00", (1320, 120)),  # past midnight: end before start
+])
+def test_parse_time_slot(text, expected):
+    assert parse_time_slot(text) == expected
+
+
+@pytest.mark.parametrize("text", ["18:00", "18:00 - 18:00", "6pm - 8pm - 10pm", "later - 8pm", None])
+def test_parse_time_slot_rejects(text):
+    assert parse_time_slot(text) is None
+
+
+def test_availability_skips_unchecked_and_unparseable_entries():
+    schedule = [
+        {"days": ["Monday", "Someday"], "checked": True, "time_slots": ["9am - 11am", "whenever"]},
+        {"days": ["Tuesday"], "checked": False, "time_slots": ["9am - 11am"]},
+    ]
+    assert availability(schedule) == [{"day": 0, "start": 540, "end": 660}]
+
+
+def test_availability_merges_overlapping_and_touching_slots():
+    schedule = [{"days": ["Wed"], "checked": True, "time_slots": ["10:00 - 12:00", "09:00 - 10:30", "12:00 - 13:00", "15:00 - 16:00"]}]
+    assert availability(schedule) == [
+        {"day": 2, "start": 540, "end": 780},
+        {"day": 2, "start": 900, "end": 960},
+    ]
+
+
+def test_availability_splits_slots_past_midnight():
+    schedule = [{"days": ["Friday"], "checked": True, "time_slots": ["22:00 - 02:00"]}]
+    assert availability(schedule) == [
+        {"day": 4, "start": 1320, "end": MINUTES_PER_DAY},
+        {"day": 5, "start": 0, "end": 120},
+    ]
+
+
+def test_availability_wraps_sunday_into_monday():
+    schedule = [{"days": ["Sunday"], "checked": True, "time_slots": ["23:00 - 01:00"]}]
+    assert availability(schedule) == [
+        {"day": 0, "start": 0, "end": 60},
+        {"day": 6, "start": 1380, "end": MINUTES_PER_DAY},
+    ]
+
+
+def test_availability_accepts_schema_objects():
+    schedule = [WeeklyScheduleSchema(days=["Mon", "Tue"], checked=True, time_slots=["6pm - 8pm"])]
+    assert availability(schedule) == [
+        {"day": 0, "start": 1080, "end": 1200},
+        {"day": 1, "start": 1080, "end": 1200},
+    ]
+
+
+def test_availability_of_nothing():
+    assert availability(None) == []
+    assert availability([]) == []
+
+
+def _free(intervals, query) -> bool:
+    """Evaluate availability_filter output against stored intervals."""
+    if "$and" in query:
+        return all(_free(intervals, clause) for clause in query["$and"])
+    match = query["availability"]["$elemMatch"]
+    return any(
+        interval["day"] == match["day"]
+        and interval["start"] <= match["start"]["$lte"]
+        and interval["end"] >= match["end"]["$gte"]
+        for interval in intervals
+    )
+
+
+def test_availability_filter_within_a_day():
+    assert availability_filter(1, 18 * 60, 19 * 60) == {
+        "availability": {"$elemMatch": {"day": 1, "start": {"$lte": 1080}, "end": {"$gte": 1140}}}
+    }
+    # A window ending exactly at midnight stays on its day
+    assert "$and" not in availability_filter(1, 23 * 60, MINUTES_PER_DAY)
+
+
+@pytest.mark.parametrize("start, end", [(23 * 60 + 30, 30), (23 * 60 + 30, 23 * 60 + 30 + 60)])
+def test_availability_filter_crosses_midnight(start, end):
+    # Sunday night into Monday morning
+    late = availability([{"days": ["Sunday"], "checked": True, "time_slots": ["22:00 - 02:00"]}])
+    early_only = availability([{"days": ["Monday"], "checked": True, "time_slots": ["00:00 - 02:00"]}])
+    query = availability_filter(6, start, end)
+    assert query["$and"][1]["availability"]["$elemMatch"]["day"] == 0
+    assert _free(late, query)
+    assert not _free(early_only, query)
+
+
+def test_skill_bits_follow_schema_order():
+    assert SKILL_BITS["hatha_yoga"] == 1 and SKILL_BITS["mobility_flexibility"] == 2
+    assert sorted(SKILL_BITS.values()) == [1 << i for i in range(len(SKILL_BITS))]
+
+
+def test_skills_mask_of_schema_and_stored_dict():
+    skills = SkillsSchema(hatha_yoga=True, strength_training=True)
+    assert skills_mask(skills) == skills_mask(skills.model_dump()) == 1 | 4
+    assert skills_mask(None) == 0 and skills_mask({}) == 0
+
+
+def test_skills_filter_mask_normalizes_names():
+    assert skills_filter_mask(["Hatha Yoga", "strength-training", "hatha_yoga"]) == 1 | 4
+    assert skills_filter_mask(["juggling"]) == 0 and skills_filter_mask(None) == 0
+
+
+def _evaluate(expression, document):
+    """Evaluate the $add/$cond expression skills_mask_expression builds."""
+    total = 0
+    for term in expression["$add"]:
+        path, bit, otherwise = term["$cond"]
+        total += bit if document["skills"].get(path.removeprefix("$skills.")) else otherwise
+    return total
+
+
+def test_skills_mask_expression_matches_the_python_mask():
+    stored = {"skills": {"mobility_flexibility": True, "guided_meditation": True, "hatha_yoga": False}}
+    assert _evaluate(skills_mask_expression(), stored) == skills_mask(stored["skills"])
+
+
+@pytest.mark.parametrize("requested, matches", [
+    (["hatha yoga"], True),
+    (["hatha yoga", "strength training"], True),
+    (["hatha yoga", "guided meditation"], False),
+])
+def test_bits_all_set_requires_every_requested_skill(requested, matches):
+    # What the server does for {"skills_mask": {"$bitsAllSet": required}}
+    stored = skills_mask({"hatha_yoga": True, "strength_training": True})
+    required = skills_filter_mask(requested)
+    assert (stored & required == required) is matches
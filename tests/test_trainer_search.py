@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api.v1.trainers import _ranked_search_page
+from app.utils.pagination import count_cache
+from app.utils.projection import trim_to_projection
+
+RANKED = [("a", 3.0), ("b", 2.0), ("gone", 1.5), ("c", 1.0)]
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeTrainers:
+    """Active trainers a, b and c; "gone" is still ranked by a lagging index."""
+    name = "trainers"
+
+    def __init__(self):
+        self.documents = {trainer_id: {"trainer_id": trainer_id, "experience": experience}
+                          for trainer_id, experience in (("a", 1), ("b", 8), ("c", 9))}
+        self.counts = []
+
+    def _matching(self, query):
+        ids = query["trainer_id"]["$in"]
+        minimum = query.get("experience", {}).get("$gte", 0)
+        return [self.documents[i] for i in ids if i in self.documents and self.documents[i]["experience"] >= minimum]
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(document) for document in self._matching(query)])
+
+    async def distinct(self, field, query):
+        return [document[field] for document in self._matching(query)]
+
+    async def count_documents(self, query):
+        self.counts.append(query)
+        return len(self._matching(query))
+
+    async def estimated_document_count(self):
+        return len(self.documents)
+
+
+def _filter(**extra):
+    return {"status": "active", "trainer_id": {"$in": [trainer_id for trainer_id, _ in RANKED]}, **extra}
+
+
+def _page(trainers, filter_query, count, limit=2, page=1):
+    return asyncio.run(_ranked_search_page(trainers, filter_query, RANKED, limit, page, None, None, count))
+
+
+@pytest.fixture(autouse=True)
+def counts():
+    count_cache.clear()
+    yield
+    count_cache.clear()
+
+
+def test_page_keeps_relevance_order_and_scores():
+    trainers, total, cursor = _page(FakeTrainers(), _filter(), "exact")
+    assert [(t["trainer_id"], t["search_score"]) for t in trainers] == [("a", 3.0), ("b", 2.0)]
+    assert cursor is not None
+
+
+def test_exact_total_is_recounted_not_the_ranking_length():
+    collection = FakeTrainers()
+    _, total, _ = _page(collection, _filter(), "exact")
+    assert total == 3 and len(collection.counts) == 1
+
+
+def test_filtered_total_comes_from_the_checked_ranking():
+    collection = FakeTrainers()
+    trainers, total, cursor = _page(collection, _filter(experience={"$gte": 5}), "exact")
+    assert [t["trainer_id"] for t in trainers] == ["b", "c"] and total == 2
+    assert cursor is None and collection.counts == []
+
+
+def test_estimated_and_none_counts():
+    assert _page(FakeTrainers(), _filter(), "estimated")[1] == 3
+    assert _page(FakeTrainers(), _filter(), "none")[1] is None
+    with pytest.raises(HTTPException):
+        _page(FakeTrainers(), _filter(), "fast")
+
+
+def test_trim_to_projection_drops_fields_read_for_the_index():
+    document = {"_id": 1, "trainer_id": "a", "full_name": "Ann", "pricing": {"per_session": 40}}
+    assert trim_to_projection(document, {"trainer_id": 1, "pricing.per_session": 1}) == {
+        "_id": 1, "trainer_id": "a", "pricing": {"per_session": 40},
+    }
+    assert trim_to_projection(document, None) is document